@@ -1,6 +1,25 @@
+import logging
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Start MATLAB engines in the background so the first request doesn't pay for it
+        if settings.PC_BACKEND == 'matlab' and settings.MATLAB_POOL_WARMUP:
+            from .pc import matlab_engine_pool
+
+            def warm_up():
+                try:
+                    matlab_engine_pool().warm_up()
+                except Exception:
+                    logger.exception("MATLAB engine pool warm-up failed.")
+
+            threading.Thread(target=warm_up, name='matlab-pool-warmup', daemon=True).start()
@@ -0,0 +1,131 @@
+"""
+Streaming readers for CCSDS Conjunction Data Messages (CCSDS 508.0-B-1) in
+KVN and XML.
+
+Each message is turned into the flattened dict accepted by the ingest paths
+(api.ingest.cdm_fields): header and relative metadata keys are kept as they
+are ("MESSAGE_ID", "TCA", "MISS_DISTANCE", ...) and the keys of the two object
+sections get a "SAT1_" / "SAT2_" prefix ("SAT1_X", "SAT2_CR_R", ...). Units in
+brackets or attributes are dropped; values stay strings.
+
+Both readers handle files of several concatenated messages (KVN messages
+start at each CCSDS_CDM_VERS line; XML messages are the <cdm> elements of the
+document, which may be wrapped in an <ndm>) and keep only the current message
+in memory. A message that cannot be read is yielded as an InvalidMessage
+error instead of a dict, so the rest of the file still loads.
+"""
+import re
+import xml.etree.ElementTree as ET
+
+KVN_EXTENSIONS = ('.kvn', '.cdm')
+XML_EXTENSIONS = ('.xml',)
+
+# CCSDS keys stored under another name in the flattened format
+KEY_ALIASES = {"REF_FRAME": "REFERENCE_FRAME"}
+OBJECT_PREFIXES = {"OBJECT1": "SAT1_", "OBJECT2": "SAT2_"}
+
+_KVN_LINE = re.compile(r'^\s*([A-Z0-9_]+)\s*=\s*(.*?)\s*(?:\[[^\]]*\])?\s*$')
+
+
+class InvalidMessage(ValueError):
+    """A CDM that could not be read; yielded in place of the message."""
+
+    def __init__(self, number, reason):
+        super().__init__(f"CDM {number}: {reason}")
+        self.number = number
+
+
+class _MessageBuilder:
+    """Accumulates the keys of one message into the flattened format."""
+
+    def __init__(self, number):
+        self.number = number
+        self.data = {}
+        self.prefix = ""
+        self.error = None
+
+    def add(self, key, value):
+        if self.error or key == "COMMENT":
+            return
+        key = KEY_ALIASES.get(key, key)
+        if key == "OBJECT":
+            if value not in OBJECT_PREFIXES:
+                self.error = f"OBJECT must be OBJECT1 or OBJECT2, got {value!r}."
+                return
+            self.prefix = OBJECT_PREFIXES[value]
+        self.data[self.prefix + key] = value
+
+    def result(self):
+        if self.error:
+            return InvalidMessage(self.number, self.error)
+        if not self.prefix:
+            return InvalidMessage(self.number, "no OBJECT1 / OBJECT2 section.")
+        return self.data
+
+
+def iter_kvn_messages(lines):
+    """
+    Yields the messages of KVN text given as an iterable of lines (str or
+    bytes, e.g. an open file).
+    """
+    message = None
+    number = 0
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip() or line.lstrip().startswith("COMMENT"):
+            continue
+        match = _KVN_LINE.match(line)
+        if match is None:
+            if message is None:
+                number += 1
+                message = _MessageBuilder(number)
+            if not message.error:
+                message.error = f"line {line_number} is not a KEY = value pair."
+            continue
+        key, value = match.groups()
+        if key == "CCSDS_CDM_VERS" or message is None:
+            if message is not None:
+                yield message.result()
+            number += 1
+            message = _MessageBuilder(number)
+        message.add(key, value)
+    if message is not None:
+        yield message.result()
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_xml_messages(source):
+    """
+    Yields the messages of a CDM XML document read incrementally from a
+    file name or binary file object.
+    """
+    number = 0
+    message = None
+    root = None
+    try:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            name = _local_name(elem.tag)
+            if event == 'start':
+                if root is None:
+                    root = elem
+                if name == 'cdm':
+                    number += 1
+                    message = _MessageBuilder(number)
+                    message.add("CCSDS_CDM_VERS", elem.get('version', ''))
+                continue
+
+            if message is None:
+                continue
+            if name == 'cdm':
+                yield message.result()
+                message = None
+                # Drop the parsed message so memory stays bounded
+                root.clear()
+            elif len(elem) == 0 and name not in ('header', 'body', 'segment', 'metadata', 'data'):
+                message.add(name, (elem.text or '').strip())
+    except ET.ParseError as e:
+        yield InvalidMessage(number or 1, f"invalid XML ({e}).")
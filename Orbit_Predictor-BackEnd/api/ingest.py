@@ -0,0 +1,519 @@
+"""
+CDM ingest shared by the single and bulk endpoints.
+
+cdm_fields() maps a flattened CDM message (CCSDS keys such as "SAT1_CR_R")
+onto CDM model fields. bulk_ingest() upserts messages in chunks of
+CDM_BULK_CHUNK_SIZE: each chunk is validated, its Pc computed in one batched
+backend call, and then written with a single bulk upsert on MESSAGE_ID plus a
+single bulk upsert of Collisions. A message that fails validation or Pc does
+not affect the rest of its chunk.
+
+The file readers below stream CDM messages (JSON, NDJSON, or CCSDS KVN and
+XML through api.ccsds) out of files, directories and glob patterns for the
+seed_cdm_data command without loading whole files.
+"""
+import glob
+import json
+import logging
+import os
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import CDM, Collision, Satellite
+from .pc import cdm_content_hash, pack_covariances
+from .ccsds import KVN_EXTENSIONS, XML_EXTENSIONS, iter_kvn_messages, iter_xml_messages
+from .parsers import InvalidLine
+from .tradespace import invalidate_many_tradespaces
+
+logger = logging.getLogger(__name__)
+
+STATUS_CREATED = 'created'
+STATUS_UPDATED = 'updated'
+STATUS_SUPERSEDED = 'superseded'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_ERROR = 'error'
+
+# CCSDS keys of the covariance elements rr, rt, rn, tr, tt, tn, nr, nt, nn
+COVARIANCE_KEYS = ("CR_R", "CT_R", "CN_R", "CR_T", "CT_T", "CN_T", "CR_N", "CT_N", "CN_N")
+
+
+def cdm_fields(data):
+    """
+    Model field values of a CDM message, as stored by CDMCreateView. Raises
+    ValueError for non-numeric states or covariances.
+    """
+    return {
+        "ccsds_cdm_version": data.get("CCSDS_CDM_VERS"),
+        "creation_date": data.get("CREATION_DATE"),
+        "originator": data.get("ORIGINATOR"),
+        "tca": data.get("TCA"),
+        "miss_distance": float(data.get("MISS_DISTANCE", 0)),
+
+        # Satellite 1 details
+        "sat1_object": data.get("SAT1_OBJECT"),
+        "sat1_object_designator": data.get("SAT1_OBJECT_DESIGNATOR"),
+        "sat1_maneuverable": data.get("SAT1_MANEUVERABLE"),
+        "sat1_x": float(data.get("SAT1_X", 0)),
+        "sat1_y": float(data.get("SAT1_Y", 0)),
+        "sat1_z": float(data.get("SAT1_Z", 0)),
+        "sat1_x_dot": float(data.get("SAT1_X_DOT", 0)),
+        "sat1_y_dot": float(data.get("SAT1_Y_DOT", 0)),
+        "sat1_z_dot": float(data.get("SAT1_Z_DOT", 0)),
+
+        "sat1_catalog_name": data.get("SAT1_CATALOG_NAME"),
+        "sat1_object_name": data.get("SAT1_OBJECT_NAME"),
+        "sat1_international_designator": data.get("SAT1_INTERNATIONAL_DESIGNATOR"),
+        "sat1_object_type": data.get("SAT1_OBJECT_TYPE"),
+        "sat1_operator_organization": data.get("SAT1_OPERATOR_ORGANIZATION"),
+        "sat1_covariance_method": data.get("SAT1_COVARIANCE_METHOD"),
+        "sat1_reference_frame": data.get("SAT1_REFERENCE_FRAME"),
+
+        # Satellite 2 details
+        "sat2_object": data.get("SAT2_OBJECT"),
+        "sat2_object_designator": data.get("SAT2_OBJECT_DESIGNATOR"),
+        "sat2_maneuverable": data.get("SAT2_MANEUVERABLE"),
+        "sat2_x": float(data.get("SAT2_X", 0)),
+        "sat2_y": float(data.get("SAT2_Y", 0)),
+        "sat2_z": float(data.get("SAT2_Z", 0)),
+        "sat2_x_dot": float(data.get("SAT2_X_DOT", 0)),
+        "sat2_y_dot": float(data.get("SAT2_Y_DOT", 0)),
+        "sat2_z_dot": float(data.get("SAT2_Z_DOT", 0)),
+
+        "sat2_catalog_name": data.get("SAT2_CATALOG_NAME"),
+        "sat2_object_name": data.get("SAT2_OBJECT_NAME"),
+        "sat2_international_designator": data.get("SAT2_INTERNATIONAL_DESIGNATOR"),
+        "sat2_object_type": data.get("SAT2_OBJECT_TYPE"),
+        "sat2_operator_organization": data.get("SAT2_OPERATOR_ORGANIZATION"),
+        "sat2_covariance_method": data.get("SAT2_COVARIANCE_METHOD"),
+        "sat2_reference_frame": data.get("SAT2_REFERENCE_FRAME"),
+
+        # Position covariances of both objects, packed in CDM.COVARIANCE_FIELDS order
+        "covariance": pack_covariances([
+            float(data.get(f"{sat}_{key}", 0)) for sat in ("SAT1", "SAT2") for key in COVARIANCE_KEYS
+        ]),
+
+        # Hard Body Radius (if present in JSON data)
+        "hard_body_radius": float(20),
+
+        "privacy": data.get("privacy", False)
+    }
+
+
+def seed_cdm_fields(data):
+    """
+    Model field values of a CDM message as loaded by the seed_cdm_data
+    command: the hard-body radius comes from the message ("HBR") and the
+    privacy flag is left alone.
+    """
+    fields = cdm_fields(data)
+    fields["hard_body_radius"] = float(data.get("HBR", 0))
+    del fields["privacy"]
+    return fields
+
+
+def cdm_from_message(data, fields=cdm_fields):
+    """
+    An unsaved, validated CDM for a message. Raises ValueError with a
+    readable reason if the message cannot be stored.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each CDM must be a JSON object.")
+    if not data.get("MESSAGE_ID"):
+        raise ValueError("MESSAGE_ID is required.")
+    try:
+        values = fields(data)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid numeric value: {e}")
+    cdm = CDM(message_id=str(data["MESSAGE_ID"]), **values)
+    errors = {}
+    try:
+        # Satellites are created on upsert, so only the designators are checked here
+        cdm.clean_fields(exclude=["sat1", "sat2"])
+    except ValidationError as e:
+        errors = e.message_dict
+    for name in ("sat1_object_designator", "sat2_object_designator"):
+        designator = getattr(cdm, name)
+        if not designator:
+            errors[name] = ["This field cannot be null."]
+        elif len(designator) > 50:
+            errors[name] = ["Ensure this value has at most 50 characters."]
+    if errors:
+        raise ValueError("; ".join(f"{field}: {' '.join(messages)}" for field, messages in errors.items()))
+    # bulk_create() does not call save(), which keeps the hash current
+    cdm.content_hash = cdm_content_hash(cdm)
+    return cdm
+
+
+def stored_cdms(message_ids):
+    """{message_id: CDM} of the stored CDMs among `message_ids`, with their Satellites and Collision."""
+    return CDM.objects.select_related("sat1", "sat2", "collision").in_bulk(message_ids, field_name="message_id")
+
+
+def _column_value(field, cdm):
+    # The value a write would store, so that e.g. a TCA string and a datetime compare equal
+    value = field.get_prep_value(getattr(cdm, field.attname))
+    return bytes(value) if isinstance(value, memoryview) else value
+
+
+def cdm_unchanged(stored, cdm, update_fields):
+    """
+    Whether writing the (unsaved) `cdm` over the `stored` one would change
+    none of its `update_fields` columns and none of its Satellites' catalog
+    values.
+    """
+    for name in update_fields:
+        field = CDM._meta.get_field(name)
+        if _column_value(field, stored) != _column_value(field, cdm):
+            return False
+    satellites = {stored.sat1_id: stored.sat1, stored.sat2_id: stored.sat2}
+    return all(
+        designator in satellites and getattr(satellites[designator], name) == value
+        for designator, values in cdm.catalog_values() for name, value in values.items()
+    )
+
+
+def has_collision(cdm):
+    """Whether a stored CDM has a current Collision."""
+    return getattr(cdm, "collision", None) is not None
+
+
+def split_unchanged(latest, update_fields, require_collision=True):
+    """
+    Removes from `latest` ({message_id: (index, cdm)}, as returned by
+    validate_chunk()) the CDMs already stored with the same content hash
+    and a Collision (unless `require_collision` is false), whose Pc
+    therefore stands. Returns (results, rewrites): "unchanged" results by
+    index for those that need no write at all, and
+    {message_id: (index, cdm, stored)} for those whose other columns or
+    catalog values changed and must still be written.
+    """
+    results, rewrites = {}, {}
+    for message_id, stored in stored_cdms(list(latest)).items():
+        index, cdm = latest[message_id]
+        if not stored.content_hash or stored.content_hash != cdm.content_hash:
+            continue
+        # A CDM whose Pc was never stored (e.g. its job failed) still needs it
+        if require_collision and not has_collision(stored):
+            continue
+        del latest[message_id]
+        if cdm_unchanged(stored, cdm, update_fields):
+            results[index] = {
+                "index": index, "message_id": message_id, "status": STATUS_UNCHANGED, "cdm_id": stored.id
+            }
+        else:
+            rewrites[message_id] = (index, cdm, stored)
+    return results, rewrites
+
+
+def _error(index, message, error):
+    message_id = message.get("MESSAGE_ID") if isinstance(message, dict) else None
+    return {"index": index, "message_id": message_id, "status": STATUS_ERROR, "error": str(error)}
+
+
+def validate_chunk(entries, fields=cdm_fields):
+    """
+    Builds the CDMs of a chunk of (index, message) pairs. Returns (results,
+    latest): error and superseded results by index, and the valid CDMs as
+    {message_id: (index, cdm)}; a MESSAGE_ID repeated within the chunk keeps
+    its last version.
+    """
+    results = {}
+    latest = {}
+    for index, message in entries:
+        if isinstance(message, Exception):
+            results[index] = _error(index, {}, message)
+            continue
+        try:
+            cdm = cdm_from_message(message, fields)
+        except ValueError as e:
+            results[index] = _error(index, message, e)
+            continue
+        if cdm.message_id in latest:
+            earlier = latest[cdm.message_id][0]
+            results[earlier] = {
+                "index": earlier, "message_id": cdm.message_id, "status": STATUS_SUPERSEDED,
+                "superseded_by": index,
+            }
+        latest[cdm.message_id] = (index, cdm)
+    return results, latest
+
+
+def upsert_cdms(cdms, update_fields):
+    """
+    Inserts or updates (on message_id) unsaved CDMs with one bulk upsert,
+    after their Satellites, and drops stale tradespaces of the updated ones.
+    Returns the saved CDMs, in order, and the set of message ids that
+    already existed.
+    """
+    message_ids = [cdm.message_id for cdm in cdms]
+    with transaction.atomic():
+        Satellite.upsert_from_cdms(cdms)
+        existing = set(CDM.objects.filter(message_id__in=message_ids).values_list("message_id", flat=True))
+        CDM.objects.bulk_create(
+            cdms, update_conflicts=True, unique_fields=["message_id"], update_fields=update_fields,
+        )
+        # Primary keys are not returned for upserted rows on every database
+        saved = {cdm.message_id: cdm for cdm in CDM.objects.filter(message_id__in=message_ids)}
+        invalidate_many_tradespaces([saved[message_id] for message_id in existing])
+    return [saved[message_id] for message_id in message_ids], existing
+
+
+def compute_chunk_pc(cdms, batch=None):
+    """
+    Pc of a chunk as ({message_id: (pc, method)}, {message_id: error}).
+    `batch` is the result of Collision.compute_pc() for the chunk if it was
+    computed elsewhere (or None to compute it here). If the batch fails, each
+    CDM is retried alone so that one bad message fails alone.
+    """
+    try:
+        pc, methods = batch if batch is not None else Collision.compute_pc(cdms)
+        return _split_undefined_pc(zip(cdms, pc, methods))
+    except Exception:
+        logger.exception("Batched Pc failed for a chunk of %d CDMs; retrying one at a time", len(cdms))
+
+    results, errors = {}, {}
+    for cdm in cdms:
+        try:
+            pc, methods = Collision.compute_pc([cdm])
+        except Exception as e:
+            errors[cdm.message_id] = f"Pc computation failed: {e}"
+            continue
+        result, error = _split_undefined_pc([(cdm, pc[0], methods[0])])
+        results.update(result)
+        errors.update(error)
+    return results, errors
+
+
+def _split_undefined_pc(computed):
+    # Degenerate conjunctions (e.g. non-finite covariances) come back as NaN
+    results, errors = {}, {}
+    for cdm, pc, method in computed:
+        if np.isfinite(pc):
+            results[cdm.message_id] = (pc, method)
+        else:
+            errors[cdm.message_id] = "Pc computation failed: Pc is undefined for this conjunction."
+    return results, errors
+
+
+# Columns rewritten when a MESSAGE_ID is ingested again
+def cdm_columns(fields):
+    """
+    The CDM columns written for message fields: designators are the sat1 /
+    sat2 foreign keys and catalog values are stored on Satellite.
+    """
+    concrete = {field.name for field in CDM._meta.concrete_fields}
+    names = [{"sat1_object_designator": "sat1", "sat2_object_designator": "sat2"}.get(name, name) for name in fields]
+    return [name for name in names if name in concrete]
+
+
+CDM_UPDATE_FIELDS = cdm_columns(cdm_fields({})) + ["content_hash"]
+SEED_UPDATE_FIELDS = cdm_columns(seed_cdm_fields({})) + ["content_hash"]
+
+
+def _result(index, cdm, existing, collision):
+    result = {
+        "index": index,
+        "message_id": cdm.message_id,
+        "status": STATUS_UPDATED if cdm.message_id in existing else STATUS_CREATED,
+        "cdm_id": cdm.id,
+    }
+    if collision is not None:
+        result.update(
+            collision_id=collision.id,
+            probability_of_collision=collision.probability_of_collision,
+            pc_method=collision.pc_method,
+        )
+    return result
+
+
+def ingest_chunk(entries):
+    """
+    Upserts one chunk of (index, message) pairs and stores their Collisions.
+    CDMs whose content is already stored are left alone, and CDMs whose Pc
+    inputs are unchanged keep their Collision. Returns one result per entry,
+    in order.
+    """
+    results, latest = validate_chunk(entries)
+    rewrites = {}
+    if latest:
+        unchanged, rewrites = split_unchanged(latest, CDM_UPDATE_FIELDS)
+        results.update(unchanged)
+
+    pc, pc_errors = compute_chunk_pc([cdm for _, cdm in latest.values()]) if latest else ({}, {})
+    for message_id, error in pc_errors.items():
+        index = latest.pop(message_id)[0]
+        results[index] = {"index": index, "message_id": message_id, "status": STATUS_ERROR, "error": error}
+
+    if latest or rewrites:
+        with transaction.atomic():
+            cdms, existing = upsert_cdms(
+                [cdm for _, cdm in latest.values()] + [cdm for _, cdm, _ in rewrites.values()], CDM_UPDATE_FIELDS
+            )
+            computed = cdms[:len(latest)]
+            collisions = Collision.upsert_from_cdms(
+                computed, [pc[message_id][0] for message_id in latest], [pc[message_id][1] for message_id in latest]
+            )
+            Collision.sync_designators(cdms[len(latest):])
+
+        for (index, _), cdm, collision in zip(latest.values(), computed, collisions):
+            results[index] = _result(index, cdm, existing, collision)
+        # Their Collision was computed from the same Pc inputs
+        for (index, _, stored), cdm in zip(rewrites.values(), cdms[len(latest):]):
+            results[index] = _result(index, cdm, existing, getattr(stored, "collision", None))
+
+    return [results[index] for index, _ in entries]
+
+
+def bulk_ingest(messages, chunk_size=None):
+    """
+    Ingests an iterable of CDM messages (dicts, or exceptions standing for
+    messages that could not be parsed) chunk by chunk. Returns
+    (summary, results) with one result per message, in input order.
+    """
+    chunk_size = chunk_size or getattr(settings, 'CDM_BULK_CHUNK_SIZE', 500)
+    entries = enumerate(messages)
+    results = []
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            break
+        results.extend(ingest_chunk(chunk))
+
+    summary = {
+        status: 0 for status in (STATUS_CREATED, STATUS_UPDATED, STATUS_UNCHANGED, STATUS_SUPERSEDED, STATUS_ERROR)
+    }
+    for result in results:
+        summary[result["status"]] += 1
+    summary["total"] = len(results)
+    return summary, results
+
+
+# Extensions read as one JSON message per line; other files hold a JSON array (or a single object)
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+CDM_FILE_EXTENSIONS = ('.json',) + NDJSON_EXTENSIONS + KVN_EXTENSIONS + XML_EXTENSIONS
+READ_SIZE = 1 << 16
+
+
+def expand_cdm_paths(patterns):
+    """
+    Files named by a list of paths, directories (their CDM files, sorted) and
+    glob patterns, without duplicates. Raises FileNotFoundError for a path
+    or pattern that matches nothing.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.lower().endswith(CDM_FILE_EXTENSIONS)
+            )
+        elif os.path.exists(pattern):
+            matches = [pattern]
+        else:
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+            if not matches:
+                raise FileNotFoundError(f"No CDM files match {pattern}")
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def _delimited(buffer, end):
+    # Whether a scalar decoded up to `end` is followed by a character that ends it
+    return end < len(buffer) and (buffer[end].isspace() or buffer[end] in ',]')
+
+
+def iter_json_values(f, read_size=READ_SIZE):
+    """
+    Yields the elements of a JSON array read incrementally from a text file
+    (or the document itself if it is not an array), holding at most one
+    element plus one read buffer in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        data = f.read(read_size)
+        eof = not data
+        buffer = buffer[pos:] + data
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if pos == len(buffer):
+        return
+    if buffer[pos] != '[':
+        # Not an array: a single document
+        fill()
+        while not eof:
+            fill()
+        yield json.loads(buffer)
+        return
+
+    pos += 1
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos == len(buffer):
+            raise ValueError("Unexpected end of file inside a JSON array.")
+        if buffer[pos] == ']':
+            return
+        if not expect_value:
+            if buffer[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}.")
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        if not eof and not isinstance(value, (dict, list, str)) and not _delimited(buffer, end):
+            # A number may continue in the next read
+            fill()
+            continue
+        yield value
+        pos = end
+        expect_value = False
+
+
+def iter_cdm_file(path):
+    """
+    Yields the messages of one CDM file, by extension: CCSDS KVN or XML,
+    NDJSON (one per line) or otherwise a JSON array. A message that cannot be
+    read is yielded as an error (InvalidLine, InvalidMessage), so the rest of
+    the file still loads.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in XML_EXTENSIONS:
+        yield from iter_xml_messages(path)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        if extension in KVN_EXTENSIONS:
+            yield from iter_kvn_messages(f)
+        elif extension in NDJSON_EXTENSIONS:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield InvalidLine(line_number, e)
+        else:
+            yield from iter_json_values(f)
@@ -0,0 +1,160 @@
+"""
+Local worker pool for the Pc computation of ingested CDMs.
+
+CDMCreateView persists the CDM, queues a PcJob row and returns 202 with the
+job id. A process-wide thread pool then computes the Collision and sends the
+notification email, recording progress on the PcJob so clients can poll
+/api/jobs/<id>/. No external broker is needed; jobs still queued when the
+process exits can be rerun with the run_pc_jobs command.
+
+PC_JOB_WORKERS = 0 runs each job inline before the response is sent.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Collision, Organization, PcJob
+
+logger = logging.getLogger(__name__)
+
+SPACE_AGENCY_MAP = {
+    "asc-csa.gc.ca": "CSA",
+    "nasa.gov": "NASA",
+    "esa.int": "ESA",
+    "roscosmos.ru": "Roscosmos",
+    "cnsa.gov.cn": "CNSA",
+    "isro.gov.in": "ISRO",
+    "jaxa.jp": "JAXA",
+    "gov.uk/government/organisations/uk-space-agency": "UK Space Agency",
+    "cnes.fr": "CNES",
+    "dlr.de": "DLR",
+    "asi.it": "ASI",
+    "aeb.gov.br": "AEB",
+    "kari.re.kr": "KARI",
+    "space.gov.ae": "UAE Space Agency",
+    "australianspaceagency.gov.au": "Australian Space Agency",
+    "space.gov.il": "Israel Space Agency"
+}
+
+
+def notify_collision(user, cdm, collision, action):
+    """Emails the user about a new collision unless their organization's alert threshold filters it."""
+    user_email = getattr(user, 'email', None)
+    if not user_email:
+        return False
+
+    user_domain = user_email.split('@')[-1].lower()
+    org_name = SPACE_AGENCY_MAP.get(user_domain, None)
+
+    send_email_flag = True
+    if org_name:
+        try:
+            org_obj = Organization.objects.get(name=org_name)
+            if collision.probability_of_collision <= org_obj.alert_threshold:
+                send_email_flag = False
+        except Organization.DoesNotExist:
+            send_email_flag = False
+
+    if not (user.notifications and send_email_flag):
+        return False
+
+    subject = f"On-Orbit Collision Predictor Notification for Collision: {cdm.message_id}"
+    message = (
+        f"{action} CDM entry with the following details:\n"
+        f"A new collision was created with the following details:\n"
+        f"Message ID: {cdm.message_id}\n"
+        f"TCA: {cdm.tca}\n"
+        f"Miss Distance: {cdm.miss_distance}\n"
+        f"Collision ID: {collision.id}\n"
+        f"Probability of Collision: {collision.probability_of_collision}\n"
+    )
+    send_mail(subject, message, settings.EMAIL_HOST_USER, [user_email], fail_silently=False)
+    return True
+
+
+def run_pc_job(job_id):
+    """Computes the Collision of a queued job and sends its notification."""
+    close_old_connections()
+    try:
+        # Claim the job so that it runs once even if it was submitted twice
+        claimed = PcJob.objects.filter(id=job_id, status=PcJob.STATUS_QUEUED).update(
+            status=PcJob.STATUS_RUNNING, started_at=timezone.now()
+        )
+        if not claimed:
+            return
+        job = PcJob.objects.select_related('cdm', 'user').get(id=job_id)
+
+        try:
+            collision = Collision.upsert_from_cdm(job.cdm)
+        except Exception as e:
+            logger.exception("Pc job %s failed for CDM %s", job.id, job.cdm.message_id)
+            job.status = PcJob.STATUS_FAILED
+            job.error = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return
+
+        job.collision = collision
+        job.status = PcJob.STATUS_SUCCEEDED
+        if job.user is not None:
+            try:
+                notify_collision(job.user, job.cdm, collision, job.action)
+            except Exception as e:
+                # The Collision stands; only the email is lost
+                logger.exception("Notification for Pc job %s failed", job.id)
+                job.error = f"Notification failed: {e}"
+        job.finished_at = timezone.now()
+        job.save(update_fields=['collision', 'status', 'error', 'finished_at'])
+    finally:
+        close_old_connections()
+
+
+class PcJobPool:
+    """A bounded thread pool running PcJobs; `workers` = 0 runs them inline."""
+
+    def __init__(self, workers=2):
+        self.workers = max(int(workers), 0)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pc-job')
+            if self.workers else None
+        )
+
+    def submit(self, job):
+        """Runs the job once the current transaction (if any) has committed."""
+        transaction.on_commit(lambda: self._dispatch(job.id))
+
+    def _dispatch(self, job_id):
+        if self._executor is None:
+            run_pc_job(job_id)
+        else:
+            self._executor.submit(run_pc_job, job_id)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pc_job_pool():
+    """Returns the process-wide job pool, configured from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PcJobPool(workers=getattr(settings, 'PC_JOB_WORKERS', 2))
+    return _pool
+
+
+def queue_pc_job(cdm, user, action):
+    """Creates a PcJob for the CDM and hands it to the worker pool."""
+    job = PcJob.objects.create(cdm=cdm, user=user, action=action)
+    pc_job_pool().submit(job)
+    return job
@@ -0,0 +1,98 @@
+import json
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from api.pc import PC_BACKENDS, DEFAULT_REL_TOL, DEFAULT_HBR_TYPE
+from api.pc.alfano import ALFANO_CASES, load_alfano_cases, save_alfano_fixture
+from api.pc.benchmark import (
+    DEFAULT_BATCH_SIZES, DEFAULT_MAX_SECONDS, DEFAULT_TRADESPACE_SHAPE, benchmark_tradespace_scaling, run_benchmark
+)
+
+class Command(BaseCommand):
+    help = ("Benchmarks accuracy and throughput of every Pc backend on the Alfano (2009) test cases, and "
+            "optionally the tradespace process pool speedup versus worker count")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alfano-path', type=str, default=None, help="Directory holding the Alfano .xls files")
+        parser.add_argument('--fixture', type=str, default=None, help="JSON fixture with the Alfano cases (instead of --alfano-path)")
+        parser.add_argument('--save-fixture', type=str, default=None, help="Write the loaded cases to this JSON fixture")
+        parser.add_argument('--cases', type=int, nargs='+', default=sorted(ALFANO_CASES), help="Case numbers (1-12)")
+        parser.add_argument('--backends', type=str, nargs='+', default=None,
+                            help=f"Backends to run (default: all of {', '.join(sorted(PC_BACKENDS))})")
+        parser.add_argument('--reference', type=str, default='numpy', help="Backend used as the accuracy reference")
+        parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(DEFAULT_BATCH_SIZES))
+        parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS,
+                            help="Skip batch sizes expected to take longer than this per backend")
+        parser.add_argument('--rel-tol', type=float, default=DEFAULT_REL_TOL)
+        parser.add_argument('--hbr-type', type=str, default=DEFAULT_HBR_TYPE)
+        parser.add_argument('--tradespace-workers', type=int, nargs='+', default=None,
+                            help="Also time a tradespace grid on the process pool with these worker counts")
+        parser.add_argument('--tradespace-case', type=int, default=None, help="Case of the tradespace grid (default: first case)")
+        parser.add_argument('--tradespace-backend', type=str, default='numpy')
+        parser.add_argument('--tradespace-shape', type=int, nargs=2, default=list(DEFAULT_TRADESPACE_SHAPE),
+                            metavar=('N_T', 'N_DV'))
+        parser.add_argument('--tradespace-tile-rows', type=int, default=8)
+        parser.add_argument('--output', type=str, default='pc_benchmark.json', help="Path of the JSON report")
+
+    def handle(self, *args, **options):
+        if not options['alfano_path'] and not options['fixture']:
+            self.stdout.write(self.style.ERROR("Provide --alfano-path or --fixture."))
+            return
+        try:
+            cases = load_alfano_cases(options['alfano_path'], options['cases'], options['fixture'])
+        except (ImportError, OSError, ValueError) as e:
+            self.stdout.write(self.style.ERROR(f"Error loading Alfano test cases: {e}"))
+            return
+        if options['save_fixture']:
+            save_alfano_fixture(cases, options['save_fixture'])
+            self.stdout.write(f"Saved {len(cases)} cases to {options['save_fixture']}")
+
+        try:
+            report = run_benchmark(
+                cases, options['backends'], options['reference'], options['batch_sizes'],
+                options['max_seconds'], options['rel_tol'], options['hbr_type'], log=self.stdout.write
+            )
+        except ImproperlyConfigured as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
+
+        for name, result in report['backends'].items():
+            if not result['available']:
+                continue
+            accuracy = result['accuracy']
+            self.stdout.write(
+                f"{name}: max rel error vs Monte Carlo {accuracy['max_rel_error_monte_carlo']:.3e}, "
+                f"vs {report['reference']} {accuracy['max_rel_diff_reference']:.3e}"
+            )
+            for entry in result['throughput']:
+                if 'skipped' in entry:
+                    self.stdout.write(f"  batch {entry['batch_size']:>8}: skipped ({entry['skipped']})")
+                else:
+                    self.stdout.write(
+                        f"  batch {entry['batch_size']:>8}: {entry['seconds']:.4f}s "
+                        f"({entry['conjunctions_per_second']:.0f} conjunctions/s)"
+                    )
+
+        if options['tradespace_workers']:
+            case = next(
+                (case for case in cases if case['casenum'] == options['tradespace_case']), cases[0]
+            )
+            try:
+                scaling = benchmark_tradespace_scaling(
+                    case, options['tradespace_backend'], options['tradespace_workers'],
+                    tuple(options['tradespace_shape']), options['tradespace_tile_rows'],
+                    RelTol=options['rel_tol'], HBRType=options['hbr_type'], log=self.stdout.write
+                )
+            except (ImproperlyConfigured, ValueError) as e:
+                self.stdout.write(self.style.ERROR(f"Tradespace benchmark failed: {e}"))
+            else:
+                report['tradespace_scaling'] = scaling
+                self.stdout.write(f"tradespace: in process {scaling['in_process_seconds']:.3f}s")
+                for entry in scaling['pool']:
+                    self.stdout.write(
+                        f"  {entry['workers']:>3} workers: {entry['seconds']:.3f}s "
+                        f"(speedup {entry['speedup']:.2f}x, max diff {entry['max_abs_diff_first']:.1e})"
+                    )
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}"))
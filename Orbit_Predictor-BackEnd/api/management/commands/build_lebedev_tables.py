@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from api.pc.lebedev import LEBEDEV_SOURCE, LEBEDEV_TABLES, build_lebedev_tables
+
+class Command(BaseCommand):
+    help = "Regenerates the Lebedev quadrature tables used by the 3D Hall Pc backend from getLebedevSphere.m"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default=str(LEBEDEV_TABLES), help="Path of the .npz archive to write")
+
+    def handle(self, *args, **options):
+        try:
+            degrees = build_lebedev_tables(options['output'], LEBEDEV_SOURCE)
+        except (OSError, ValueError) as e:
+            self.stdout.write(self.style.ERROR(f"Error building Lebedev tables: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(degrees)} Lebedev degrees ({degrees[0]} to {degrees[-1]}) to {options['output']}"
+        ))
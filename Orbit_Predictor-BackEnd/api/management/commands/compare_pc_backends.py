@@ -0,0 +1,42 @@
+import numpy as np
+from django.core.management.base import BaseCommand
+from api.models import CDM
+from api.pc import get_pc_backend, cdm_pc_batch_inputs, DEFAULT_REL_TOL, DEFAULT_HBR_TYPE
+
+class Command(BaseCommand):
+    help = "Compares Pc values from two Pc backends over the CDMs in the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reference', type=str, default='matlab', help="Reference Pc backend")
+        parser.add_argument('--candidate', type=str, default='numpy', help="Pc backend under validation")
+        parser.add_argument('--rel-tol', type=float, default=1e-8, help="Maximum allowed relative difference")
+        parser.add_argument('--hbr-type', type=str, default=DEFAULT_HBR_TYPE, help="circle, square or squareEquArea")
+        parser.add_argument('--limit', type=int, default=None, help="Only compare the first N CDMs")
+
+    def handle(self, *args, **options):
+        cdms = list(CDM.objects.order_by('id')[:options['limit']])
+        if not cdms:
+            self.stdout.write(self.style.WARNING("No CDMs to compare."))
+            return
+
+        inputs = cdm_pc_batch_inputs(cdms)
+        with get_pc_backend(options['reference'], cached=False) as reference:
+            expected = reference.compute(*inputs, DEFAULT_REL_TOL, options['hbr_type'])
+        with get_pc_backend(options['candidate'], cached=False) as candidate:
+            actual = candidate.compute(*inputs, DEFAULT_REL_TOL, options['hbr_type'])
+
+        rel_diff = np.abs(actual - expected) / np.maximum(np.abs(expected), np.finfo(float).tiny)
+        failures = 0
+        for cdm, pc_ref, pc_new, diff in zip(cdms, expected, actual, rel_diff):
+            if diff > options['rel_tol'] or np.isnan(pc_ref) != np.isnan(pc_new):
+                failures += 1
+                self.stdout.write(self.style.ERROR(
+                    f"{cdm.message_id}: {options['reference']}={pc_ref:.12e} "
+                    f"{options['candidate']}={pc_new:.12e} rel_diff={diff:.3e}"
+                ))
+
+        self.stdout.write(f"Compared {len(cdms)} CDMs, max relative difference {np.nanmax(rel_diff):.3e}")
+        if failures:
+            self.stdout.write(self.style.ERROR(f"{failures} CDMs exceed the relative tolerance {options['rel_tol']:g}."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All CDMs agree within tolerance."))
@@ -0,0 +1,65 @@
+import json
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from api.pc import pc2d_foster, pc2d_series, DEFAULT_REL_TOL
+from api.pc.alfano import ALFANO_CASES, get_alfano_test_case
+
+class Command(BaseCommand):
+    help = "Reports the accuracy of the series Pc evaluator against the Foster integral on the Alfano (2009) test cases"
+
+    def add_arguments(self, parser):
+        parser.add_argument('data_path', type=str, help="Directory holding the Alfano 'Case<N> data at ...xls' files")
+        parser.add_argument('--cases', type=int, nargs='+', default=sorted(ALFANO_CASES), help="Case numbers (1-12)")
+        parser.add_argument('--rel-tol', type=float, default=DEFAULT_REL_TOL, help="RelTol for both evaluators")
+        parser.add_argument('--json', type=str, default=None, help="Also write the report to this JSON file")
+
+    def handle(self, *args, **options):
+        try:
+            cases = [get_alfano_test_case(casenum, options['data_path']) for casenum in options['cases']]
+        except (ImportError, OSError, ValueError) as e:
+            self.stdout.write(self.style.ERROR(f"Error loading Alfano test cases: {e}"))
+            return
+
+        # Conjunction-plane Pc at TCA for every case in one batch
+        inputs = [np.array([case[key] for case in cases]) for key in ('R1o', 'V1o', 'P1o', 'R2o', 'V2o', 'P2o', 'HBR')]
+        start = time.perf_counter()
+        foster, _, _, _ = pc2d_foster(*inputs, options['rel_tol'], 'circle')
+        foster_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        series, series_error, _, _ = pc2d_series(*inputs, options['rel_tol'])
+        series_seconds = time.perf_counter() - start
+
+        rows = []
+        for case, pc_foster, pc_series, error in zip(cases, foster, series, series_error):
+            rel_diff = abs(pc_series - pc_foster) / max(abs(pc_foster), np.finfo(float).tiny)
+            rows.append({
+                "case": case['casenum'],
+                "desc": case['desc'],
+                "HBR": case['HBR'],
+                "pc_monte_carlo": case['PC_MC_10e8'],
+                "pc_foster": float(pc_foster),
+                "pc_series": float(pc_series),
+                "series_error_bound": float(error),
+                "rel_diff": float(rel_diff),
+            })
+            self.stdout.write(
+                f"Case {case['casenum']:2d} ({case['desc']}): foster={pc_foster:.10e} series={pc_series:.10e} "
+                f"bound={error:.2e} rel_diff={rel_diff:.2e} MC={case['PC_MC_10e8']:.9f}"
+            )
+
+        report = {
+            "rel_tol": options['rel_tol'],
+            "foster_seconds": foster_seconds,
+            "series_seconds": series_seconds,
+            "max_rel_diff": max(row["rel_diff"] for row in rows),
+            "cases": rows,
+        }
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Max relative difference {report['max_rel_diff']:.3e} over {len(rows)} cases "
+            f"(foster {foster_seconds:.4f}s, series {series_seconds:.4f}s)"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from api.jobs import run_pc_job
+from api.models import PcJob
+
+class Command(BaseCommand):
+    help = "Runs queued Pc jobs, e.g. those left behind when the server stopped before its worker pool finished"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requeue-running', action='store_true',
+                            help="Also rerun jobs marked running (only safe when no server is processing jobs)")
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = PcJob.objects.filter(status=PcJob.STATUS_RUNNING).update(status=PcJob.STATUS_QUEUED)
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} running jobs")
+
+        job_ids = list(PcJob.objects.filter(status=PcJob.STATUS_QUEUED).order_by('id').values_list('id', flat=True))
+        for job_id in job_ids:
+            run_pc_job(job_id)
+
+        failed = PcJob.objects.filter(id__in=job_ids, status=PcJob.STATUS_FAILED).count()
+        self.stdout.write(self.style.SUCCESS(f"Ran {len(job_ids)} Pc jobs ({failed} failed)"))
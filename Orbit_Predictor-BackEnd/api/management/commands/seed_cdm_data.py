@@ -1,92 +1,185 @@
-import os
 import json
+import os
+from collections import deque
+from itertools import islice
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from api.models import CDM
+from api.ingest import (
+    SEED_UPDATE_FIELDS, STATUS_CREATED, STATUS_ERROR, STATUS_SUPERSEDED, STATUS_UNCHANGED, STATUS_UPDATED,
+    compute_chunk_pc, expand_cdm_paths, iter_cdm_file, seed_cdm_fields, split_unchanged, upsert_cdms, validate_chunk
+)
+from api.models import Collision
+from api.pc import cdm_pc_batch_inputs
+from api.tradespace.parallel import create_process_pool
 
 class Command(BaseCommand):
-    help = "Seeds CDM data from JSON files into the database"
+    help = (
+        "Seeds CDM data from JSON / NDJSON / CCSDS KVN or XML files, directories or glob patterns into the database, "
+        "in transaction-sized chunks, optionally computing Collisions"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
-            '--file', type=str, help="Path to the JSON file containing CDM data"
+            'paths', nargs='*', help="CDM files, directories or glob patterns (e.g. 'api/sample_data/oct5_data/*.json')"
+        )
+        parser.add_argument(
+            '--file', type=str, action='append', default=[], help="Path to a JSON file containing CDM data (repeatable)"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help="CDMs upserted per transaction (default: CDM_BULK_CHUNK_SIZE)"
+        )
+        parser.add_argument('--collisions', action='store_true', help="Also compute a Collision for every CDM")
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help="Worker processes computing Collision Pc while loading continues (0 computes it inline)"
+        )
+        parser.add_argument(
+            '--checkpoint', type=str, default=None,
+            help="JSON file recording progress; an interrupted load rerun with the same checkpoint resumes"
         )
 
     def handle(self, *args, **options):
-        json_file = options['file']
-        
-        if not json_file:
-            self.stdout.write(self.style.ERROR("Please provide a JSON file path using --file"))
+        patterns = options['paths'] + options['file']
+        if not patterns:
+            self.stdout.write(self.style.ERROR("Please provide CDM files, directories or globs (or --file)"))
+            return
+        try:
+            paths = expand_cdm_paths(patterns)
+        except FileNotFoundError as e:
+            self.stdout.write(self.style.ERROR(f"File not found: {e}"))
+            return
+        if options['checkpoint']:
+            # The checkpoint may sit next to the data it tracks
+            paths = [path for path in paths if os.path.abspath(path) != os.path.abspath(options['checkpoint'])]
+
+        chunk_size = options['chunk_size'] or getattr(settings, 'CDM_BULK_CHUNK_SIZE', 500)
+        if chunk_size < 1:
+            self.stdout.write(self.style.ERROR("--chunk-size must be at least 1"))
             return
+        self.collisions = options['collisions']
+        self.checkpoint_path = options['checkpoint']
+        self.checkpoint = self.load_checkpoint()
+        self.totals = {
+            status: 0 for status in (STATUS_CREATED, STATUS_UPDATED, STATUS_UNCHANGED, STATUS_SUPERSEDED, STATUS_ERROR)
+        }
+        self.pool = create_process_pool(options['workers']) if self.collisions and options['workers'] > 0 else None
+        # Chunks whose Collisions are still being computed, oldest first
+        self.pending = deque()
+        self.max_pending = 2 * options['workers']
 
-        # Check if the file exists
-        if not os.path.exists(json_file):
-            self.stdout.write(self.style.ERROR(f"File not found: {json_file}"))
+        try:
+            for path in paths:
+                self.seed_file(path, chunk_size)
+            self.drain(block=True)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown(cancel_futures=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            "Data seeding completed: " + ", ".join(f"{count} {status}" for status, count in self.totals.items())
+        ))
+
+    def seed_file(self, path, chunk_size):
+        key = os.path.abspath(path)
+        done = self.checkpoint['files'].get(key, 0)
+        if done is True:
+            self.stdout.write(f"Skipping {path} (already loaded)")
+            return
+        if done:
+            self.stdout.write(f"Resuming {path} after {done} messages")
+
+        try:
+            messages = enumerate(iter_cdm_file(path))
+            for _ in islice(messages, done):
+                pass
+            while True:
+                chunk = list(islice(messages, chunk_size))
+                if not chunk:
+                    break
+                self.seed_chunk(key, chunk)
+        except (OSError, ValueError) as e:
+            self.stdout.write(self.style.ERROR(f"Error reading {path}: {e}"))
             return
-        
-        # Load the JSON data
-        with open(json_file, 'r') as file:
-            data = json.load(file)
-
-        # Seed data into the database
-        for item in data:
-            cdm, created = CDM.objects.update_or_create(
-                message_id=item['MESSAGE_ID'],
-                defaults={
-                    "ccsds_cdm_version": item.get("CCSDS_CDM_VERS"),
-                    "creation_date": item.get("CREATION_DATE"),
-                    "originator": item.get("ORIGINATOR"),
-                    "tca": item.get("TCA"),
-                    "miss_distance": float(item.get("MISS_DISTANCE", 0)),
-
-                    # Satellite 1 details
-                    "sat1_object": item.get("SAT1_OBJECT"),
-                    "sat1_object_designator": item.get("SAT1_OBJECT_DESIGNATOR"),
-                    "sat1_maneuverable": item.get("SAT1_MANEUVERABLE"),
-                    "sat1_x": float(item.get("SAT1_X", 0)),
-                    "sat1_y": float(item.get("SAT1_Y", 0)),
-                    "sat1_z": float(item.get("SAT1_Z", 0)),
-                    "sat1_x_dot": float(item.get("SAT1_X_DOT", 0)),
-                    "sat1_y_dot": float(item.get("SAT1_Y_DOT", 0)),
-                    "sat1_z_dot": float(item.get("SAT1_Z_DOT", 0)),
-
-                    # Covariance matrix for Satellite 1
-                    "sat1_cov_rr": float(item.get("SAT1_CR_R", 0)),
-                    "sat1_cov_rt": float(item.get("SAT1_CT_R", 0)),
-                    "sat1_cov_rn": float(item.get("SAT1_CN_R", 0)),
-                    "sat1_cov_tr": float(item.get("SAT1_CR_T", 0)),
-                    "sat1_cov_tt": float(item.get("SAT1_CT_T", 0)),
-                    "sat1_cov_tn": float(item.get("SAT1_CN_T", 0)),
-                    "sat1_cov_nr": float(item.get("SAT1_CR_N", 0)),
-                    "sat1_cov_nt": float(item.get("SAT1_CT_N", 0)),
-                    "sat1_cov_nn": float(item.get("SAT1_CN_N", 0)),
-
-                    # Satellite 2 details
-                    "sat2_object": item.get("SAT2_OBJECT"),
-                    "sat2_object_designator": item.get("SAT2_OBJECT_DESIGNATOR"),
-                    "sat2_maneuverable": item.get("SAT2_MANEUVERABLE"),
-                    "sat2_x": float(item.get("SAT2_X", 0)),
-                    "sat2_y": float(item.get("SAT2_Y", 0)),
-                    "sat2_z": float(item.get("SAT2_Z", 0)),
-                    "sat2_x_dot": float(item.get("SAT2_X_DOT", 0)),
-                    "sat2_y_dot": float(item.get("SAT2_Y_DOT", 0)),
-                    "sat2_z_dot": float(item.get("SAT2_Z_DOT", 0)),
-
-                    # Covariance matrix for Satellite 2
-                    "sat2_cov_rr": float(item.get("SAT2_CR_R", 0)),
-                    "sat2_cov_rt": float(item.get("SAT2_CT_R", 0)),
-                    "sat2_cov_rn": float(item.get("SAT2_CN_R", 0)),
-                    "sat2_cov_tr": float(item.get("SAT2_CR_T", 0)),
-                    "sat2_cov_tt": float(item.get("SAT2_CT_T", 0)),
-                    "sat2_cov_tn": float(item.get("SAT2_CN_T", 0)),
-                    "sat2_cov_nr": float(item.get("SAT2_CR_N", 0)),
-                    "sat2_cov_nt": float(item.get("SAT2_CT_N", 0)),
-                    "sat2_cov_nn": float(item.get("SAT2_CN_N", 0)),
-
-                    # Hard Body Radius (if present in JSON data)
-                    "hard_body_radius": float(item.get("HBR", 0))
-                }
+        # The file is marked done once its last chunk is finished
+        self.pending.append((key, True, [], [], None))
+        self.drain()
+
+    def seed_chunk(self, key, chunk):
+        results, latest = validate_chunk(chunk, seed_cdm_fields)
+        rewrites = {}
+        if latest:
+            # CDMs stored with the same Pc inputs keep their Collision, and are rewritten only if something else changed
+            unchanged, rewrites = split_unchanged(latest, SEED_UPDATE_FIELDS, require_collision=self.collisions)
+            results.update(unchanged)
+        for result in results.values():
+            self.totals[result['status']] += 1
+            if result['status'] == STATUS_ERROR:
+                self.stdout.write(self.style.ERROR(
+                    f"Message {result['index']} ({result['message_id']}): {result['error']}"
+                ))
+
+        saved, existing = [], set()
+        if latest or rewrites:
+            saved, existing = upsert_cdms(
+                [cdm for _, cdm in latest.values()] + [cdm for _, cdm, _ in rewrites.values()], SEED_UPDATE_FIELDS
+            )
+            Collision.sync_designators(saved[len(latest):])
+        self.totals[STATUS_UPDATED] += len(existing)
+        self.totals[STATUS_CREATED] += len(saved) - len(existing)
+
+        # Only CDMs with new Pc inputs need a Collision
+        cdms = saved[:len(latest)]
+        future = None
+        if self.collisions and cdms and self.pool is not None:
+            future = self.pool.submit(Collision.compute_pc_inputs, cdm_pc_batch_inputs(cdms))
+        self.pending.append((key, chunk[-1][0] + 1, saved, cdms, future))
+        self.drain()
+
+    def drain(self, block=False):
+        """Finishes chunks in order, waiting only when too many are computing (or for all of them if `block`)."""
+        while self.pending:
+            future = self.pending[0][4]
+            if not block and future is not None and not future.done() and len(self.pending) <= self.max_pending:
+                return
+            self.finish_chunk()
+
+    def finish_chunk(self):
+        key, position, saved, cdms, future = self.pending.popleft()
+        if self.collisions and cdms:
+            batch = None
+            if future is not None:
+                try:
+                    batch = future.result()
+                except Exception:
+                    pass  # compute_chunk_pc() retries the chunk in this process
+            pc, errors = compute_chunk_pc(cdms, batch)
+            for message_id, error in errors.items():
+                self.stdout.write(self.style.ERROR(f"{message_id}: {error}"))
+            computed = [cdm for cdm in cdms if cdm.message_id in pc]
+            Collision.upsert_from_cdms(
+                computed, [pc[cdm.message_id][0] for cdm in computed], [pc[cdm.message_id][1] for cdm in computed]
             )
-            action = "Created" if created else "Updated"
-            self.stdout.write(self.style.SUCCESS(f"{action} CDM entry with MESSAGE_ID: {cdm.message_id}"))
-        
-        self.stdout.write(self.style.SUCCESS("Data seeding completed."))
+
+        # Progress is recorded only once a chunk's CDMs and Collisions are stored
+        self.checkpoint['files'][key] = position
+        self.save_checkpoint()
+        if position is True:
+            self.stdout.write(self.style.SUCCESS(f"Loaded {key}"))
+        else:
+            self.stdout.write(f"Loaded {len(saved)} CDMs ({position} messages read) from {os.path.basename(key)}")
+
+    def load_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        return {'files': {}}
+
+    def save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_user_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PcResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('probability_of_collision', models.FloatField()),
+                ('method', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_pcresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collision',
+            name='pc_method',
+            field=models.CharField(choices=[('integrated', 'Full integration'), ('upper_bound', 'Screening upper bound')], default='integrated', max_length=20),
+        ),
+    ]
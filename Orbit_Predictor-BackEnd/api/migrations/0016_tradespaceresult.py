@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_pcjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradespaceResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('cdm_version', models.CharField(max_length=64)),
+                ('backend', models.CharField(max_length=50)),
+                ('rel_tol', models.FloatField()),
+                ('hbr_type', models.CharField(max_length=20)),
+                ('t_min_hours', models.FloatField()),
+                ('t_max_hours', models.FloatField()),
+                ('dv_min', models.FloatField()),
+                ('dv_max', models.FloatField()),
+                ('time_values', models.BinaryField()),
+                ('dv_values', models.BinaryField()),
+                ('pc', models.BinaryField()),
+                ('original_pc', models.FloatField()),
+                ('original_miss_distance', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cdm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tradespace_results', to='api.cdm')),
+            ],
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:53
+
+import hashlib
+
+import numpy as np
+from django.db import migrations, models
+
+COVARIANCE_ELEMENTS = ('rr', 'rt', 'rn', 'tr', 'tt', 'tn', 'nr', 'nt', 'nn')
+
+
+def content_hash(cdm):
+    # Same digest as api.pc.cdm_content_hash, from the fields of this migration's state
+    values = []
+    for sat in ('sat1', 'sat2'):
+        values.append([getattr(cdm, f'{sat}_{axis}') for axis in ('x', 'y', 'z')])
+        values.append([getattr(cdm, f'{sat}_{axis}_dot') for axis in ('x', 'y', 'z')])
+        values.append(np.reshape([getattr(cdm, f'{sat}_cov_{element}') for element in COVARIANCE_ELEMENTS], (3, 3)))
+    r1, v1, cov1, r2, v2, cov2 = values
+    digest = hashlib.sha256()
+    for value in (r1, v1, cov1, r2, v2, cov2, cdm.hard_body_radius):
+        digest.update(np.ascontiguousarray(np.asarray(value, dtype=float) + 0.0).tobytes())
+    return digest.hexdigest()
+
+
+def hash_existing_cdms(apps, schema_editor):
+    CDM = apps.get_model('api', 'CDM')
+    batch = []
+    for cdm in CDM.objects.iterator(chunk_size=2000):
+        cdm.content_hash = content_hash(cdm)
+        batch.append(cdm)
+        if len(batch) == 2000:
+            CDM.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    CDM.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_tradespaceresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cdm',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(hash_existing_cdms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def keep_latest_collision(apps, schema_editor):
+    # Collision becomes one row per CDM: the newest is kept and the older
+    # results of the same CDM move to CollisionHistory
+    Collision = apps.get_model('api', 'Collision')
+    CollisionHistory = apps.get_model('api', 'CollisionHistory')
+    PcJob = apps.get_model('api', 'PcJob')
+    duplicated = (
+        Collision.objects.values('cdm_id').annotate(count=Count('id'), latest=Max('id')).filter(count__gt=1)
+    )
+    for row in duplicated.iterator():
+        older = Collision.objects.filter(cdm_id=row['cdm_id']).exclude(id=row['latest']).order_by('id')
+        CollisionHistory.objects.bulk_create([
+            CollisionHistory(
+                cdm_id=collision.cdm_id,
+                computed_at=collision.computed_at,
+                probability_of_collision=collision.probability_of_collision,
+                pc_method=collision.pc_method,
+            )
+            for collision in older
+        ])
+        PcJob.objects.filter(collision__in=older).update(collision_id=row['latest'])
+        older.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_cdm_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='collision',
+            name='computed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='CollisionHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField()),
+                ('probability_of_collision', models.FloatField()),
+                ('pc_method', models.CharField(max_length=20)),
+                ('cdm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collision_history', to='api.cdm')),
+            ],
+        ),
+        migrations.RunPython(keep_latest_collision, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_collision_history'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='collision',
+            name='cdm',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='collision', to='api.cdm'),
+        ),
+    ]
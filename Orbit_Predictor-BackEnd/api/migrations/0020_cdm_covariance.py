@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:59
+
+import api.pc.inputs
+import numpy as np
+from django.db import migrations, models
+
+COVARIANCE_FIELDS = tuple(
+    f'{sat}_cov_{element}'
+    for sat in ('sat1', 'sat2') for element in ('rr', 'rt', 'rn', 'tr', 'tt', 'tn', 'nr', 'nt', 'nn')
+)
+
+
+def pack_covariances(apps, schema_editor):
+    # Same layout as api.pc.inputs.pack_covariances; missing elements become NaN
+    CDM = apps.get_model('api', 'CDM')
+    batch = []
+    for cdm in CDM.objects.only(*COVARIANCE_FIELDS).iterator(chunk_size=2000):
+        values = [getattr(cdm, name) for name in COVARIANCE_FIELDS]
+        cdm.covariance = np.array(values, dtype=float).astype('<f8').tobytes()
+        batch.append(cdm)
+        if len(batch) == 2000:
+            CDM.objects.bulk_update(batch, ['covariance'])
+            batch = []
+    CDM.objects.bulk_update(batch, ['covariance'])
+
+
+def unpack_covariances(apps, schema_editor):
+    CDM = apps.get_model('api', 'CDM')
+    batch = []
+    for cdm in CDM.objects.only('covariance').iterator(chunk_size=2000):
+        for name, value in zip(COVARIANCE_FIELDS, np.frombuffer(cdm.covariance, dtype='<f8')):
+            setattr(cdm, name, None if np.isnan(value) else float(value))
+        batch.append(cdm)
+        if len(batch) == 2000:
+            CDM.objects.bulk_update(batch, COVARIANCE_FIELDS)
+            batch = []
+    CDM.objects.bulk_update(batch, COVARIANCE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_alter_collision_cdm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cdm',
+            name='covariance',
+            field=models.BinaryField(default=api.pc.inputs.null_covariance),
+        ),
+        migrations.RunPython(pack_covariances, unpack_covariances),
+    ]
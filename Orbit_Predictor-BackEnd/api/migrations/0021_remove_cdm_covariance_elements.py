@@ -0,0 +1,85 @@
+# Generated by Django 5.1.3 on 2026-10-18 00:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_cdm_covariance'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_rr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_rt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_rn',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_tr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_tt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_tn',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_nr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_nt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_cov_nn',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_rr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_rt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_rn',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_tr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_tt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_tn',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_nr',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_nt',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_cov_nn',
+        ),
+    ]
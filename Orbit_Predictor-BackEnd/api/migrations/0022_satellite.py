@@ -0,0 +1,64 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+CATALOG_FIELDS = ('catalog_name', 'object_name', 'international_designator', 'object_type', 'operator_organization')
+
+
+def create_satellites(apps, schema_editor):
+    # One Satellite per designator; each value comes from the latest CDM that has it
+    CDM = apps.get_model('api', 'CDM')
+    Satellite = apps.get_model('api', 'Satellite')
+    catalog = {}
+    for sat in ('sat1', 'sat2'):
+        columns = [f'{sat}_{name}' for name in CATALOG_FIELDS]
+        rows = CDM.objects.order_by('creation_date', 'id').values_list(
+            'creation_date', 'id', f'{sat}_object_designator', *columns
+        )
+        for created, cdm_id, designator, *values in rows.iterator(chunk_size=2000):
+            entry = catalog.setdefault(designator, {})
+            for name, value in zip(CATALOG_FIELDS, values):
+                if value is not None and (name not in entry or entry[name][0] <= (created, cdm_id)):
+                    entry[name] = ((created, cdm_id), value)
+    Satellite.objects.bulk_create(
+        [
+            Satellite(object_designator=designator, **{name: value for name, (_, value) in entry.items()})
+            for designator, entry in catalog.items()
+        ],
+        batch_size=2000,
+    )
+
+
+def restore_cdm_columns(apps, schema_editor):
+    CDM = apps.get_model('api', 'CDM')
+    Satellite = apps.get_model('api', 'Satellite')
+    values = {}
+    for sat in ('sat1', 'sat2'):
+        for name in CATALOG_FIELDS:
+            values[f'{sat}_{name}'] = Subquery(
+                Satellite.objects.filter(pk=OuterRef(f'{sat}_object_designator')).values(name)[:1]
+            )
+    CDM.objects.update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_remove_cdm_covariance_elements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Satellite',
+            fields=[
+                ('object_designator', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('catalog_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('object_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('international_designator', models.CharField(blank=True, max_length=100, null=True)),
+                ('object_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('operator_organization', models.CharField(blank=True, db_index=True, max_length=100, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_satellites, restore_cdm_columns),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-18 01:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_satellite'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='cdm',
+            old_name='sat1_object_designator',
+            new_name='sat1',
+        ),
+        migrations.AlterField(
+            model_name='cdm',
+            name='sat1',
+            field=models.ForeignKey(db_column='sat1_object_designator', on_delete=django.db.models.deletion.PROTECT, related_name='cdms_as_sat1', to='api.satellite'),
+        ),
+        migrations.RenameField(
+            model_name='cdm',
+            old_name='sat2_object_designator',
+            new_name='sat2',
+        ),
+        migrations.AlterField(
+            model_name='cdm',
+            name='sat2',
+            field=models.ForeignKey(db_column='sat2_object_designator', on_delete=django.db.models.deletion.PROTECT, related_name='cdms_as_sat2', to='api.satellite'),
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_catalog_name',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_object_name',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_international_designator',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_object_type',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat1_operator_organization',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_catalog_name',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_object_name',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_international_designator',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_object_type',
+        ),
+        migrations.RemoveField(
+            model_name='cdm',
+            name='sat2_operator_organization',
+        ),
+    ]
@@ -1,5 +1,10 @@
 from .collision import Collision
+from .collision_history import CollisionHistory
 from .probability_calc import ProbabilityCalc
+from .satellite import Satellite
 from .cdm import CDM
 from .user import User
 from .organization import Organization
+from .pc_result import PcResult
+from .pc_job import PcJob
+from .tradespace_result import TradespaceResult
@@ -1,4 +1,13 @@
+import math
+
+import numpy as np
 from django.db import models
+from ..pc import cdm_content_hash, null_covariance, pack_covariances, unpack_covariances
+from .satellite import CATALOG_FIELDS, Satellite
+
+COVARIANCE_ELEMENTS = ('rr', 'rt', 'rn', 'tr', 'tt', 'tn', 'nr', 'nt', 'nn')
+# Element names, in packed order
+COVARIANCE_FIELDS = tuple(f'{sat}_cov_{element}' for sat in ('sat1', 'sat2') for element in COVARIANCE_ELEMENTS)
 
 class CDM(models.Model):
     # Basic Metadata
@@ -14,7 +23,10 @@ class CDM(models.Model):
 
     # Satellite 1 Details
     sat1_object = models.CharField(max_length=50)
-    sat1_object_designator = models.CharField(max_length=50)
+    # Catalog entry of the object (column sat1_object_designator)
+    sat1 = models.ForeignKey(
+        Satellite, on_delete=models.PROTECT, related_name='cdms_as_sat1', db_column='sat1_object_designator'
+    )
     sat1_maneuverable = models.CharField(max_length=3)  # "YES" or "NO"
     sat1_x = models.FloatField()  # X position
     sat1_y = models.FloatField()  # Y position
@@ -23,29 +35,16 @@ class CDM(models.Model):
     sat1_y_dot = models.FloatField()  # Y velocity
     sat1_z_dot = models.FloatField()  # Z velocity
 
-    # Covariance matrix elements for Satellite 1
-    sat1_cov_rr = models.FloatField(null=True, blank=True)  # Covariance rr element
-    sat1_cov_rt = models.FloatField(null=True, blank=True)  # Covariance rt element
-    sat1_cov_rn = models.FloatField(null=True, blank=True)  # Covariance rn element
-    sat1_cov_tr = models.FloatField(null=True, blank=True)  # Covariance tr element
-    sat1_cov_tt = models.FloatField(null=True, blank=True)  # Covariance tt element
-    sat1_cov_tn = models.FloatField(null=True, blank=True)  # Covariance tn element
-    sat1_cov_nr = models.FloatField(null=True, blank=True)  # Covariance nr element
-    sat1_cov_nt = models.FloatField(null=True, blank=True)  # Covariance nt element
-    sat1_cov_nn = models.FloatField(null=True, blank=True)  # Covariance nn element
-
     # Additional Satellite 1 Details
-    sat1_catalog_name = models.CharField(max_length=100, null=True, blank=True)
-    sat1_object_name = models.CharField(max_length=100, null=True, blank=True)
-    sat1_international_designator = models.CharField(max_length=100, null=True, blank=True)
-    sat1_object_type = models.CharField(max_length=100, null=True, blank=True)
-    sat1_operator_organization = models.CharField(max_length=100, null=True, blank=True)
     sat1_covariance_method = models.CharField(max_length=100, null=True, blank=True)
     sat1_reference_frame = models.CharField(max_length=100, null=True, blank=True)
 
     # Satellite 2 Details
     sat2_object = models.CharField(max_length=50)
-    sat2_object_designator = models.CharField(max_length=50)
+    # Catalog entry of the object (column sat2_object_designator)
+    sat2 = models.ForeignKey(
+        Satellite, on_delete=models.PROTECT, related_name='cdms_as_sat2', db_column='sat2_object_designator'
+    )
     sat2_maneuverable = models.CharField(max_length=3)  # "YES" or "NO"
     sat2_x = models.FloatField()  # X position
     sat2_y = models.FloatField()  # Y position
@@ -55,27 +54,103 @@ class CDM(models.Model):
     sat2_z_dot = models.FloatField()  # Z velocity
 
     # Additional Satellite 2 Details
-    sat2_catalog_name = models.CharField(max_length=100, null=True, blank=True)
-    sat2_object_name = models.CharField(max_length=100, null=True, blank=True)
-    sat2_international_designator = models.CharField(max_length=100, null=True, blank=True)
-    sat2_object_type = models.CharField(max_length=100, null=True, blank=True)
-    sat2_operator_organization = models.CharField(max_length=100, null=True, blank=True)
     sat2_covariance_method = models.CharField(max_length=100, null=True, blank=True)
     sat2_reference_frame = models.CharField(max_length=100, null=True, blank=True)
 
-    # Covariance matrix elements for Satellite 2
-    sat2_cov_rr = models.FloatField(null=True, blank=True)  # Covariance rr element
-    sat2_cov_rt = models.FloatField(null=True, blank=True)  # Covariance rt element
-    sat2_cov_rn = models.FloatField(null=True, blank=True)  # Covariance rn element
-    sat2_cov_tr = models.FloatField(null=True, blank=True)  # Covariance tr element
-    sat2_cov_tt = models.FloatField(null=True, blank=True)  # Covariance tt element
-    sat2_cov_tn = models.FloatField(null=True, blank=True)  # Covariance tn element
-    sat2_cov_nr = models.FloatField(null=True, blank=True)  # Covariance nr element
-    sat2_cov_nt = models.FloatField(null=True, blank=True)  # Covariance nt element
-    sat2_cov_nn = models.FloatField(null=True, blank=True)  # Covariance nn element
+    # Position covariances of both objects, packed as in api.pc.inputs; the
+    # sat1_cov_* / sat2_cov_* attributes read and write single elements
+    covariance = models.BinaryField(default=null_covariance)
 
     # Hard Body Radius
     hard_body_radius = models.FloatField(default=20)  # Hard Body Radius (HBR)
 
+    # sha256 of the Pc inputs (states, covariances, HBR); re-ingesting identical content is skipped
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+
+    @property
+    def covariances(self):
+        """Read-only (2, 3, 3) view of the packed covariances (object 1 first)."""
+        return unpack_covariances(self.covariance)
+
+    @covariances.setter
+    def covariances(self, values):
+        self.covariance = pack_covariances(values)
+
+    def catalog_values(self):
+        """
+        Yields (object_designator, {field: value}) for both objects, with the
+        catalog values set on this CDM (through sat1_<field> / sat2_<field>)
+        and not yet stored on the Satellite.
+        """
+        pending = self.__dict__.get('_catalog_values', {})
+        for sat in ('sat1', 'sat2'):
+            designator = getattr(self, f'{sat}_id')
+            if designator is not None:
+                values = pending.get(sat, {})
+                yield designator, {name: value for name, value in values.items() if value is not None}
+
+    def save(self, *args, **kwargs):
+        self.content_hash = cdm_content_hash(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content_hash' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['content_hash']
+        Satellite.upsert_from_cdms([self])
+        super().save(*args, **kwargs)
+        self.__dict__.pop('_catalog_values', None)
+        # Catalog entries loaded before the upsert are stale
+        self._state.fields_cache.pop('sat1', None)
+        self._state.fields_cache.pop('sat2', None)
+
     def __str__(self):
         return f"CDM {self.message_id} between {self.sat1_object} and {self.sat2_object}"
+
+
+def _covariance_element(index):
+    # Missing elements are stored as NaN and read back as None
+    def get(cdm):
+        value = float(cdm.covariances.flat[index])
+        return None if math.isnan(value) else value
+
+    def set(cdm, value):
+        values = cdm.covariances.copy()
+        values.flat[index] = np.nan if value is None else value
+        cdm.covariances = values
+
+    return property(get, set)
+
+
+def _designator(sat):
+    def get(cdm):
+        return getattr(cdm, f'{sat}_id')
+
+    def set(cdm, value):
+        setattr(cdm, f'{sat}_id', None if value is None else str(value))
+
+    return property(get, set)
+
+
+def _catalog_value(sat, name):
+    # Values set on the CDM are kept until save() stores them on the Satellite
+    def get(cdm):
+        value = cdm.__dict__.get('_catalog_values', {}).get(sat, {}).get(name)
+        if value is not None or getattr(cdm, f'{sat}_id') is None:
+            return value
+        try:
+            return getattr(getattr(cdm, sat), name)
+        except Satellite.DoesNotExist:
+            return None
+
+    def set(cdm, value):
+        cdm.__dict__.setdefault('_catalog_values', {}).setdefault(sat, {})[name] = value
+
+    return property(get, set)
+
+
+for _index, _name in enumerate(COVARIANCE_FIELDS):
+    setattr(CDM, _name, _covariance_element(_index))
+
+# The flat per-object names of the CDM message stay readable and writable
+for _sat in ('sat1', 'sat2'):
+    setattr(CDM, f'{_sat}_object_designator', _designator(_sat))
+    for _name in CATALOG_FIELDS:
+        setattr(CDM, f'{_sat}_{_name}', _catalog_value(_sat, _name))
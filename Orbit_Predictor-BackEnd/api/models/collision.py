@@ -1,52 +1,117 @@
-from pathlib import Path
-from django.db import models
+import numpy as np
+from django.db import models, transaction
+from django.utils import timezone
 from .cdm import CDM
-import matlab.engine
+from .collision_history import CollisionHistory
+from ..pc import (
+    get_pc_backend, cdm_pc_inputs, cdm_pc_batch_inputs, screened_pc, DEFAULT_REL_TOL, DEFAULT_HBR_TYPE,
+    PC_METHOD_INTEGRATED, PC_METHOD_UPPER_BOUND
+)
+
+# Columns rewritten when a CDM's Collision is recomputed
+UPSERT_FIELDS = [
+    'probability_of_collision', 'pc_method', 'computed_at', 'sat1_object_designator', 'sat2_object_designator'
+]
 
 class Collision(models.Model):
-    cdm = models.ForeignKey(CDM, on_delete=models.CASCADE, related_name='collisions')
+    PC_METHOD_CHOICES = (
+        (PC_METHOD_INTEGRATED, 'Full integration'),
+        (PC_METHOD_UPPER_BOUND, 'Screening upper bound'),
+    )
+
+    # The current result of each CDM; superseded results are in CollisionHistory
+    cdm = models.OneToOneField(CDM, on_delete=models.CASCADE, related_name='collision')
     probability_of_collision = models.FloatField()
+    # Whether probability_of_collision was integrated or is the screening upper bound
+    pc_method = models.CharField(max_length=20, choices=PC_METHOD_CHOICES, default=PC_METHOD_INTEGRATED)
+    computed_at = models.DateTimeField(default=timezone.now)
     sat1_object_designator = models.CharField(max_length=50)
     sat2_object_designator = models.CharField(max_length=50)
 
     @classmethod
-    def create_from_cdm(cls, cdm):
+    def upsert_from_cdm(cls, cdm):
+        """
+        Computes the Pc of `cdm` and stores it as its current Collision,
+        updating the existing row in place (its previous result goes to
+        CollisionHistory).
+        """
         if not cdm:
             raise ValueError("A valid CDM object must be provided.")
-        matlabPathFile = Path(__file__).resolve().parent.parent / 'matlab'
-
-        eng = matlab.engine.start_matlab()
-        eng.addpath(str(matlabPathFile))
-        r1 = matlab.double([cdm.sat1_x, cdm.sat1_y, cdm.sat1_z])
-        v1 = matlab.double([cdm.sat1_x_dot, cdm.sat1_y_dot, cdm.sat1_z_dot])
-        cov1 = matlab.double([
-            [cdm.sat1_cov_rr, cdm.sat1_cov_rt, cdm.sat1_cov_rn],
-            [cdm.sat1_cov_tr, cdm.sat1_cov_tt, cdm.sat1_cov_tn],
-            [cdm.sat1_cov_nr, cdm.sat1_cov_nt, cdm.sat1_cov_nn]
-        ])
-
-        r2 = matlab.double([cdm.sat2_x, cdm.sat2_y, cdm.sat2_z])
-        v2 = matlab.double([cdm.sat2_x_dot, cdm.sat2_y_dot, cdm.sat2_z_dot])
-        cov2 = matlab.double([
-            [cdm.sat2_cov_rr, cdm.sat2_cov_rt, cdm.sat2_cov_rn],
-            [cdm.sat2_cov_tr, cdm.sat2_cov_tt, cdm.sat2_cov_tn],
-            [cdm.sat2_cov_nr, cdm.sat2_cov_nt, cdm.sat2_cov_nn]
-        ])
-        HBR = cdm.hard_body_radius
-        RelTol = 1e-08
-        HBRType = 'circle'
-        probability_of_collision_matlab = eng.Pc2D_Foster(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType, nargout=1)
-        probability_of_collision = float(probability_of_collision_matlab)
+
+        # Negligible conjunctions keep their upper bound and skip integration
+        with get_pc_backend() as backend:
+            pc, methods = screened_pc(backend, *cdm_pc_inputs(cdm), DEFAULT_REL_TOL, DEFAULT_HBR_TYPE)
+        probability_of_collision = float(pc[0])
+        if not np.isfinite(probability_of_collision):
+            raise ValueError("Pc is undefined for this conjunction.")
 
         if probability_of_collision > 1.0:
             probability_of_collision = 1.0
 
-        return cls.objects.create(
-            cdm=cdm,
-            probability_of_collision=probability_of_collision,
-            sat1_object_designator=cdm.sat1_object_designator,
-            sat2_object_designator=cdm.sat2_object_designator,
-        )
+        return cls.upsert_from_cdms([cdm], [probability_of_collision], [methods[0]])[0]
+
+    @staticmethod
+    def compute_pc(cdms):
+        """
+        Screened Pc (capped at 1) and Pc method of several CDMs in one batched
+        backend call. The CDMs need not be saved.
+        """
+        return Collision.compute_pc_inputs(cdm_pc_batch_inputs(cdms))
+
+    @staticmethod
+    def compute_pc_inputs(inputs):
+        """compute_pc() for stacked Pc inputs, as returned by cdm_pc_batch_inputs()."""
+        with get_pc_backend() as backend:
+            pc, methods = screened_pc(backend, *inputs, DEFAULT_REL_TOL, DEFAULT_HBR_TYPE)
+        return np.where(pc > 1.0, 1.0, pc), methods
+
+    @classmethod
+    def upsert_from_cdms(cls, cdms, pc=None, methods=None):
+        """
+        Bulk version of upsert_from_cdm(). Pc is computed in one batch unless
+        it is given (as returned by compute_pc()). The CDMs must be saved and
+        distinct; returns their Collisions in the same order.
+        """
+        if not cdms:
+            return []
+        if pc is None:
+            pc, methods = cls.compute_pc(cdms)
+        now = timezone.now()
+        with transaction.atomic():
+            current = cls.objects.select_for_update().filter(cdm__in=cdms)
+            CollisionHistory.objects.bulk_create([CollisionHistory.from_collision(c) for c in current])
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        cdm=cdm,
+                        probability_of_collision=float(p),
+                        pc_method=str(method),
+                        computed_at=now,
+                        sat1_object_designator=cdm.sat1_object_designator,
+                        sat2_object_designator=cdm.sat2_object_designator,
+                    )
+                    for cdm, p, method in zip(cdms, pc, methods)
+                ],
+                update_conflicts=True,
+                unique_fields=['cdm'],
+                update_fields=UPSERT_FIELDS,
+            )
+            # Not every database returns the ids of updated rows
+            collisions = {c.cdm_id: c for c in cls.objects.filter(cdm__in=cdms)}
+        return [collisions[cdm.id] for cdm in cdms]
+
+    @classmethod
+    def sync_designators(cls, cdms):
+        """
+        Copies the object designators of saved CDMs onto their current
+        Collisions, for CDMs rewritten without recomputing Pc.
+        """
+        for cdm in cdms:
+            cls.objects.filter(cdm=cdm).exclude(
+                sat1_object_designator=cdm.sat1_object_designator, sat2_object_designator=cdm.sat2_object_designator
+            ).update(
+                sat1_object_designator=cdm.sat1_object_designator, sat2_object_designator=cdm.sat2_object_designator
+            )
 
     def save(self, *args, **kwargs):
         # Ensure satellite IDs are copied from the related CDM
@@ -0,0 +1,26 @@
+from django.db import models
+from .cdm import CDM
+
+class CollisionHistory(models.Model):
+    """
+    Append-only record of superseded Collision results. Collision keeps only
+    the current Pc of each CDM; when it is recomputed, the previous value is
+    written here.
+    """
+    cdm = models.ForeignKey(CDM, on_delete=models.CASCADE, related_name='collision_history')
+    # When the superseded value was computed
+    computed_at = models.DateTimeField()
+    probability_of_collision = models.FloatField()
+    pc_method = models.CharField(max_length=20)
+
+    @classmethod
+    def from_collision(cls, collision):
+        return cls(
+            cdm_id=collision.cdm_id,
+            computed_at=collision.computed_at,
+            probability_of_collision=collision.probability_of_collision,
+            pc_method=collision.pc_method,
+        )
+
+    def __str__(self):
+        return f"CDM {self.cdm_id} Pc {self.probability_of_collision} ({self.pc_method}) at {self.computed_at}"
@@ -27,7 +27,7 @@ class Organization(models.Model):
         # Find all CDMs where either sat1_operator_organization or sat2_operator_organization
         # matches this organization's name.
         matching_cdms = CDM.objects.filter(
-            Q(sat1_operator_organization=self.name) | Q(sat2_operator_organization=self.name)
+            Q(sat1__operator_organization=self.name) | Q(sat2__operator_organization=self.name)
         )
         self.cdms.set(matching_cdms)
 
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import models
+from .cdm import CDM
+from .collision import Collision
+
+class PcJob(models.Model):
+    """
+    Background Pc computation (and notification) for an ingested CDM. Jobs are
+    queued by CDMCreateView and run by the local worker pool in api.jobs.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    cdm = models.ForeignKey(CDM, on_delete=models.CASCADE, related_name='pc_jobs')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='pc_jobs')
+    # "Created" or "Updated", as reported in the notification email
+    action = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    collision = models.ForeignKey(Collision, on_delete=models.SET_NULL, null=True, blank=True, related_name='pc_jobs')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"PcJob {self.id} for CDM {self.cdm_id} ({self.status})"
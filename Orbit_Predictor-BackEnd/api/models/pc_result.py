@@ -0,0 +1,14 @@
+from django.db import models
+
+class PcResult(models.Model):
+    """
+    Persistent tier of the Pc result cache. `key` is the SHA-256 of the Pc
+    inputs (states, covariances, HBR, RelTol, HBRType) and the method used.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    probability_of_collision = models.FloatField()
+    method = models.CharField(max_length=50)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"PcResult {self.key[:12]} ({self.method}) = {self.probability_of_collision}"
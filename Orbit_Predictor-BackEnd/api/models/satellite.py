@@ -0,0 +1,48 @@
+from django.db import models
+
+# Descriptive CDM fields stored once per object, as sat1_<name> / sat2_<name> on CDM
+CATALOG_FIELDS = ('catalog_name', 'object_name', 'international_designator', 'object_type', 'operator_organization')
+
+class Satellite(models.Model):
+    """
+    Catalog entry of an object referenced by CDMs, keyed by its object
+    designator. Values come from the most recent CDM that gives them; a CDM
+    that leaves a value out does not erase it.
+    """
+    object_designator = models.CharField(max_length=50, primary_key=True)
+    catalog_name = models.CharField(max_length=100, null=True, blank=True)
+    object_name = models.CharField(max_length=100, null=True, blank=True)
+    international_designator = models.CharField(max_length=100, null=True, blank=True)
+    object_type = models.CharField(max_length=100, null=True, blank=True)
+    operator_organization = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+
+    @classmethod
+    def upsert_from_cdms(cls, cdms):
+        """
+        Creates the Satellites referenced by (possibly unsaved) CDMs and
+        applies their catalog values, later CDMs winning, with one query plus
+        at most one bulk upsert.
+        """
+        described = {}
+        for cdm in cdms:
+            for designator, values in cdm.catalog_values():
+                described.setdefault(designator, {}).update(values)
+        if not described:
+            return
+
+        current = cls.objects.in_bulk(list(described))
+        changed = []
+        for designator, values in described.items():
+            satellite = current.get(designator)
+            if satellite is None:
+                changed.append(cls(object_designator=designator, **values))
+            elif any(getattr(satellite, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(satellite, name, value)
+                changed.append(satellite)
+        cls.objects.bulk_create(
+            changed, update_conflicts=True, unique_fields=['object_designator'], update_fields=CATALOG_FIELDS
+        )
+
+    def __str__(self):
+        return self.object_designator
@@ -0,0 +1,32 @@
+from django.db import models
+from .cdm import CDM
+
+class TradespaceResult(models.Model):
+    """
+    Persistent tier of the tradespace cache (see api.tradespace.store).
+    `key` is the SHA-256 of the CDM id, its content version (`cdm_version`,
+    the hash of its Pc inputs), the grid axes and the Pc options. The Pc grid
+    is a zlib-compressed float32 blob in (T, Δv) order; the axes are float64.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    cdm = models.ForeignKey(CDM, on_delete=models.CASCADE, related_name='tradespace_results')
+    cdm_version = models.CharField(max_length=64)
+    backend = models.CharField(max_length=50)
+    rel_tol = models.FloatField()
+    hbr_type = models.CharField(max_length=20)
+
+    # Grid extent, for range queries
+    t_min_hours = models.FloatField()
+    t_max_hours = models.FloatField()
+    dv_min = models.FloatField()
+    dv_max = models.FloatField()
+
+    time_values = models.BinaryField()
+    dv_values = models.BinaryField()
+    pc = models.BinaryField()
+    original_pc = models.FloatField()
+    original_miss_distance = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"TradespaceResult {self.key[:12]} for CDM {self.cdm_id}"
@@ -0,0 +1,71 @@
+# api/parsers.py
+
+import json
+
+from rest_framework.parsers import BaseParser
+
+from .ccsds import iter_kvn_messages, iter_xml_messages
+
+
+class InvalidLine(ValueError):
+    """An NDJSON line that is not valid JSON; yielded in place of the message."""
+
+    def __init__(self, line_number, error):
+        super().__init__(f"Line {line_number}: invalid JSON ({error}).")
+        self.line_number = line_number
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON. request.data is a generator reading one line at a
+    time, so large uploads are not held in memory; blank lines are skipped
+    and invalid lines are yielded as InvalidLine errors so that the other
+    messages can still be processed.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+
+        def messages():
+            if stream is None:
+                return
+            for line_number, line in enumerate(stream, start=1):
+                line = line.decode(encoding).strip() if isinstance(line, bytes) else line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield InvalidLine(line_number, e)
+
+        return messages()
+
+
+class CCSDSKVNParser(BaseParser):
+    """
+    CCSDS CDM messages in KVN (one or several concatenated). request.data is
+    a generator of flattened CDM messages, read one line at a time.
+    """
+    media_type = 'text/plain'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter_kvn_messages(stream if stream is not None else [])
+
+
+class CCSDSXMLParser(BaseParser):
+    """
+    CCSDS CDM messages in XML (a <cdm>, or several inside an <ndm>).
+    request.data is a generator of flattened CDM messages, parsed
+    incrementally.
+    """
+    media_type = 'application/xml'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter([])
+        return iter_xml_messages(stream)
+
+
+class CCSDSTextXMLParser(CCSDSXMLParser):
+    media_type = 'text/xml'
@@ -0,0 +1,19 @@
+from .backends import (
+    PcBackend, NumpyFosterBackend, GaussFosterBackend, SeriesPcBackend, MatlabFosterBackend, Hall3DBackend,
+    CachedPcBackend, PC_BACKENDS, get_pc_backend
+)
+from .cache import PcResultCache, pc_cache_keys, pc_result_cache
+from .covariance import (
+    eig2x2, cov_rem_eig_val_clip, cov_rem_eig_val_clip_2x2, covariance_flags, remediate_covariance_2x2
+)
+from .foster import pc2d_foster
+from .gauss import pc2d_foster_gauss
+from .hall import pc3d_hall
+from .inputs import (
+    DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, cdm_content_hash, cdm_pc_inputs, cdm_pc_batch_inputs, cdm_covariance_flags,
+    cdm_covariance_stack, null_covariance, pack_covariances, unpack_covariances
+)
+from .lebedev import build_lebedev_tables, lebedev_sphere
+from .matlab_pool import MatlabEnginePool, matlab_engine_pool
+from .screening import PC_METHOD_INTEGRATED, PC_METHOD_UPPER_BOUND, pc2d_upper_bound, screened_pc
+from .series import pc2d_series
@@ -0,0 +1,113 @@
+"""
+Reader for the Alfano (2009) conjunction test cases, ported from
+api/matlab/Utils/get_alfano_test_case.m.
+
+The Excel files ("Case<N> data at Epoch Time.xls" and "Case<N> data at
+TCA.xls") are distributed with the reference and are not part of this
+repository; pass the directory that holds them, or a JSON fixture saved from
+them with save_alfano_fixture().
+
+REFERENCE:
+
+S.Alfano, "Satellite Conjunction Monte Carlo Analysis" AAS 09-233 (2009).
+"""
+import json
+import os
+
+import numpy as np
+
+try:
+    import xlrd
+except ImportError:  # Only needed to read the Alfano test-case files
+    xlrd = None
+
+# Auxiliary data not tabulated in the Excel files: (HBR, Monte Carlo Pc from 1e8 trials, description)
+ALFANO_CASES = {
+    1: (15, 0.217467140, 'GEO, nonlinear relative motion'),
+    2: (4, 0.015736620, 'GEO, nonlinear relative motion'),
+    3: (15, 0.100846420, 'GEO, linear relative motion'),
+    4: (15, 0.073089530, 'GEO, nonlinear relative motion'),
+    5: (10, 0.044498913, 'LEO, linear relative motion'),
+    6: (10, 0.004300500, 'LEO, near-linear relative motion'),
+    7: (10, 0.000161462, 'LEO, nonlinear relative motion'),
+    8: (4, 0.035256080, 'MEO, nonlinear relative motion'),
+    9: (6, 0.365116060, 'HEO, nonlinear relative motion'),
+    10: (6, 0.362952470, 'HEO, nonlinear relative motion'),
+    11: (4, 0.003328530, 'LEO, leader-follower'),
+    12: (4, 0.002555950, 'LEO, identical orbits'),
+}
+
+
+def _read_states(path):
+    # Rows (1-based as in the MATLAB reader) of each tabulated quantity
+    sheet = xlrd.open_workbook(path).sheet_by_index(0)
+
+    def vector(row):
+        return np.array([float(sheet.cell_value(row - 1, col)) for col in range(3)])
+
+    def matrix(row):
+        return np.array([[float(sheet.cell_value(row - 1 + i, col)) for col in range(6)] for i in range(6)])
+
+    return vector(5), vector(9), matrix(13), vector(23), vector(27), matrix(31)
+
+
+def get_alfano_test_case(casenum, datapath=None):
+    """
+    Returns a dict with the same fields as get_alfano_test_case.m: HBR,
+    PC_MC_10e8, desc, the epoch states and covariances (R1e, V1e, P1e, R2e,
+    V2e, P2e) and those at TCA (R1o, V1o, P1o, R2o, V2o, P2o), in meters.
+    """
+    if casenum not in ALFANO_CASES:
+        raise ValueError("Case number out of range (1 through 12)")
+    if xlrd is None:
+        raise ImportError("Reading the Alfano test cases requires the 'xlrd' package.")
+    datapath = datapath or os.getcwd()
+
+    HBR, pc_mc, desc = ALFANO_CASES[casenum]
+    tcdata = {'casenum': casenum, 'HBR': float(HBR), 'PC_MC_10e8': pc_mc, 'desc': desc}
+
+    casestr = f'Case{casenum} data at '
+    for suffix, filename in (('e', 'Epoch Time.xls'), ('o', 'TCA.xls')):
+        R1, V1, P1, R2, V2, P2 = _read_states(os.path.join(datapath, casestr + filename))
+        tcdata.update({
+            f'R1{suffix}': R1, f'V1{suffix}': V1, f'P1{suffix}': P1,
+            f'R2{suffix}': R2, f'V2{suffix}': V2, f'P2{suffix}': P2,
+        })
+
+    # Linear estimates of the TCA
+    r12 = tcdata['R1e'] - tcdata['R2e']
+    v12 = tcdata['V1e'] - tcdata['V2e']
+    tcdata['tca_from_epoch_lin'] = -(r12 @ v12) / (v12 @ v12)
+    r12 = tcdata['R1o'] - tcdata['R2o']
+    v12 = tcdata['V1o'] - tcdata['V2o']
+    tcdata['tca_from_tca0_lin'] = -(r12 @ v12) / (v12 @ v12)
+    return tcdata
+
+
+def load_alfano_cases(datapath=None, case_list=None, fixture=None):
+    """
+    Loads several Alfano cases, like GetAlfanoTestCases.m, either from the
+    Excel files in `datapath` or from a JSON fixture written by
+    save_alfano_fixture(). Array fields are returned as NumPy arrays.
+    """
+    case_list = list(case_list or sorted(ALFANO_CASES))
+    if fixture is not None:
+        with open(fixture) as f:
+            stored = {case['casenum']: case for case in json.load(f)['cases']}
+        missing = [casenum for casenum in case_list if casenum not in stored]
+        if missing:
+            raise ValueError(f"Fixture {fixture} has no data for cases {missing}.")
+        return [
+            {key: np.array(value) if isinstance(value, list) else value for key, value in stored[casenum].items()}
+            for casenum in case_list
+        ]
+    return [get_alfano_test_case(casenum, datapath) for casenum in case_list]
+
+
+def save_alfano_fixture(cases, path):
+    """Writes loaded Alfano cases to a JSON fixture readable without xlrd."""
+    with open(path, 'w') as f:
+        json.dump({'cases': [
+            {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in case.items()}
+            for case in cases
+        ]}, f, indent=2)
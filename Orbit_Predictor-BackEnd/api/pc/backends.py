@@ -0,0 +1,258 @@
+"""
+Pluggable Pc backends.
+
+Every backend exposes the same batch interface:
+
+    with get_pc_backend() as backend:
+        pc = backend.compute(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType)
+
+where the inputs follow the stacking rules of api.pc.foster and the result is
+an (N,) array of Pc values. The backend used by default is chosen with the
+PC_BACKEND setting, and is wrapped in the Pc result cache unless PC_CACHE_ENABLED
+is off.
+"""
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import pc_cache_keys, pc_result_cache
+from .foster import ABS_TOL, broadcast_conjunctions, pc2d_foster
+from .gauss import pc2d_foster_gauss
+from .hall import pc3d_hall
+from .series import pc2d_series
+from .matlab_pool import matlab, matlab_engine_pool
+
+
+class PcBackend:
+    """
+    Base class for Pc backends. Backends are context managers so that any
+    resources they hold (e.g. a MATLAB engine) are released after a request.
+    """
+    name = None
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NumpyFosterBackend(PcBackend):
+    """
+    Native vectorized port of Pc2D_Foster; needs no MATLAB license.
+    """
+    name = 'numpy'
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        Pc, _, _, _ = pc2d_foster(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType)
+        return Pc
+
+
+class GaussFosterBackend(PcBackend):
+    """
+    Foster integral with fixed-node Gauss-Legendre rules chosen per
+    conjunction from a posterior error estimate (see api.pc.gauss), so the
+    cost per conjunction is bounded. Conjunctions still unresolved with
+    PC_GAUSS_MAX_NODES nodes are integrated adaptively.
+    """
+    name = 'gauss'
+
+    def __init__(self):
+        self.max_nodes = getattr(settings, 'PC_GAUSS_MAX_NODES', 1024)
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+        Pc, PcError, _, _ = pc2d_foster_gauss(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType, self.max_nodes)
+        unresolved = PcError > np.maximum(RelTol * Pc, ABS_TOL)
+        if unresolved.any():
+            Pc[unresolved] = pc2d_foster(
+                r1[unresolved], v1[unresolved], cov1[unresolved],
+                r2[unresolved], v2[unresolved], cov2[unresolved],
+                HBR[unresolved], RelTol, HBRType
+            )[0]
+        return Pc
+
+
+class SeriesPcBackend(PcBackend):
+    """
+    Truncated series evaluation of the 2D Pc (see api.pc.series), without
+    adaptive quadrature. Conjunctions the series cannot resolve within
+    PC_SERIES_MAX_TERMS terms, and non-circular HBR types, are integrated
+    with the Foster port instead.
+    """
+    name = 'series'
+
+    def __init__(self):
+        self.max_terms = getattr(settings, 'PC_SERIES_MAX_TERMS', 2000)
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+        if HBRType.lower() != 'circle':
+            return pc2d_foster(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType)[0]
+
+        Pc, PcError, _, _ = pc2d_series(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, self.max_terms)
+        unresolved = PcError > np.maximum(RelTol * Pc, ABS_TOL)
+        if unresolved.any():
+            Pc[unresolved] = pc2d_foster(
+                r1[unresolved], v1[unresolved], cov1[unresolved],
+                r2[unresolved], v2[unresolved], cov2[unresolved],
+                HBR[unresolved], RelTol, HBRType
+            )[0]
+        return Pc
+
+
+class MatlabFosterBackend(PcBackend):
+    """
+    Calls api/matlab/Pc2D_Foster.m through the MATLAB engine, one conjunction
+    at a time. An engine is checked out of the process-wide pool on first use
+    and returned on close().
+    """
+    name = 'matlab'
+
+    def __init__(self):
+        if matlab is None:
+            raise ImproperlyConfigured("The 'matlab' Pc backend requires the MATLAB engine for Python.")
+        self._pool = matlab_engine_pool()
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = self._pool.checkout()
+        return self._engine
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+        Pc = np.empty(len(HBR))
+        try:
+            for i in range(len(HBR)):
+                Pc[i] = float(self.engine.Pc2D_Foster(
+                    matlab.double(r1[i].tolist()), matlab.double(v1[i].tolist()), matlab.double(cov1[i].tolist()),
+                    matlab.double(r2[i].tolist()), matlab.double(v2[i].tolist()), matlab.double(cov2[i].tolist()),
+                    float(HBR[i]), float(RelTol), HBRType,
+                    nargout=1
+                ))
+        except Exception:
+            # Hand the engine back now so the pool can check whether it survived
+            self.close(healthy=False)
+            raise
+        return Pc
+
+    def close(self, healthy=True):
+        if self._engine is not None:
+            self._pool.checkin(self._engine, healthy)
+            self._engine = None
+
+
+class Hall3DBackend(PcBackend):
+    """
+    NumPy port of Pc3D_Hall, evaluated one conjunction at a time. CDM states
+    are in km and km/s, so they are scaled to meters by PC3D_STATE_SCALE
+    (or `state_scale`). 6x6 covariances are used in full; 3x3 ones carry no
+    velocity uncertainty. The 3D method always uses a spherical HBR and its
+    own ephemeris refinement tolerance, so RelTol and HBRType do not apply.
+    """
+    name = 'hall3d'
+
+    def __init__(self, state_scale=None):
+        if state_scale is None:
+            state_scale = getattr(settings, 'PC3D_STATE_SCALE', 1000.0)
+        self.state_scale = state_scale
+        self.params = {'deg_Lebedev': getattr(settings, 'PC3D_LEBEDEV_DEGREE', 5810)}
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        full_cov1 = np.asarray(cov1, dtype=float)
+        full_cov2 = np.asarray(cov2, dtype=float)
+        r1, v1, _, r2, v2, _, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+        full_cov1 = np.broadcast_to(full_cov1, HBR.shape + full_cov1.shape[-2:])
+        full_cov2 = np.broadcast_to(full_cov2, HBR.shape + full_cov2.shape[-2:])
+
+        scale = self.state_scale
+        Pc = np.empty(len(HBR))
+        for i in range(len(HBR)):
+            try:
+                Pc[i], _ = pc3d_hall(
+                    r1[i] * scale, v1[i] * scale, full_cov1[i], r2[i] * scale, v2[i] * scale, full_cov2[i],
+                    HBR[i], self.params
+                )
+            except (ValueError, np.linalg.LinAlgError):
+                Pc[i] = np.nan
+        return Pc
+
+
+def _take(value, index, single_ndim):
+    # Unstacked inputs are shared by every conjunction and are passed through
+    value = np.asarray(value, dtype=float)
+    return value if value.ndim == single_ndim else value[index]
+
+
+class CachedPcBackend(PcBackend):
+    """
+    Wraps a backend with the content-addressed Pc result cache. Only
+    conjunctions that are in neither cache tier reach the wrapped backend, and
+    identical conjunctions within a batch are computed once.
+    """
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache or pc_result_cache()
+        self.name = backend.name
+
+    def compute(self, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle'):
+        keys = pc_cache_keys(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType, self.name)
+        found = self.cache.lookup(keys)
+
+        # First occurrence of every key that still has to be computed
+        pending = {}
+        for i, key in enumerate(keys):
+            if key not in found and key not in pending:
+                pending[key] = i
+        if pending:
+            index = np.fromiter(pending.values(), dtype=int, count=len(pending))
+            computed = self.backend.compute(
+                _take(r1, index, 1), _take(v1, index, 1), _take(cov1, index, 2),
+                _take(r2, index, 1), _take(v2, index, 1), _take(cov2, index, 2),
+                _take(HBR, index, 0), RelTol, HBRType
+            )
+            computed = dict(zip(pending, computed.tolist()))
+            self.cache.store(computed, self.name)
+            found = {**found, **computed}
+
+        return np.array([found[key] for key in keys], dtype=float)
+
+    def close(self):
+        self.backend.close()
+
+
+PC_BACKENDS = {
+    NumpyFosterBackend.name: NumpyFosterBackend,
+    GaussFosterBackend.name: GaussFosterBackend,
+    SeriesPcBackend.name: SeriesPcBackend,
+    MatlabFosterBackend.name: MatlabFosterBackend,
+    Hall3DBackend.name: Hall3DBackend,
+}
+
+
+def get_pc_backend(name=None, cached=None):
+    """
+    Instantiates the named Pc backend, defaulting to settings.PC_BACKEND.
+    Results are memoized unless `cached` (default settings.PC_CACHE_ENABLED)
+    is false.
+    """
+    name = name or getattr(settings, 'PC_BACKEND', MatlabFosterBackend.name)
+    try:
+        backend_class = PC_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown Pc backend '{name}'. Choose one of: {', '.join(sorted(PC_BACKENDS))}."
+        )
+    if cached is None:
+        cached = getattr(settings, 'PC_CACHE_ENABLED', True)
+    backend = backend_class()
+    return CachedPcBackend(backend) if cached else backend
@@ -0,0 +1,237 @@
+"""
+Accuracy and throughput benchmarks of the Pc backends on the Alfano (2009)
+test cases (see the benchmark_pc_backends command).
+
+Accuracy is measured per case against the Monte Carlo Pc of the reference and
+against a reference backend (the NumPy Foster port by default). Throughput is
+measured by tiling the cases into batches of the requested sizes; a backend
+is skipped at a batch size when its measured rate predicts that the batch
+would exceed the time budget.
+
+The tradespace scaling benchmark evaluates a maneuver grid around one case on
+the tradespace process pool with increasing worker counts, and reports the
+speedup over in-process evaluation.
+"""
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy
+from django.core.exceptions import ImproperlyConfigured
+
+from .backends import PC_BACKENDS, Hall3DBackend, get_pc_backend
+from .inputs import DEFAULT_HBR_TYPE, DEFAULT_REL_TOL
+
+DEFAULT_BATCH_SIZES = (1, 100, 10000, 1000000)
+DEFAULT_MAX_SECONDS = 300.0
+DEFAULT_TRADESPACE_WORKERS = (1, 2, 4, 8)
+DEFAULT_TRADESPACE_SHAPE = (193, 161)
+
+
+def alfano_inputs(cases, index=None, full_covariance=True):
+    """
+    Stacks the TCA states of the given cases into Pc inputs, in meters. With
+    `index`, the cases are tiled in that order. Without `full_covariance` only
+    the 3x3 position covariances are kept, which is all the 2D methods use.
+    """
+    index = np.arange(len(cases)) if index is None else index
+    r1, v1, cov1, r2, v2, cov2, HBR = (
+        np.array([case[key] for case in cases], dtype=float)
+        for key in ('R1o', 'V1o', 'P1o', 'R2o', 'V2o', 'P2o', 'HBR')
+    )
+    if not full_covariance:
+        cov1, cov2 = cov1[:, :3, :3], cov2[:, :3, :3]
+    return r1[index], v1[index], cov1[index], r2[index], v2[index], cov2[index], HBR[index]
+
+
+def open_backend(name):
+    """Instantiates an uncached backend for meter inputs, or returns None if unavailable."""
+    try:
+        backend = get_pc_backend(name, cached=False)
+    except ImproperlyConfigured:
+        return None
+    if isinstance(backend, Hall3DBackend):
+        backend.state_scale = 1.0  # the Alfano states are already in meters
+    return backend
+
+
+def _relative(values, reference):
+    return np.abs(values - reference) / np.maximum(np.abs(reference), np.finfo(float).tiny)
+
+
+def benchmark_accuracy(backend, cases, reference_pc, RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE):
+    """Per-case Pc of one backend with its error against Monte Carlo and the reference backend."""
+    start = time.perf_counter()
+    pc = backend.compute(*alfano_inputs(cases), RelTol, HBRType)
+    seconds = time.perf_counter() - start
+
+    monte_carlo = np.array([case['PC_MC_10e8'] for case in cases])
+    rel_mc = _relative(pc, monte_carlo)
+    rel_ref = _relative(pc, reference_pc)
+    return {
+        "seconds": seconds,
+        "max_rel_error_monte_carlo": float(np.nanmax(rel_mc)),
+        "max_rel_diff_reference": float(np.nanmax(rel_ref)),
+        "cases": [
+            {
+                "case": case['casenum'],
+                "desc": case['desc'],
+                "pc": float(value),
+                "pc_monte_carlo": case['PC_MC_10e8'],
+                "pc_reference": float(ref),
+                "rel_error_monte_carlo": float(mc_err),
+                "rel_diff_reference": float(ref_diff),
+            }
+            for case, value, ref, mc_err, ref_diff in zip(cases, pc, reference_pc, rel_mc, rel_ref)
+        ],
+    }
+
+
+def benchmark_throughput(backend, cases, batch_sizes=DEFAULT_BATCH_SIZES, max_seconds=DEFAULT_MAX_SECONDS,
+                         RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE):
+    """
+    Times one backend at each batch size. Returns a list with one entry per
+    batch size: either the timing or the reason it was skipped.
+    """
+    results = []
+    rate = None
+    for size in batch_sizes:
+        if rate is not None and size / rate > max_seconds:
+            results.append({
+                "batch_size": size,
+                "skipped": f"estimated {size / rate:.0f}s exceeds the {max_seconds:g}s budget",
+            })
+            continue
+
+        full_covariance = isinstance(backend, Hall3DBackend)
+        inputs = alfano_inputs(cases, np.arange(size) % len(cases), full_covariance)
+        start = time.perf_counter()
+        pc = backend.compute(*inputs, RelTol, HBRType)
+        seconds = time.perf_counter() - start
+        rate = size / seconds if seconds > 0 else np.inf
+        results.append({
+            "batch_size": size,
+            "seconds": seconds,
+            "conjunctions_per_second": rate,
+            "nan_count": int(np.isnan(pc).sum()),
+        })
+    return results
+
+
+def tradespace_inputs(case):
+    """Pc inputs of a case in CDM units: km and km/s states, m² position covariances."""
+    return (
+        case['R1o'] / 1000.0, case['V1o'] / 1000.0, np.asarray(case['P1o'])[:3, :3],
+        case['R2o'] / 1000.0, case['V2o'] / 1000.0, np.asarray(case['P2o'])[:3, :3], float(case['HBR'])
+    )
+
+
+def benchmark_tradespace_scaling(case, backend_name='numpy', worker_counts=DEFAULT_TRADESPACE_WORKERS,
+                                 shape=DEFAULT_TRADESPACE_SHAPE, tile_rows=8, start_method=None,
+                                 RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE, log=None):
+    """
+    Times a T x Δv grid (T from 24 to 0 hr, Δv from -0.1 to 0.1 m/s) around
+    one case in process and on the tradespace pool with each worker count.
+    Pool start-up is excluded by a warm-up run. Reports the speedup over the
+    in-process evaluation and the largest difference between the pool
+    results (zero when the merge is deterministic).
+    """
+    from ..tradespace.engine import maneuver_states
+    from ..tradespace.parallel import create_process_pool, evaluate_grid_parallel
+
+    log = log or (lambda message: None)
+    inputs = tradespace_inputs(case)
+    Ra, Va, cov1, Rd, Vd, cov2, HBR = inputs
+    time_values = np.linspace(24.0, 0.0, shape[0])
+    dv_values = np.linspace(-0.1, 0.1, shape[1])
+
+    log(f"tradespace: in process, {shape[0]}x{shape[1]} grid")
+    Ra_plus, Va_plus = maneuver_states(Ra, Va, time_values, dv_values)
+    with get_pc_backend(backend_name, cached=False) as backend:
+        start = time.perf_counter()
+        backend.compute(Ra_plus.reshape(-1, 3), Va_plus.reshape(-1, 3), cov1, Rd, Vd, cov2, HBR, RelTol, HBRType)
+        serial_seconds = time.perf_counter() - start
+
+    report = {
+        "case": case['casenum'],
+        "backend": backend_name,
+        "grid_shape": list(shape),
+        "tile_rows": tile_rows,
+        "in_process_seconds": serial_seconds,
+        "pool": [],
+    }
+    first_pc = None
+    for workers in worker_counts:
+        log(f"tradespace: {workers} worker(s)")
+        pool = create_process_pool(workers, start_method)
+        try:
+            evaluate_grid_parallel(
+                inputs, time_values[:tile_rows * workers], dv_values, backend_name, pool, RelTol, HBRType, tile_rows
+            )
+            start = time.perf_counter()
+            pc = evaluate_grid_parallel(inputs, time_values, dv_values, backend_name, pool, RelTol, HBRType, tile_rows)
+            seconds = time.perf_counter() - start
+        finally:
+            pool.shutdown()
+        first_pc = pc if first_pc is None else first_pc
+        report["pool"].append({
+            "workers": workers,
+            "seconds": seconds,
+            "speedup": serial_seconds / seconds if seconds > 0 else np.inf,
+            "max_abs_diff_first": float(np.nanmax(np.abs(pc - first_pc))) if pc.size else 0.0,
+        })
+    return report
+
+
+def environment():
+    """Describes the machine and library versions a benchmark ran on."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmark(cases, backends=None, reference='numpy', batch_sizes=DEFAULT_BATCH_SIZES,
+                  max_seconds=DEFAULT_MAX_SECONDS, RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE, log=None):
+    """
+    Benchmarks the named backends (default: every registered backend) and
+    returns a JSON-serializable report. Unavailable backends are listed with
+    "available": false.
+    """
+    log = log or (lambda message: None)
+    reference_backend = open_backend(reference)
+    if reference_backend is None:
+        raise ImproperlyConfigured(f"Reference Pc backend '{reference}' is not available.")
+    with reference_backend:
+        reference_pc = reference_backend.compute(*alfano_inputs(cases), RelTol, HBRType)
+
+    report = {
+        "environment": environment(),
+        "rel_tol": RelTol,
+        "hbr_type": HBRType,
+        "reference": reference,
+        "batch_sizes": list(batch_sizes),
+        "max_seconds": max_seconds,
+        "cases": [case['casenum'] for case in cases],
+        "backends": {},
+    }
+    for name in backends or sorted(PC_BACKENDS):
+        backend = open_backend(name)
+        if backend is None:
+            log(f"{name}: not available, skipped")
+            report["backends"][name] = {"available": False}
+            continue
+        with backend:
+            log(f"{name}: accuracy")
+            accuracy = benchmark_accuracy(backend, cases, reference_pc, RelTol, HBRType)
+            log(f"{name}: throughput")
+            throughput = benchmark_throughput(backend, cases, batch_sizes, max_seconds, RelTol, HBRType)
+        report["backends"][name] = {"available": True, "accuracy": accuracy, "throughput": throughput}
+    return report
@@ -0,0 +1,162 @@
+"""
+Content-addressed memoization of Pc results.
+
+Each conjunction is keyed by the SHA-256 of its inputs (r1, v1, cov1, r2, v2,
+cov2, HBR), RelTol, HBRType and the backend method. Lookups go through a
+bounded in-memory LRU first and the PcResult table second; only conjunctions
+missing from both are sent to the wrapped backend, in a single batch. The
+table is capped too: once the rows stored since the last check reach 1% of
+its limit, the oldest rows beyond the limit are deleted.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+# Fraction of max_rows stored between two prunes of the PcResult table
+PRUNE_FRACTION = 0.01
+
+
+def pc_cache_keys(r1, v1, cov1, r2, v2, cov2, HBR, RelTol, HBRType, method):
+    """Returns one hex key per conjunction of a (broadcast) batch."""
+    r1 = np.atleast_2d(np.asarray(r1, dtype=float))
+    v1 = np.atleast_2d(np.asarray(v1, dtype=float))
+    r2 = np.atleast_2d(np.asarray(r2, dtype=float))
+    v2 = np.atleast_2d(np.asarray(v2, dtype=float))
+    cov1 = np.asarray(cov1, dtype=float)
+    cov2 = np.asarray(cov2, dtype=float)
+    cov1 = cov1.reshape((1, -1) if cov1.ndim == 2 else (len(cov1), -1))
+    cov2 = cov2.reshape((1, -1) if cov2.ndim == 2 else (len(cov2), -1))
+    HBR = np.atleast_1d(np.asarray(HBR, dtype=float))[:, np.newaxis]
+
+    parts = [r1, v1, cov1, r2, v2, cov2, HBR]
+    n = np.broadcast_shapes(*(part.shape[:1] for part in parts))[0]
+    # Adding 0.0 folds -0.0 into 0.0 so equal inputs hash equally
+    rows = np.ascontiguousarray(
+        np.concatenate([np.broadcast_to(part, (n, part.shape[1])) for part in parts], axis=1) + 0.0
+    )
+    suffix = f"|{float(RelTol)!r}|{HBRType.lower()}|{method}".encode()
+    return [hashlib.sha256(row.tobytes() + suffix).hexdigest() for row in rows]
+
+
+class PcResultCache:
+    """
+    Two-tier Pc cache: a bounded LRU in memory, optionally backed by the
+    PcResult table (at most `max_rows` rows, 0 for no limit). Keeps hit/miss
+    counters for the metrics endpoint.
+    """
+
+    def __init__(self, max_entries, persist=True, max_rows=0):
+        self.max_entries = max_entries
+        self.persist = persist
+        self.max_rows = max_rows
+        # Rows stored since the table was last pruned
+        self._stored_rows = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, values):
+        with self._lock:
+            for key, pc in values.items():
+                self._entries[key] = pc
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, keys):
+        """Returns {key: Pc} for the keys found in either tier."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        memory_hits = len(found)
+
+        db_found = {}
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if self.persist and missing:
+            from ..models import PcResult
+            db_found = dict(
+                PcResult.objects.filter(key__in=missing).values_list('key', 'probability_of_collision')
+            )
+            self._remember(db_found)
+            found.update(db_found)
+
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.db_hits += len(db_found)
+        return found
+
+    def store(self, values, method):
+        """Records freshly computed {key: Pc} values in both tiers."""
+        # Undefined results are not cached so that they are retried
+        values = {key: pc for key, pc in values.items() if not np.isnan(pc)}
+        with self._lock:
+            self.misses += len(values)
+        self._remember(values)
+        if self.persist and values:
+            from ..models import PcResult
+            PcResult.objects.bulk_create(
+                [PcResult(key=key, probability_of_collision=pc, method=method) for key, pc in values.items()],
+                ignore_conflicts=True,
+                batch_size=1000,
+            )
+            with self._lock:
+                self._stored_rows += len(values)
+                due = self.max_rows > 0 and self._stored_rows >= max(int(self.max_rows * PRUNE_FRACTION), 1)
+                if due:
+                    self._stored_rows = 0
+            if due:
+                self.prune()
+
+    def prune(self):
+        """Deletes the oldest PcResult rows beyond max_rows."""
+        if not self.persist or self.max_rows <= 0:
+            return
+        from ..models import PcResult
+        # Ids grow with insertion, so the newest max_rows rows are those above the cutoff
+        cutoff = list(PcResult.objects.order_by('-id').values_list('id', flat=True)[self.max_rows:self.max_rows + 1])
+        if cutoff:
+            PcResult.objects.filter(id__lte=cutoff[0]).delete()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persist": self.persist,
+                "max_rows": self.max_rows,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def pc_result_cache():
+    """Returns the process-wide Pc result cache, configured from settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PcResultCache(
+                    max_entries=getattr(settings, 'PC_CACHE_SIZE', 100000),
+                    persist=getattr(settings, 'PC_CACHE_PERSIST', True),
+                    max_rows=getattr(settings, 'PC_CACHE_MAX_ROWS', 500000),
+                )
+    return _cache
@@ -0,0 +1,185 @@
+"""
+Batched covariance kernels, ported from api/matlab/Utils:
+
+  eig2x2                     -> eig2x2
+  CovRemEigValClip2x2        -> cov_rem_eig_val_clip_2x2
+  RemediateCovariance2x2     -> remediate_covariance_2x2
+  CovRemEigValClip           -> cov_rem_eig_val_clip (stacks of any k x k)
+
+The MATLAB functions loop over conjunctions or handle one matrix per call;
+these take (N, 2, 2), (N, 3, 3) or (N, 6, 6) stacks of symmetric matrices and
+return IsPosDef / IsRemediated as (N,) boolean arrays. 2x2 eigenpairs are
+computed in closed form.
+"""
+import numpy as np
+
+# Clipping factors tried in turn by RemediateCovariance2x2
+REMEDIATION_FCLIP = (1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2)
+
+
+def _stack(A, k=None):
+    A = np.asarray(A, dtype=float)
+    if A.ndim == 2:
+        A = A[np.newaxis]
+    if A.ndim != 3 or A.shape[1] != A.shape[2] or (k is not None and A.shape[1] != k):
+        shape = f"{k}x{k}" if k else "square"
+        raise ValueError(f"Expected a stack of {shape} matrices, got shape {A.shape}.")
+    return A
+
+
+def eig2x2(A):
+    """
+    Closed-form eigen-decomposition of (N, 2, 2) symmetric matrices (the upper
+    off-diagonal element is used, as in eig2x2.m). Returns (V1, V2, L1, L2):
+    unit eigenvectors (N, 2) and eigenvalues (N,) with L1 >= L2.
+
+    Unlike eig2x2.m this needs no per-matrix fallback for small off-diagonal
+    terms: the eigenvector is built from whichever diagonal difference avoids
+    cancellation.
+    """
+    A = _stack(A, 2)
+    a = A[:, 0, 0]
+    b = A[:, 0, 1]
+    d = A[:, 1, 1]
+
+    half_diff = 0.5 * (a - d)
+    h = np.hypot(half_diff, b)
+    mean = 0.5 * (a + d)
+    L1 = mean + h
+    L2 = mean - h
+
+    # (L1 - d, b) for a >= d, else (b, L1 - a); both components are accurate
+    upper = half_diff >= 0
+    x = np.where(upper, half_diff + h, b)
+    y = np.where(upper, b, h - half_diff)
+    norm = np.hypot(x, y)
+    isotropic = norm == 0
+    norm = np.where(isotropic, 1.0, norm)
+    V1 = np.stack([np.where(isotropic, 1.0, x / norm), np.where(isotropic, 0.0, y / norm)], axis=-1)
+    V2 = np.stack([-V1[:, 1], V1[:, 0]], axis=-1)
+    return V1, V2, L1, L2
+
+
+def cov_rem_eig_val_clip_2x2(A, Lclip=0.0):
+    """
+    Eigenvalue clipping of (N, 2, 2) symmetric matrices. Returns
+    (IsRemediated, Arem) like CovRemEigValClip2x2.m.
+    """
+    A = _stack(A, 2)
+    Lclip = np.broadcast_to(np.asarray(Lclip, dtype=float), A.shape[:1])
+    if np.any(Lclip < 0):
+        raise ValueError("Lclip cannot be negative")
+
+    V1, V2, L1, L2 = eig2x2(A)
+    IsRemediated = np.minimum(L1, L2) < Lclip
+    L1 = np.maximum(L1, Lclip)
+    L2 = np.maximum(L2, Lclip)
+
+    rebuilt = (L1[:, None, None] * V1[:, :, None] * V1[:, None, :]
+               + L2[:, None, None] * V2[:, :, None] * V2[:, None, :])
+    Arem = np.where(IsRemediated[:, None, None], rebuilt, A)
+    return IsRemediated, Arem
+
+
+def pos_def_2x2(A):
+    """
+    Pivot test of PosDef2x2: 0 if positive definite, 1 if the first pivot
+    fails and 2 if the second one does.
+    """
+    A = _stack(A, 2)
+    a = A[:, 0, 0]
+    first = a > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        second = A[:, 1, 1] - A[:, 0, 1] ** 2 / np.where(first, a, np.nan) > 0
+    return np.where(~first, 1, np.where(second, 0, 2))
+
+
+def rev_chol_2x2(A):
+    """
+    Reverse Cholesky factor [a b c] of RevChol2x2, NaN where it is not real.
+    """
+    A = _stack(A, 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        c = np.sqrt(A[:, 1, 1])
+        b = A[:, 0, 1] / c
+        a = np.sqrt(A[:, 0, 0] - b * b)
+    return np.stack([a, b, c], axis=-1)
+
+
+def remediate_covariance_2x2(ProjectedCov, HBR):
+    """
+    Batched RemediateCovariance2x2.m. Non positive definite matrices are
+    clipped with increasing factors of HBR until they pass both pivot tests.
+    Returns (Arem, RevCholCov, IsPosDef, IsRemediated); matrices that cannot
+    be remediated get NaN Arem and RevCholCov.
+    """
+    A = _stack(ProjectedCov, 2).copy()
+    HBR = np.broadcast_to(np.asarray(HBR, dtype=float), A.shape[:1])
+
+    Arem = A.copy()
+    RevCholCov = rev_chol_2x2(A)
+    NPD = (pos_def_2x2(A) != 0) | np.isnan(RevCholCov).any(axis=-1)
+    IsRemediated = np.zeros(len(A), dtype=bool)
+
+    for Fclip in REMEDIATION_FCLIP:
+        if not NPD.any():
+            break
+        idx = np.flatnonzero(NPD)
+        clipped, remediated = cov_rem_eig_val_clip_2x2(A[idx], (Fclip * HBR[idx]) ** 2)
+        IsRemediated[idx] = clipped
+        Arem[idx] = remediated
+        chol = rev_chol_2x2(remediated)
+        fixed = (pos_def_2x2(remediated) == 0) & ~np.isnan(chol).any(axis=-1)
+        RevCholCov[idx[fixed]] = chol[fixed]
+        NPD[idx[fixed]] = False
+
+    Arem[NPD] = np.nan
+    RevCholCov[NPD] = np.nan
+    return Arem, RevCholCov, ~NPD, IsRemediated
+
+
+def cov_rem_eig_val_clip(A, Lclip=0.0):
+    """
+    Batched CovRemEigValClip.m for (N, k, k) symmetric stacks (2x2 in closed
+    form, larger sizes with a batched symmetric eigen-solver).
+
+    Returns (Lrem, Lraw, Vraw, IsPosDef, IsRemediated, Adet, Ainv, Arem) with
+    leading dimension N.
+    """
+    A = _stack(A)
+    Lclip = np.broadcast_to(np.asarray(Lclip, dtype=float), A.shape[:1])
+    if np.any(Lclip < 0):
+        raise ValueError("Lclip cannot be negative")
+
+    if A.shape[1] == 2:
+        V1, V2, L1, L2 = eig2x2(A)
+        Lraw = np.stack([L2, L1], axis=-1)
+        Vraw = np.stack([V2, V1], axis=-1)
+    else:
+        Lraw, Vraw = np.linalg.eigh(A)
+
+    IsPosDef = np.min(Lraw, axis=-1) > 0
+    clipped = Lraw < Lclip[:, None]
+    IsRemediated = clipped.any(axis=-1)
+    Lrem = np.where(clipped, Lclip[:, None], Lraw)
+
+    Vt = np.swapaxes(Vraw, -1, -2)
+    Adet = np.prod(Lrem, axis=-1)
+    Ainv = (Vraw / Lrem[:, None, :]) @ Vt
+    Arem = np.where(IsRemediated[:, None, None], (Vraw * Lrem[:, None, :]) @ Vt, A)
+    return Lrem, Lraw, Vraw, IsPosDef, IsRemediated, Adet, Ainv, Arem
+
+
+def covariance_flags(A, Lclip=0.0):
+    """
+    Cheap validation of (N, k, k) covariance stacks. Matrices are symmetrized
+    first. Returns (IsPosDef, IsRemediated) for clipping at Lclip; matrices
+    with non-finite entries are neither.
+    """
+    A = _stack(A)
+    A = 0.5 * (A + np.swapaxes(A, -1, -2))
+    finite = np.isfinite(A).all(axis=(-2, -1))
+    A = np.where(finite[:, None, None], A, 0.0)
+    Lraw = eig2x2(A)[3][:, None] if A.shape[1] == 2 else np.linalg.eigvalsh(A)
+    Lmin = np.where(finite, np.min(Lraw, axis=-1), np.nan)
+    return Lmin > 0, Lmin < np.broadcast_to(np.asarray(Lclip, dtype=float), Lmin.shape)
@@ -0,0 +1,342 @@
+"""
+NumPy implementation of the 3D Pc method of Hall (api/matlab/Pc3D_Hall.m).
+
+Pc is the time integral of the collision rate Ncdot(t) over the encounter:
+
+  Nc = int Ncdot(t) dt,   Ncdot(t) = HBR^2 int_{unit sphere} nu(rhat) N3(HBR rhat) drhat
+
+where N3 is the relative position density and nu the expected inward flux of
+the relative velocity through the HBR sphere. The sphere integral uses the
+precomputed Lebedev tables of api.pc.lebedev and is evaluated for all
+ephemeris times at once.
+
+This port differs from the MATLAB function in a few documented ways, because
+the equinoctial utilities it depends on (convert_cartesian_to_equinoctial,
+jacobian_equinoctial_to_cartesian, default_params_Pc3D_Hall, ...) are not part
+of this repository:
+
+  - Mean states are propagated with universal-variable two-body motion and the
+    covariances with the two-body state transition matrix. To first order this
+    equals the equinoctial mapping J(t) * phi(t) * K used by jacobian_E0_to_Xt.
+  - Ncdot is expanded about the mean states instead of the PeakOverlapPos
+    expansion centers (equivalent to PeakOverlapPos with zero iterations).
+  - The ephemeris starts on the Coppola (2012b) conjunction bounds and is
+    refined by expanding edges that still carry collision rate and by halving
+    the time step until successive Nc estimates agree to `rel_tol`.
+
+Inputs use the same units as Pc3D_Hall.m: meters, meters/second, m^2 (6x6
+position/velocity covariances) and a hard body radius in meters.
+"""
+import numpy as np
+from scipy.integrate import trapezoid
+from scipy.special import erfc, erfcinv
+
+from .lebedev import lebedev_sphere
+
+DEFAULT_PARAMS = {
+    'gamma': 1e-16,          # Coppola conjunction duration bound
+    'Neph': 101,             # Initial number of ephemeris times
+    'deg_Lebedev': 5810,     # Lebedev quadrature degree (number of unit vectors)
+    'rel_tol': 1e-4,         # Convergence tolerance of the Nc time integral
+    'max_refine': 10,        # Maximum number of ephemeris refinements
+    'Fclip': 1e-4,           # Eigenvalue clipping factor relative to HBR
+    'GM': 3.986004418e5,     # Earth gravitational constant (km^3/s^2)
+    'Pc_tiny': 1e-300,       # Nc values below this are reported as zero
+    'time_chunk': 64,        # Ephemeris times evaluated per array operation
+}
+
+# Mahalanobis distance beyond which Ncdot is negligible (same as Pc3D_Hall.m)
+MD2_CUT = 1491
+NCDOT_TINY = 1e-300
+
+
+def _stumpff(z):
+    """Stumpff functions C(z) and S(z) for an array of z."""
+    C = np.empty_like(z)
+    S = np.empty_like(z)
+    small = np.abs(z) < 1e-6
+    pos = (z > 0) & ~small
+    neg = (z < 0) & ~small
+
+    sz = np.sqrt(z[pos])
+    C[pos] = (1.0 - np.cos(sz)) / z[pos]
+    S[pos] = (sz - np.sin(sz)) / sz ** 3
+    sz = np.sqrt(-z[neg])
+    C[neg] = (np.cosh(sz) - 1.0) / -z[neg]
+    S[neg] = (np.sinh(sz) - sz) / sz ** 3
+    zs = z[small]
+    C[small] = 0.5 - zs / 24.0 + zs * zs / 720.0
+    S[small] = 1.0 / 6.0 - zs / 120.0 + zs * zs / 5040.0
+    return C, S
+
+
+def kepler_propagate(X0, t, mu):
+    """
+    Two-body propagation of states X0 (..., 6) to times t (...), broadcasting
+    X0[..., 0] against t. Uses universal variables, so elliptic and
+    hyperbolic orbits are both supported.
+    """
+    r0 = X0[..., :3]
+    v0 = X0[..., 3:]
+    r0n = np.linalg.norm(r0, axis=-1)
+    vr0 = np.einsum('...i,...i->...', r0, v0) / r0n
+    alpha = 2.0 / r0n - np.einsum('...i,...i->...', v0, v0) / mu
+    sqrt_mu = np.sqrt(mu)
+
+    r0n, vr0, alpha, t = np.broadcast_arrays(r0n, vr0, alpha, np.asarray(t, dtype=float))
+
+    # Initial guesses of Vallado (2013), Algorithm 8
+    chi = sqrt_mu * t / r0n
+    elliptic = alpha > 1e-12
+    chi = np.where(elliptic, sqrt_mu * t * alpha, chi)
+    hyperbolic = alpha < -1e-12
+    if np.any(hyperbolic):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = 1.0 / alpha
+            sign = np.where(t >= 0, 1.0, -1.0)
+            guess = sign * np.sqrt(-a) * np.log(
+                (-2.0 * mu * alpha * t)
+                / (r0n * vr0 + sign * np.sqrt(-mu * a) * (1.0 - r0n * alpha))
+            )
+        chi = np.where(hyperbolic & np.isfinite(guess), guess, chi)
+    for _ in range(100):
+        z = alpha * chi * chi
+        C, S = _stumpff(z)
+        F = (r0n * vr0 / sqrt_mu * chi * chi * C + (1.0 - alpha * r0n) * chi ** 3 * S
+             + r0n * chi - sqrt_mu * t)
+        dF = (r0n * vr0 / sqrt_mu * chi * (1.0 - z * S) + (1.0 - alpha * r0n) * chi * chi * C + r0n)
+        step = F / dF
+        chi = chi - step
+        if np.all(np.abs(step) <= 1e-13 * np.maximum(1.0, np.abs(chi))):
+            break
+
+    z = alpha * chi * chi
+    C, S = _stumpff(z)
+    f = 1.0 - chi * chi / r0n * C
+    g = t - chi ** 3 / sqrt_mu * S
+    r = f[..., np.newaxis] * r0 + g[..., np.newaxis] * v0
+    rn = np.linalg.norm(r, axis=-1)
+    fdot = sqrt_mu / (rn * r0n) * (z * S - 1.0) * chi
+    gdot = 1.0 - chi * chi / rn * C
+    v = fdot[..., np.newaxis] * r0 + gdot[..., np.newaxis] * v0
+    return np.concatenate([r, v], axis=-1)
+
+
+def propagate_with_stm(X0, t, mu):
+    """
+    Returns states (Nt, 6) and state transition matrices (Nt, 6, 6) of a
+    two-body orbit at times t, with the STM from central differences of the
+    vectorized propagator.
+    """
+    steps = np.concatenate([
+        np.full(3, 1e-6 * np.linalg.norm(X0[:3])),
+        np.full(3, 1e-6 * np.linalg.norm(X0[3:])),
+    ])
+    perturbed = np.concatenate([
+        X0[np.newaxis],
+        X0 + np.diag(steps),
+        X0 - np.diag(steps),
+    ])
+    X = kepler_propagate(perturbed[:, np.newaxis, :], np.asarray(t)[np.newaxis, :], mu)
+    Phi = (X[1:7] - X[7:13]) / (2.0 * steps[:, np.newaxis, np.newaxis])
+    return X[0], np.transpose(Phi, (1, 2, 0))
+
+
+def orbit_period(X, mu):
+    alpha = 2.0 / np.linalg.norm(X[:3]) - np.dot(X[3:], X[3:]) / mu
+    return 2.0 * np.pi / np.sqrt(mu * alpha ** 3) if alpha > 0 else np.inf
+
+
+def conj_bounds_coppola(gamma, HBR, rci, vci, Pci):
+    """
+    Port of Utils/conj_bounds_Coppola.m: conjunction duration bounds
+    (tau0, tau1) relative to TCA for rectilinear relative motion.
+    """
+    v0mag = np.linalg.norm(vci)
+    if v0mag < 100 * np.finfo(float).eps:
+        return -np.inf, np.inf
+
+    xhat = vci / v0mag
+    yhat = rci - xhat * np.dot(xhat, rci)
+    yhat = yhat / np.linalg.norm(yhat)
+    zhat = np.cross(xhat, yhat)
+    eROTi = np.stack([xhat, yhat, zhat])
+
+    rce = eROTi @ rci
+    Ace = eROTi @ Pci[:3, :3] @ eROTi.T
+    eta2 = Ace[0, 0]
+    w = Ace[1:3, 0]
+    b = np.linalg.solve(Ace[1:3, 1:3].T, w)
+    sv2 = np.sqrt(max(0.0, 2.0 * (eta2 - b @ w)))
+    q0 = b @ rce[1:3]
+    bTb = b @ b
+    dmin = -HBR * np.sqrt(bTb)
+    dmax = HBR * np.sqrt(1.0 + bTb)
+
+    temp = erfcinv(gamma) * sv2
+    tau0 = (-temp + q0 - dmax) / v0mag
+    tau1 = (temp + q0 - dmin) / v0mag
+    return tau0, tau1
+
+
+def _clip_inverse(A, Lclip):
+    # Batched CovRemEigValClip returning (det, inverse) of symmetric 3x3 matrices
+    L, V = np.linalg.eigh(A)
+    L = np.maximum(L, Lclip)
+    return np.prod(L, axis=-1), (V / L[:, np.newaxis, :]) @ np.swapaxes(V, -1, -2)
+
+
+def ncdot(t, X1, P1, X2, P2, H, nodes, weights, params):
+    """
+    Collision rate at ephemeris times t (Nt,), vectorized over time and over
+    the Lebedev unit vectors. States/covariances are in km units.
+    Returns (Ncdot, MD2eff).
+    """
+    mu = params['GM']
+    Xt1, Phi1 = propagate_with_stm(X1, t, mu)
+    Xt2, Phi2 = propagate_with_stm(X2, t, mu)
+    Ps = Phi1 @ P1 @ np.swapaxes(Phi1, -1, -2) + Phi2 @ P2 @ np.swapaxes(Phi2, -1, -2)
+    Ps = 0.5 * (Ps + np.swapaxes(Ps, -1, -2))
+
+    ru = Xt2[:, :3] - Xt1[:, :3]
+    vu = Xt2[:, 3:] - Xt1[:, 3:]
+    As = Ps[:, :3, :3]
+    Bs = Ps[:, 3:, :3]
+    Cs = Ps[:, 3:, 3:]
+
+    Asdet, Asinv = _clip_inverse(As, (params['Fclip'] * H) ** 2)
+    logZ = 0.5 * np.log((2.0 * np.pi) ** 3 * Asdet)
+    bs = Bs @ Asinv
+    Csp = Cs - bs @ np.swapaxes(Bs, -1, -2)
+
+    Asinv_ru = np.einsum('tij,tj->ti', Asinv, ru)
+    MD2 = np.einsum('ti,ti->t', ru, Asinv_ru)
+    MS2 = MD2 - 2.0 * H * np.linalg.norm(Asinv_ru, axis=-1)
+
+    result = np.zeros(len(t))
+    active = np.flatnonzero(MS2 <= MD2_CUT)
+    sqrt2pi = np.sqrt(2.0 * np.pi)
+    for start in range(0, len(active), params['time_chunk']):
+        idx = active[start:start + params['time_chunk']]
+        dr = H * nodes[np.newaxis] - ru[idx, np.newaxis, :]
+        sig2 = np.einsum('ki,tij,kj->tk', nodes, Csp[idx], nodes)
+        nu0 = np.einsum('ki,tki->tk', nodes, vu[idx, np.newaxis, :] + np.einsum('tij,tkj->tki', bs[idx], dr))
+
+        # Zero or negative velocity variance along rhat: deterministic flux
+        positive = sig2 > 0
+        sig = np.sqrt(np.where(positive, sig2, 1.0))
+        nus = nu0 / (sig * np.sqrt(2.0))
+        flux = sig * (np.exp(-nus * nus) - np.sqrt(np.pi) * nus * erfc(nus)) / sqrt2pi
+        deterministic = np.maximum(0.0, -np.einsum('ki,ti->tk', nodes, vu[idx]))
+        nu = np.where(positive, flux, deterministic)
+
+        md2 = np.einsum('tki,tij,tkj->tk', dr, Asinv[idx], dr)
+        integrand = nu * np.exp(-(logZ[idx, np.newaxis] + 0.5 * md2))
+        result[idx] = H * H * (integrand @ weights)
+
+    result[result <= NCDOT_TINY] = 0.0
+    return result, MD2
+
+
+def pc3d_hall(r1, v1, C1, r2, v2, C2, HBR, params=None):
+    """
+    Computes the 3D Pc of a single conjunction. C1 and C2 may be 3x3 (no
+    velocity uncertainty) or 6x6. Returns (Pc, out) where out holds the
+    ephemeris times, collision rates and convergence information; Pc is NaN
+    if the refinement did not converge.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    HBR = np.sum(np.atleast_1d(np.asarray(HBR, dtype=float)))
+    if HBR <= 0:
+        raise ValueError("Combined HBR value must be positive.")
+    if np.isinf(HBR):
+        return 1.0, {'converged': True}
+
+    def six_by_six(C):
+        C = np.asarray(C, dtype=float)
+        C = 0.5 * (C + C.T)  # cov_make_symmetric
+        if C.shape == (6, 6):
+            return C
+        if C.shape == (3, 3):
+            full = np.zeros((6, 6))
+            full[:3, :3] = C
+            return full
+        raise ValueError(f"Covariance must be 3x3 or 6x6, got {C.shape}.")
+
+    # Work in km, as Pc3D_Hall.m does
+    X1 = np.concatenate([np.ravel(r1), np.ravel(v1)]).astype(float) / 1e3
+    X2 = np.concatenate([np.ravel(r2), np.ravel(v2)]).astype(float) / 1e3
+    P1 = six_by_six(C1) / 1e6
+    P2 = six_by_six(C2) / 1e6
+    H = HBR / 1e3
+    nodes, weights = lebedev_sphere(params['deg_Lebedev'])
+
+    tau0, tau1 = conj_bounds_coppola(params['gamma'], H, X2[:3] - X1[:3], X2[3:] - X1[3:], P1 + P2)
+    half_period = 0.5 * min(orbit_period(X1, params['GM']), orbit_period(X2, params['GM']))
+    Tmin_limit, Tmax_limit = -half_period, half_period
+    if not np.isfinite(tau0) or not np.isfinite(tau1):
+        tau0, tau1 = Tmin_limit, Tmax_limit
+    Tmin = max(tau0, Tmin_limit)
+    Tmax = min(tau1, Tmax_limit)
+    if not Tmin < Tmax:
+        raise ValueError("Conjunction time bounds span a nonpositive interval.")
+
+    def evaluate(t):
+        return ncdot(t, X1, P1, X2, P2, H, nodes, weights, params)
+
+    Teph = np.linspace(Tmin, Tmax, params['Neph'])
+    Ncdot, MD2eff = evaluate(Teph)
+
+    # Expand the ephemeris while its edges still carry a significant rate
+    Ncdotred = np.exp(-0.5 * (np.sqrt(2.0) * erfcinv(params['gamma'])) ** 2) / np.sqrt(2.0 * np.pi)
+    dT = Teph[1] - Teph[0]
+    for _ in range(params['max_refine']):
+        cut = Ncdot.max() * Ncdotred
+        grow_lo = Ncdot[0] > cut and Teph[0] > Tmin_limit
+        grow_hi = Ncdot[-1] > cut and Teph[-1] < Tmax_limit
+        if not (grow_lo or grow_hi):
+            break
+        span = 0.5 * (Teph[-1] - Teph[0])
+        new_times = []
+        if grow_lo:
+            new_times.append(np.arange(Teph[0] - dT, max(Teph[0] - span, Tmin_limit) - 0.5 * dT, -dT)[::-1])
+        if grow_hi:
+            new_times.append(np.arange(Teph[-1] + dT, min(Teph[-1] + span, Tmax_limit) + 0.5 * dT, dT))
+        new_times = np.concatenate(new_times)
+        new_Ncdot, new_MD2 = evaluate(new_times)
+        order = np.argsort(np.concatenate([Teph, new_times]))
+        Teph = np.concatenate([Teph, new_times])[order]
+        Ncdot = np.concatenate([Ncdot, new_Ncdot])[order]
+        MD2eff = np.concatenate([MD2eff, new_MD2])[order]
+
+    # Halve the time step until successive Nc estimates agree
+    Nc = trapezoid(Ncdot, Teph)
+    converged = Nc <= params['Pc_tiny']
+    for _ in range(params['max_refine']):
+        if converged:
+            break
+        midpoints = 0.5 * (Teph[1:] + Teph[:-1])
+        mid_Ncdot, mid_MD2 = evaluate(midpoints)
+        Teph = np.insert(Teph, np.arange(1, len(Teph)), midpoints)
+        Ncdot = np.insert(Ncdot, np.arange(1, len(Ncdot)), mid_Ncdot)
+        MD2eff = np.insert(MD2eff, np.arange(1, len(MD2eff)), mid_MD2)
+        Nc_new = trapezoid(Ncdot, Teph)
+        converged = abs(Nc_new - Nc) <= params['rel_tol'] * abs(Nc_new)
+        Nc = Nc_new
+
+    if Nc <= params['Pc_tiny']:
+        Nc = 0.0
+    out = {
+        'converged': bool(converged),
+        'tau0': tau0 * 1.0,
+        'tau1': tau1 * 1.0,
+        'Teph': Teph,
+        'Ncdot': Ncdot,
+        'MD2eff': MD2eff,
+        'MD2min': float(np.min(MD2eff)),
+        'Neph': len(Teph),
+        'Nc': float(Nc),
+    }
+    Pc = min(1.0, float(Nc)) if converged else np.nan
+    return Pc, out
@@ -0,0 +1,106 @@
+"""
+Helpers that turn CDM rows into the array inputs expected by the Pc backends.
+"""
+import hashlib
+
+import numpy as np
+
+from .covariance import covariance_flags
+
+DEFAULT_REL_TOL = 1e-8
+DEFAULT_HBR_TYPE = 'circle'
+
+
+# Layout of the packed CDM.covariance column: the 3x3 RTN position
+# covariances of both objects, object 1 first, row-major little-endian float64
+COVARIANCE_DTYPE = np.dtype('<f8')
+COVARIANCE_SHAPE = (2, 3, 3)
+
+
+def pack_covariances(values):
+    """Packs 18 covariance elements (or a (2, 3, 3) array) into CDM.covariance bytes."""
+    return np.asarray(values, dtype=COVARIANCE_DTYPE).reshape(COVARIANCE_SHAPE).tobytes()
+
+
+def null_covariance():
+    """Packed covariance with every element missing (NaN)."""
+    return pack_covariances(np.full(COVARIANCE_SHAPE, np.nan))
+
+
+def unpack_covariances(packed):
+    """A read-only (2, 3, 3) view of packed covariance bytes, without copying."""
+    return np.frombuffer(packed, dtype=COVARIANCE_DTYPE).reshape(COVARIANCE_SHAPE)
+
+
+def cdm_covariance_stack(cdms):
+    """The covariances of several CDMs as one writable (N, 2, 3, 3) array."""
+    packed = bytearray().join(cdm.covariance for cdm in cdms)
+    return np.frombuffer(packed, dtype=COVARIANCE_DTYPE).reshape((-1,) + COVARIANCE_SHAPE)
+
+
+def cdm_covariances(cdm):
+    """Returns the 3x3 position covariances of both objects as arrays."""
+    cov1, cov2 = unpack_covariances(cdm.covariance)
+    return cov1, cov2
+
+
+def _cdm_states(cdm):
+    return (
+        (cdm.sat1_x, cdm.sat1_y, cdm.sat1_z),
+        (cdm.sat1_x_dot, cdm.sat1_y_dot, cdm.sat1_z_dot),
+        (cdm.sat2_x, cdm.sat2_y, cdm.sat2_z),
+        (cdm.sat2_x_dot, cdm.sat2_y_dot, cdm.sat2_z_dot),
+        cdm.hard_body_radius,
+    )
+
+
+def cdm_pc_inputs(cdm):
+    """
+    Returns (r1, v1, cov1, r2, v2, cov2, HBR) for a single CDM.
+    """
+    r1, v1, r2, v2, HBR = _cdm_states(cdm)
+    cov1, cov2 = cdm_covariances(cdm)
+    return (
+        np.array(r1, dtype=float), np.array(v1, dtype=float), cov1,
+        np.array(r2, dtype=float), np.array(v2, dtype=float), cov2, float(HBR)
+    )
+
+
+def cdm_content_hash(cdm):
+    """
+    Canonical hash (sha256 hex) of a CDM's Pc inputs: states, position
+    covariances and HBR. Equal inputs hash equally whatever their source.
+    """
+    digest = hashlib.sha256()
+    for value in cdm_pc_inputs(cdm):
+        # Adding 0.0 folds -0.0 into 0.0 so equal inputs hash equally
+        digest.update(np.ascontiguousarray(np.asarray(value, dtype=float) + 0.0).tobytes())
+    return digest.hexdigest()
+
+
+def cdm_pc_batch_inputs(cdms):
+    """
+    Stacks the Pc inputs of several CDMs into arrays with leading dimension N.
+    The covariances are read straight from the packed column.
+    """
+    if not cdms:
+        return (np.empty((0, 3)), np.empty((0, 3)), np.empty((0, 3, 3)),
+                np.empty((0, 3)), np.empty((0, 3)), np.empty((0, 3, 3)), np.empty(0))
+    r1, v1, r2, v2, HBR = (np.array(column, dtype=float) for column in zip(*(_cdm_states(cdm) for cdm in cdms)))
+    covs = cdm_covariance_stack(cdms)
+    return r1, v1, covs[:, 0], r2, v2, covs[:, 1], HBR
+
+
+def cdm_covariance_flags(cdms):
+    """
+    Validates the position covariances of several CDMs in one batch.
+    Returns (IsPosDef, IsRemediated) arrays of shape (N, 2), one column per
+    object, for clipping at the Pc2D_Foster level (1e-4 * HBR)^2.
+    """
+    if not cdms:
+        return np.empty((0, 2), dtype=bool), np.empty((0, 2), dtype=bool)
+    covs = cdm_covariance_stack(cdms)
+    HBR = np.array([float(cdm.hard_body_radius) for cdm in cdms])
+    Lclip = np.repeat((1e-4 * HBR) ** 2, 2)
+    IsPosDef, IsRemediated = covariance_flags(covs.reshape(-1, 3, 3), Lclip)
+    return IsPosDef.reshape(-1, 2), IsRemediated.reshape(-1, 2)
@@ -0,0 +1,162 @@
+"""
+Lebedev unit-sphere quadrature tables for the 3D Hall Pc method.
+
+The node/weight tables are generated once from the coefficients in
+api/matlab/Utils/getLebedevSphere.m (see build_lebedev_tables) and shipped as
+the compressed archive api/pc/data/lebedev.npz. On first use a degree is
+unpacked into an uncompressed .npy file in LEBEDEV_CACHE_DIR and memory-mapped
+from there, so every process shares the same pages instead of rebuilding the
+quadrature per call.
+"""
+import itertools
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+LEBEDEV_SOURCE = Path(__file__).resolve().parent.parent / 'matlab' / 'Utils' / 'getLebedevSphere.m'
+LEBEDEV_TABLES = Path(__file__).resolve().parent / 'data' / 'lebedev.npz'
+
+# Number of points generated by each recurrence type of getLebedevReccurencePoints
+_TYPE_SIZES = {1: 6, 2: 12, 3: 8, 4: 24, 5: 24, 6: 48}
+
+_CASE = re.compile(r'^\s*case\s+(\d+)\s*$')
+_ASSIGN = re.compile(r'^\s*([abv])\s*=\s*([-+0-9.Ee]+)\s*;')
+_CALL = re.compile(r'getLebedevReccurencePoints\((\d)\s*,')
+
+
+def parse_lebedev_source(path=LEBEDEV_SOURCE):
+    """
+    Extracts {degree: [(type, a, b, v), ...]} from getLebedevSphere.m.
+    """
+    rules = {}
+    degree = None
+    values = {}
+    with open(path) as source:
+        for line in source:
+            if line.lstrip().startswith('function [leb start]'):
+                break  # the recurrence helper follows the degree table
+            line = line.split('%', 1)[0]
+            match = _CASE.match(line)
+            if match:
+                degree = int(match.group(1))
+                rules[degree] = []
+                values = {'a': 0.0, 'b': 0.0, 'v': 0.0}
+                continue
+            if degree is None:
+                continue
+            for name, value in _ASSIGN.findall(line):
+                values[name] = float(value)
+            match = _CALL.search(line)
+            if match:
+                rules[degree].append((int(match.group(1)), values['a'], values['b'], values['v']))
+    return rules
+
+
+def _orbit(rule_type, a, b):
+    # Octahedral orbit of one generator point, as in getLebedevReccurencePoints
+    if rule_type == 1:
+        base = (1.0, 0.0, 0.0)
+    elif rule_type == 2:
+        base = (0.0, np.sqrt(0.5), np.sqrt(0.5))
+    elif rule_type == 3:
+        base = (np.sqrt(1.0 / 3.0),) * 3
+    elif rule_type == 4:
+        base = (a, a, np.sqrt(1.0 - 2.0 * a * a))
+    elif rule_type == 5:
+        base = (a, np.sqrt(1.0 - a * a), 0.0)
+    elif rule_type == 6:
+        base = (a, b, np.sqrt(1.0 - a * a - b * b))
+    else:
+        raise ValueError(f"Bad Lebedev recurrence type {rule_type}.")
+
+    points = set()
+    for perm in itertools.permutations(base):
+        for signs in itertools.product((1.0, -1.0), repeat=3):
+            points.add(tuple(s * p + 0.0 for s, p in zip(signs, perm)))
+    points = sorted(points)
+    if len(points) != _TYPE_SIZES[rule_type]:
+        raise ValueError(f"Lebedev type {rule_type} generated {len(points)} points.")
+    return points
+
+
+def lebedev_points(rules):
+    """Builds (degree, 3) nodes and (degree,) weights from recurrence rules."""
+    nodes = []
+    weights = []
+    for rule_type, a, b, v in rules:
+        orbit = _orbit(rule_type, a, b)
+        nodes.extend(orbit)
+        weights.extend([4.0 * np.pi * v] * len(orbit))
+    return np.array(nodes, dtype=float), np.array(weights, dtype=float)
+
+
+def build_lebedev_tables(output=LEBEDEV_TABLES, source=LEBEDEV_SOURCE):
+    """
+    Generates every Lebedev degree defined in getLebedevSphere.m and writes
+    them to a compressed .npz archive. Returns the list of degrees written.
+    """
+    arrays = {}
+    for degree, rules in parse_lebedev_source(source).items():
+        nodes, weights = lebedev_points(rules)
+        if len(weights) != degree:
+            raise ValueError(f"Lebedev degree {degree} generated {len(weights)} points.")
+        if not np.isclose(weights.sum(), 4.0 * np.pi, rtol=1e-12, atol=0):
+            raise ValueError(f"Lebedev degree {degree} weights do not sum to 4*pi.")
+        arrays[f'nodes_{degree}'] = nodes
+        arrays[f'weights_{degree}'] = weights
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(output, **arrays)
+    return sorted(int(name.split('_')[1]) for name in arrays if name.startswith('weights_'))
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def _cache_dir():
+    cache_dir = getattr(settings, 'LEBEDEV_CACHE_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'orbit_predictor_lebedev'
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _memmap(name):
+    # Unpack one member of the compressed archive once, then memory-map it
+    path = os.path.join(_cache_dir(), f'{name}.npy')
+    if not os.path.exists(path):
+        with np.load(LEBEDEV_TABLES) as tables:
+            if name not in tables.files:
+                raise KeyError(name)
+            array = tables[name]
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as tmp:
+            np.save(tmp, array)
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode='r')
+
+
+def available_degrees():
+    with np.load(LEBEDEV_TABLES) as tables:
+        return sorted(int(name.split('_')[1]) for name in tables.files if name.startswith('weights_'))
+
+
+def lebedev_sphere(degree):
+    """
+    Returns read-only (degree, 3) unit vectors and (degree,) weights that
+    integrate over the unit sphere (weights sum to 4*pi).
+    """
+    with _load_lock:
+        if degree not in _loaded:
+            try:
+                _loaded[degree] = (_memmap(f'nodes_{degree}'), _memmap(f'weights_{degree}'))
+            except KeyError:
+                raise ValueError(
+                    f"Unsupported Lebedev degree {degree}. Choose one of: {available_degrees()}."
+                )
+        return _loaded[degree]
@@ -0,0 +1,197 @@
+"""
+Process-wide pool of MATLAB engines.
+
+Starting MATLAB takes several seconds, so engines are started once, have the
+api/matlab path added once, and are then checked out and returned by request
+handlers:
+
+    with matlab_engine_pool().engine() as eng:
+        eng.Pc2D_Foster(...)
+
+Engines are health-checked on checkout and replaced if they have died.
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import matlab.engine
+except ImportError:  # MATLAB is optional when a native backend is selected
+    matlab = None
+
+logger = logging.getLogger(__name__)
+
+MATLAB_PATH = Path(__file__).resolve().parent.parent / 'matlab'
+
+
+class MatlabEnginePool:
+    """
+    A bounded pool of MATLAB engines. At most `size` engines exist at a time;
+    they are started lazily on demand, or all at once by warm_up().
+    """
+
+    def __init__(self, size=1, checkout_timeout=None):
+        if size < 1:
+            raise ImproperlyConfigured("MATLAB_POOL_SIZE must be at least 1.")
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._started = 0
+
+        # Checkout wait-time metrics, in seconds
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+        self._restarts = 0
+
+    def _start_engine(self):
+        if matlab is None:
+            raise ImproperlyConfigured("The MATLAB engine for Python is not installed.")
+        eng = matlab.engine.start_matlab()
+        eng.addpath(str(MATLAB_PATH))
+        return eng
+
+    @staticmethod
+    def _is_alive(eng):
+        try:
+            eng.eval('1;', nargout=0)
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self):
+        """Starts engines until the pool is full."""
+        while True:
+            with self._lock:
+                if self._started >= self.size:
+                    return
+                self._started += 1
+            try:
+                self._idle.put(self._start_engine())
+            except Exception:
+                with self._lock:
+                    self._started -= 1
+                raise
+
+    def _acquire(self):
+        # Reuse an idle engine, start a new one if the pool has room, or wait
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_start = self._started < self.size
+            if can_start:
+                self._started += 1
+        if can_start:
+            try:
+                return self._start_engine()
+            except Exception:
+                with self._lock:
+                    self._started -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No MATLAB engine became available within {self.checkout_timeout} seconds."
+            )
+
+    def checkout(self):
+        """Returns a live engine; it must be handed back with checkin()."""
+        started_at = time.monotonic()
+        eng = self._acquire()
+        if not self._is_alive(eng):
+            logger.warning("MATLAB engine died while idle; restarting it.")
+            self._discard(eng)
+            eng = self._start_engine()
+            with self._lock:
+                self._started += 1
+                self._restarts += 1
+
+        waited = time.monotonic() - started_at
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_last = waited
+        return eng
+
+    def checkin(self, eng, healthy=True):
+        """Returns an engine to the pool, dropping it if it is no longer usable."""
+        if healthy or self._is_alive(eng):
+            self._idle.put(eng)
+        else:
+            self._discard(eng)
+
+    def _discard(self, eng):
+        with self._lock:
+            self._started -= 1
+        try:
+            eng.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def engine(self):
+        eng = self.checkout()
+        healthy = True
+        try:
+            yield eng
+        except Exception:
+            # MATLAB errors are usually input errors; checkin() re-checks liveness
+            healthy = False
+            raise
+        finally:
+            self.checkin(eng, healthy)
+
+    def shutdown(self):
+        while True:
+            try:
+                eng = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(eng)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "started": self._started,
+                "idle": self._idle.qsize(),
+                "checkouts": self._checkouts,
+                "restarts": self._restarts,
+                "checkout_wait_seconds": {
+                    "last": self._wait_last,
+                    "max": self._wait_max,
+                    "mean": self._wait_total / self._checkouts if self._checkouts else 0.0,
+                    "total": self._wait_total,
+                },
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def matlab_engine_pool():
+    """Returns the process-wide engine pool, configured from settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MatlabEnginePool(
+                    size=getattr(settings, 'MATLAB_POOL_SIZE', 1),
+                    checkout_timeout=getattr(settings, 'MATLAB_POOL_CHECKOUT_TIMEOUT', None),
+                )
+    return _pool
@@ -0,0 +1,93 @@
+"""
+Cheap, rigorous upper bound on the 2D Pc used to screen out negligible
+conjunctions before full integration.
+
+With the same conjunction plane, remediated 2x2 covariance A and HBR region
+(area S, circumscribed radius rho, centered at the miss distance x0) as
+Pc2D_Foster, every point p of the region satisfies
+
+  p' A^-1 p >= lmin * dmin^2,   lmin = smallest eigenvalue of A^-1,
+                                dmin = max(x0 - rho, 0)
+
+so the integrand is bounded by its value at that Mahalanobis distance, and
+
+  Pc2D <= S / (2 pi sqrt(det A)) * exp(-lmin dmin^2 / 2)
+
+(capped at 1). The bound holds for the given covariance only; the looser
+maximum-Pc-over-covariance-scaling bound is never smaller, so it is not used.
+"""
+import numpy as np
+from django.conf import settings
+
+from .foster import HBR_TYPES, broadcast_conjunctions, conjunction_plane, eigen_clip
+
+# Pc paths recorded on Collision.pc_method
+PC_METHOD_INTEGRATED = 'integrated'
+PC_METHOD_UPPER_BOUND = 'upper_bound'
+
+
+def _region(HBR, hbr_type):
+    # (area, circumscribed radius) of the HBR region
+    if hbr_type == 'circle':
+        return np.pi * HBR ** 2, HBR
+    if hbr_type == 'square':
+        return 4.0 * HBR ** 2, np.sqrt(2.0) * HBR
+    return np.pi * HBR ** 2, np.sqrt(0.5 * np.pi) * HBR
+
+
+def pc2d_upper_bound(r1, v1, cov1, r2, v2, cov2, HBR, HBRType='circle'):
+    """
+    Returns an (N,) upper bound on the Pc2D_Foster value of each conjunction.
+    The bound is NaN wherever Pc2D_Foster would return NaN.
+    """
+    hbr_type = HBRType.lower()
+    if hbr_type not in HBR_TYPES:
+        raise ValueError(f"{HBRType} as HBRType is not supported...")
+
+    r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+    Cp, x0 = conjunction_plane(r1, v1, cov1, r2, v2, cov2)
+    Lrem, _, Adet, Ainv, _ = eigen_clip(Cp, (1e-4 * HBR) ** 2)
+
+    # Smallest eigenvalue of the symmetric part of A^-1, in closed form
+    a = Ainv[:, 0, 0]
+    b = 0.5 * (Ainv[:, 0, 1] + Ainv[:, 1, 0])
+    c = Ainv[:, 1, 1]
+    lmin = 0.5 * (a + c) - np.hypot(0.5 * (a - c), b)
+
+    area, rho = _region(HBR, hbr_type)
+    dmin = np.maximum(x0 - rho, 0.0)
+    md2 = np.maximum(lmin, 0.0) * dmin * dmin
+    norm = area / (2.0 * np.pi * np.sqrt(Adet))
+
+    with np.errstate(invalid='ignore'):
+        bound = np.minimum(norm * np.exp(-0.5 * md2), 1.0)
+
+    undefined = ~(np.min(Lrem, axis=-1) > 0) | ~np.isfinite(Adet) | ~np.isfinite(x0)
+    return np.where(undefined, np.nan, bound)
+
+
+def screened_pc(backend, r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, HBRType='circle', floor=None):
+    """
+    Computes Pc with `backend` only for conjunctions whose upper bound reaches
+    `floor` (default settings.PC_SCREEN_FLOOR, 0 disables screening); the
+    others are given the bound itself.
+    Returns (Pc, methods) where methods holds PC_METHOD_INTEGRATED or
+    PC_METHOD_UPPER_BOUND per conjunction.
+    """
+    if floor is None:
+        floor = getattr(settings, 'PC_SCREEN_FLOOR', 0.0)
+    r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+
+    bound = pc2d_upper_bound(r1, v1, cov1, r2, v2, cov2, HBR, HBRType)
+    # A NaN bound always goes through integration, which reports it
+    integrate = ~(bound < floor)
+
+    Pc = bound.copy()
+    methods = np.where(integrate, PC_METHOD_INTEGRATED, PC_METHOD_UPPER_BOUND)
+    if integrate.any():
+        Pc[integrate] = backend.compute(
+            r1[integrate], v1[integrate], cov1[integrate],
+            r2[integrate], v2[integrate], cov2[integrate],
+            HBR[integrate], RelTol, HBRType
+        )
+    return Pc, methods
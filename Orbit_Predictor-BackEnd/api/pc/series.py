@@ -0,0 +1,136 @@
+"""
+Series evaluation of the 2D Pc for stacked conjunctions.
+
+In the conjunction plane the Pc is P(|Y - c|^2 <= HBR^2) for Y ~ N(0, A) and
+the miss vector c = (x0, 0). In the eigenbasis of A this is the distribution
+of the quadratic form
+
+  Q = l1 (Z1 + d1)^2 + l2 (Z2 + d2)^2,   l1 >= l2,
+
+whose CDF has the convergent expansion of Ruben (1962) in central chi-square
+CDFs with 2 + 2k degrees of freedom:
+
+  Pc = sum_k c_k F_{2+2k}(HBR^2 / l2),   c_k >= 0,   sum_k c_k = 1
+
+For an isotropic covariance (l1 = l2) the weights c_k are Poisson and this is
+Chan's series; otherwise the c_k follow a three-term recurrence. Because every
+F_{2+2k} is bounded by F_{2+2K}, truncating after K terms leaves an error of at
+most (1 - sum_{k<K} c_k) F_{2+2K}(HBR^2 / l2), which is used as the stopping
+rule. Only the circular HBR has this form.
+"""
+import numpy as np
+from scipy.special import gammainc
+
+from .foster import ABS_TOL, broadcast_conjunctions, conjunction_plane, eigen_clip
+
+DEFAULT_MAX_TERMS = 2000
+
+
+def _plane_quadratic_form(Ainv, Adet, x0):
+    """
+    Returns (l1, l2, d1sq, d2sq, factor) for the same quadratic form that
+    Pc2D_Foster integrates. `factor` rescales the result when the remediated
+    covariance is not symmetric, so that the Foster normalization is kept.
+    """
+    a = Ainv[:, 0, 0]
+    b = 0.5 * (Ainv[:, 0, 1] + Ainv[:, 1, 0])
+    c = Ainv[:, 1, 1]
+    det = a * c - b * b
+
+    # Covariance of the symmetric form and its eigenvalues, in closed form
+    p, q, r = c / det, -b / det, a / det
+    mean = 0.5 * (p + r)
+    half_diff = 0.5 * (p - r)
+    h = np.hypot(half_diff, q)
+    l1 = mean + h
+    l2 = mean - h
+
+    # Squared first component of the l1 eigenvector
+    with np.errstate(invalid='ignore', divide='ignore'):
+        u11sq = np.where(h > 0, 0.5 * (1.0 + half_diff / h), 1.0)
+    d1sq = x0 * x0 * u11sq / l1
+    d2sq = x0 * x0 * (1.0 - u11sq) / l2
+    factor = 1.0 / np.sqrt(det * Adet)
+    return l1, l2, d1sq, d2sq, factor
+
+
+def _series(l1, l2, d1sq, d2sq, HBR, RelTol, AbsTol, max_terms):
+    """
+    Sums the series for 1D arrays of quadratic forms until the truncation
+    error is below max(RelTol * Pc, AbsTol) per row. Returns (Pc, PcError).
+    """
+    n = len(l1)
+    Pc = np.zeros(n)
+    PcError = np.ones(n)
+
+    gam = 1.0 - l2 / l1
+    a = 0.5 * d1sq * (1.0 - gam)
+    b = 0.5 * d2sq
+    y = 0.5 * HBR * HBR / l2
+
+    # c_0 and c_1 start the recurrence c_{k+1} = (u_k c_k + v_k c_{k-1} + w c_{k-2}) / (k + 1)
+    c_prev2 = np.zeros(n)
+    c_prev = np.zeros(n)
+    c_k = np.sqrt(1.0 - gam) * np.exp(-(a / (1.0 - gam) + b))
+    weight = np.zeros(n)
+    active = np.arange(n)
+
+    for k in range(max_terms):
+        F_k = gammainc(k + 1.0, y)
+        Pc[active] += c_k * F_k
+        weight += c_k
+        # Every later F is at most F_{k+1}, and the remaining weights sum to 1 - weight
+        PcError[active] = np.maximum(1.0 - weight, 0.0) * gammainc(k + 2.0, y)
+
+        done = PcError[active] <= np.maximum(RelTol * Pc[active], AbsTol)
+        if done.all():
+            break
+        if done.any():
+            keep = ~done
+            active = active[keep]
+            gam, a, b, y, AbsTol = gam[keep], a[keep], b[keep], y[keep], AbsTol[keep]
+            c_prev2, c_prev, c_k, weight = c_prev2[keep], c_prev[keep], c_k[keep], weight[keep]
+
+        c_next = (
+            (2.0 * gam * k + 0.5 * gam + a + b) * c_k
+            - (gam * gam * (k - 0.5) + 2.0 * b * gam) * c_prev
+            + b * gam * gam * c_prev2
+        ) / (k + 1.0)
+        c_prev2, c_prev, c_k = c_prev, c_k, np.maximum(c_next, 0.0)
+
+    return Pc, PcError
+
+
+def pc2d_series(r1, v1, cov1, r2, v2, cov2, HBR, RelTol=1e-8, max_terms=DEFAULT_MAX_TERMS):
+    """
+    Computes the 2D Pc of a circular HBR for one or many conjunctions with the
+    truncated series, using the same conjunction plane and covariance
+    remediation as Pc2D_Foster.
+
+    Returns (Pc, PcError, IsPosDef, IsRemediated) with leading dimension N.
+    PcError bounds the truncation error; it exceeds max(RelTol * Pc, ABS_TOL)
+    only where max_terms terms were not enough. Non positive definite
+    conjunctions get a NaN Pc and PcError.
+    """
+    r1, v1, cov1, r2, v2, cov2, HBR = broadcast_conjunctions(r1, v1, cov1, r2, v2, cov2, HBR)
+    Cp, x0 = conjunction_plane(r1, v1, cov1, r2, v2, cov2)
+
+    Lclip = (1e-4 * HBR) ** 2
+    Lrem, IsRemediated, Adet, Ainv, _ = eigen_clip(Cp, Lclip)
+    IsPosDef = np.min(Lrem, axis=-1) > 0
+
+    Pc = np.full(x0.shape, np.nan)
+    PcError = np.full(x0.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        l1, l2, d1sq, d2sq, factor = _plane_quadratic_form(Ainv, Adet, x0)
+    ok = IsPosDef & (l2 > 0) & np.isfinite(factor) & np.isfinite(x0)
+    if not ok.any():
+        return Pc, PcError, IsPosDef, IsRemediated
+
+    with np.errstate(under='ignore'):
+        series_pc, series_error = _series(
+            l1[ok], l2[ok], d1sq[ok], d2sq[ok], HBR[ok], RelTol, ABS_TOL / factor[ok], max_terms
+        )
+    Pc[ok] = series_pc * factor[ok]
+    PcError[ok] = series_error * factor[ok]
+    return Pc, PcError, IsPosDef, IsRemediated
@@ -0,0 +1,37 @@
+# api/renderers.py
+
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Lets content negotiation accept a media type that the view answers with
+    its own HttpResponse (streams, binary payloads). Data that still reaches
+    the renderer, such as an error Response, is rendered as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data, cls=JSONEncoder).encode()
+
+
+class NDJSONRenderer(PassthroughRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class EventStreamRenderer(PassthroughRenderer):
+    media_type = 'text/event-stream'
+    format = 'sse'
+
+
+class OctetStreamRenderer(PassthroughRenderer):
+    media_type = 'application/octet-stream'
+    format = 'bin'
@@ -1,5 +1,7 @@
 from .collision_serializer import CollisionSerializer
+from .collision_history_serializer import CollisionHistorySerializer
 from .probability_calc_serializer import ProbabilityCalcSerializer
 from .cdm_serializer import CDMSerializer
 from .user_serializer import UserSerializer, LoginSerializer, CDMSerializer, RefreshTokenSerializer
 from .organization_serializer import OrganizationSerializer
+from .pc_job_serializer import PcJobSerializer
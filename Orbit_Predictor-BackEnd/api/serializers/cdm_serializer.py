@@ -1,7 +1,52 @@
 from rest_framework import serializers
 from ..models import CDM
 
-class CDMSerializer(serializers.ModelSerializer):
+class CDMBaseSerializer(serializers.ModelSerializer):
+    """
+    Base of the CDM serializers. The Satellite catalog entries and the packed
+    covariance column are read and written as the flat sat1_* / sat2_* fields
+    of a CDM message.
+    """
+    sat1_object_designator = serializers.CharField(max_length=50)
+    sat2_object_designator = serializers.CharField(max_length=50)
+    sat1_catalog_name = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat1_object_name = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat1_international_designator = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    sat1_object_type = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat1_operator_organization = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    sat2_catalog_name = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat2_object_name = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat2_international_designator = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    sat2_object_type = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    sat2_operator_organization = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    sat1_cov_rr = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_rt = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_rn = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_tr = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_tt = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_tn = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_nr = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_nt = serializers.FloatField(required=False, allow_null=True)
+    sat1_cov_nn = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_rr = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_rt = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_rn = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_tr = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_tt = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_tn = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_nr = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_nt = serializers.FloatField(required=False, allow_null=True)
+    sat2_cov_nn = serializers.FloatField(required=False, allow_null=True)
+
+class CDMSerializer(CDMBaseSerializer):
     class Meta:
         model = CDM
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['sat1', 'sat2', 'covariance']
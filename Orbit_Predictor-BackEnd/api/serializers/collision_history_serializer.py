@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from ..models import CollisionHistory
+
+class CollisionHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CollisionHistory
+        fields = '__all__'
@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from ..models import PcJob
+
+class PcJobSerializer(serializers.ModelSerializer):
+    message_id = serializers.CharField(source='cdm.message_id', read_only=True)
+
+    class Meta:
+        model = PcJob
+        fields = ['id', 'status', 'cdm', 'message_id', 'collision', 'error', 'created_at', 'started_at', 'finished_at']
@@ -6,6 +6,7 @@ from django.conf import settings
 from rest_framework import serializers
 
 from ..models import User, CDM
+from .cdm_serializer import CDMBaseSerializer
 
 SPACE_AGENCY_DOMAINS = [
     "asc-csa.gc.ca",
@@ -181,7 +182,7 @@ class RefreshTokenSerializer(serializers.Serializer):
         }
 
 
-class CDMSerializer(serializers.ModelSerializer):
+class CDMSerializer(CDMBaseSerializer):
     class Meta:
         model = CDM
         fields = [
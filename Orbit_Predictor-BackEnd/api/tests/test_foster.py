@@ -0,0 +1,54 @@
+import numpy as np
+from django.test import SimpleTestCase
+from scipy.stats import ncx2
+
+from api.pc.foster import pc2d_foster
+from api.pc.gauss import pc2d_foster_gauss
+from api.pc.series import pc2d_series
+from api.pc.screening import pc2d_upper_bound
+
+MISS_DISTANCE = 100.0
+HBR = 10.0
+
+
+def rotated_conjunction(seed, sigmas):
+    """
+    Head-on conjunction with a 100 m miss along x and the same diagonal
+    covariance for both objects, rotated into a random frame so that the
+    projection onto the conjunction plane carries roundoff.
+    """
+    Q, _ = np.linalg.qr(np.random.default_rng(seed).normal(size=(3, 3)))
+    r1 = Q @ np.array([7000e3, 0.0, 0.0])
+    v1 = Q @ np.array([0.0, 7.5e3, 0.0])
+    r2 = r1 - Q @ np.array([MISS_DISTANCE, 0.0, 0.0])
+    v2 = Q @ np.array([0.0, -7.5e3, 0.0])
+    cov = Q @ np.diag(sigmas) @ Q.T
+    cov = 0.5 * (cov + cov.T)
+    return r1, v1, cov, r2, v2, cov, HBR
+
+
+def isotropic_pc(variance):
+    """Exact Pc for an isotropic combined covariance: a noncentral chi-square CDF."""
+    return ncx2.cdf(HBR ** 2 / variance, 2, MISS_DISTANCE ** 2 / variance)
+
+
+class IsotropicCovarianceTests(SimpleTestCase):
+    """Repeated eigenvalues of the projected covariance must not give NaN Pc."""
+
+    def assert_matches_closed_form(self, sigmas, variance):
+        expected = isotropic_pc(variance)
+        for seed in range(50):
+            inputs = rotated_conjunction(seed, sigmas)
+            for pc2d in (pc2d_foster, pc2d_foster_gauss, pc2d_series):
+                pc = pc2d(*inputs)[0][0]
+                self.assertTrue(np.isfinite(pc), f"{pc2d.__name__} gave {pc} for seed {seed}")
+                self.assertAlmostEqual(pc / expected, 1.0, delta=1e-6, msg=f"{pc2d.__name__}, seed {seed}")
+            bound = pc2d_upper_bound(*inputs)[0]
+            self.assertGreaterEqual(bound, expected * (1 - 1e-9))
+
+    def test_isotropic(self):
+        # Both objects: 4e4 m^2 across the conjunction plane, 8e4 m^2 combined
+        self.assert_matches_closed_form([4e4, 1e2, 4e4], 8e4)
+
+    def test_near_degenerate(self):
+        self.assert_matches_closed_form([4e4, 1e2, 4e4 * (1 + 1e-12)], 8e4)
@@ -0,0 +1,16 @@
+from .engine import (
+    DEFAULT_DV_VALUES, DEFAULT_TIME_VALUES, Tradespace, best_trajectory_entry, compute_tradespace, iter_tradespace,
+    maneuver_states, maneuver_states_at, miss_distance
+)
+from .cache import TradespaceCache, get_tradespace, tradespace_cache, tradespace_key
+from .parallel import (
+    SharedGridInputs, compute_tradespace_parallel, create_process_pool, discard_tradespace_pool,
+    evaluate_grid_parallel, tile_ranges, tradespace_pool
+)
+from .grid import GRID_DEFAULTS, TradespaceGrid
+from .store import (
+    cdm_content_version, invalidate_many_tradespaces, invalidate_tradespaces, load_tradespace, save_tradespace
+)
+from .stream import STREAM_FORMATS, stream_format, stream_tradespace, streaming_response
+from .search import AdaptiveSearch, adaptive_search, adaptive_search_response, parse_target_pc
+from .formats import HEATMAP_FORMATS, binary_heatmap_response, columnar_heatmap, heatmap_format
@@ -0,0 +1,140 @@
+"""
+In-process sharing of computed tradespaces.
+
+The heatmap and linear maneuvering pages are usually opened together for the
+same CDM. get_tradespace() computes the grid once and hands the same
+Tradespace to both views; a second request for a grid that is still being
+computed waits for the first instead of starting its own. Grids missing
+from memory are looked up in, and saved to, the persistent store
+(api.tradespace.store).
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, get_pc_backend
+from .engine import DEFAULT_DV_VALUES, DEFAULT_TIME_VALUES, compute_tradespace
+from .parallel import compute_tradespace_parallel, tradespace_pool, use_parallel
+from .store import cdm_content_version, grid_digest, load_tradespace, save_tradespace
+
+
+def tradespace_key(cdm, time_values, dv_values, RelTol, HBRType, backend_name):
+    """
+    Identifies a tradespace by the CDM's content version (not just its id, so
+    an updated CDM never reuses a stale grid), the grid axes and Pc options.
+    """
+    return (
+        cdm.pk, cdm_content_version(cdm), grid_digest(time_values, dv_values, RelTol, HBRType, backend_name)
+    )
+
+
+class TradespaceCache:
+    """
+    A small LRU of Tradespace results with per-key computation locks.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another request may have finished this grid while we waited
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+            try:
+                result = compute()
+            except BaseException:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+                raise
+
+            # Publish the result and retire the key lock together, so a request
+            # arriving in between neither misses the entry nor recomputes it
+            with self._lock:
+                if self.max_entries > 0:
+                    self._entries[key] = result
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                self._key_locks.pop(key, None)
+            return result
+
+    def get(self, key):
+        """Returns the cached result for `key`, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def put(self, key, result):
+        with self._lock:
+            if self.max_entries > 0:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def discard(self, predicate):
+        """Drops the entries whose key matches the predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def tradespace_cache():
+    """Returns the process-wide tradespace cache, sized from settings."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TradespaceCache(getattr(settings, 'TRADESPACE_CACHE_SIZE', 32))
+    return _cache
+
+
+def get_tradespace(cdm, time_values=DEFAULT_TIME_VALUES, dv_values=DEFAULT_DV_VALUES,
+                   RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE, backend_name=None):
+    """
+    Returns the tradespace of a CDM from the in-memory cache or the
+    persistent store, computing (and storing) it with the configured Pc
+    backend only if neither has it. Large grids are evaluated on the
+    tradespace process pool when TRADESPACE_WORKERS is set. Raises ValueError
+    like compute_tradespace().
+    """
+    backend_name = backend_name or settings.PC_BACKEND
+    key = tradespace_key(cdm, time_values, dv_values, RelTol, HBRType, backend_name)
+
+    def compute():
+        tradespace = load_tradespace(cdm, time_values, dv_values, RelTol, HBRType, backend_name)
+        if tradespace is None:
+            if use_parallel(time_values, dv_values, backend_name):
+                tradespace = compute_tradespace_parallel(
+                    cdm, backend_name, tradespace_pool(), time_values, dv_values, RelTol, HBRType
+                )
+            else:
+                # The grid is stored as a whole; its points stay out of the Pc result cache
+                with get_pc_backend(backend_name, cached=False) as backend:
+                    tradespace = compute_tradespace(cdm, backend, time_values, dv_values, RelTol, HBRType)
+            save_tradespace(cdm, tradespace, RelTol, HBRType, backend_name)
+        return tradespace
+
+    return tradespace_cache().get_or_compute(key, compute)
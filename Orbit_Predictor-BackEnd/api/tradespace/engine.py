@@ -0,0 +1,260 @@
+"""
+Vectorized maneuver tradespace for Satellite 1.
+
+The whole T x Δv grid is built with NumPy broadcasting using the direct
+equations documented on CollisionTradespaceView:
+
+  +Va = Va + Δv * Va_hat
+  +Ra = Ra - 3 * Δv * T * (+Va)
+  RRel = Rd - (+Ra)
+  VRel = Vd - (+Va)
+  Rmiss = RRel - ((RRel · VRel)/||VRel||²)*VRel
+
+and Pc is evaluated for every cell (plus the unmaneuvered baseline) in a single
+batched call to the Pc backend. No orbital propagation is performed.
+
+iter_tradespace() evaluates the same grid a few T rows at a time, for
+responses that stream rows as they are computed.
+"""
+import numpy as np
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, cdm_pc_inputs
+
+# Δv from -0.10 to +0.10 m/s (0.01 m/s steps)
+DEFAULT_DV_VALUES = np.arange(-0.10, 0.10 + 1e-9, 0.01)
+# T from 24 hr to 0 hr (in 0.25-hr decrements)
+DEFAULT_TIME_VALUES = np.arange(24.0, -1e-9, -0.25)
+
+
+def miss_distance(RRel, VRel):
+    """
+    Norm of the component of RRel perpendicular to VRel, over the last axis.
+    Falls back to ||RRel|| where the relative velocity vanishes.
+    """
+    VRel_mag_sq = np.einsum('...i,...i->...', VRel, VRel)
+    safe_mag_sq = np.where(VRel_mag_sq < 1e-12, 1.0, VRel_mag_sq)
+    proj_factor = np.einsum('...i,...i->...', RRel, VRel) / safe_mag_sq
+    proj_factor = np.where(VRel_mag_sq < 1e-12, 0.0, proj_factor)
+    Rmiss = RRel - proj_factor[..., np.newaxis] * VRel
+    return np.linalg.norm(Rmiss, axis=-1)
+
+
+def float32_pc(pc):
+    """
+    Pc as little-endian float32. Positive values below the float32 range are
+    kept at its smallest subnormal instead of flushing to 0, so the best
+    maneuver of a float32 grid is still a cell with a positive Pc.
+    """
+    pc = np.asarray(pc, dtype=float)
+    tiny = np.finfo(np.float32).smallest_subnormal
+    return np.ascontiguousarray(np.where((pc > 0) & (pc < tiny), tiny, pc), dtype='<f4')
+
+
+def maneuver_states_at(Ra, Va, T, dv):
+    """
+    Returns Satellite 1 post-maneuver positions and velocities (..., 3) for
+    maneuvers of dv (m/s) at T (hours before TCA); T and dv broadcast.
+    """
+    Va_norm = np.linalg.norm(Va)
+    if Va_norm < 1e-12:
+        raise ValueError("Satellite 1 velocity is near zero.")
+    Va_hat = Va / Va_norm
+
+    T, dv = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(dv, dtype=float))
+    Va_plus = Va + dv[..., np.newaxis] * Va_hat
+    Ra_plus = Ra - (3.0 * dv * T * 3600)[..., np.newaxis] * Va_plus
+    return Ra_plus, Va_plus
+
+
+def maneuver_states(Ra, Va, time_values, dv_values):
+    """
+    Returns Satellite 1 post-maneuver positions (T, D, 3) and velocities
+    (T, D, 3) for every combination of T (hours before TCA) and Δv (m/s).
+    """
+    return maneuver_states_at(Ra, Va, time_values[:, np.newaxis], dv_values[np.newaxis, :])
+
+
+class Tradespace:
+    """
+    Result of a tradespace evaluation. Grid quantities are (T, D) arrays indexed
+    by time_values and dv_values.
+    """
+
+    def __init__(self, Ra, Va, Rd, Vd, time_values, dv_values,
+                 sat1_positions, sat1_velocities, miss_distance, pc,
+                 original_miss_distance, original_pc):
+        self.Ra = Ra
+        self.Va = Va
+        self.Rd = Rd
+        self.Vd = Vd
+        self.time_values = time_values
+        self.dv_values = dv_values
+        self.sat1_positions = sat1_positions
+        self.sat1_velocities = sat1_velocities
+        self.miss_distance = miss_distance
+        self.pc = pc
+        self.original_miss_distance = original_miss_distance
+        self.original_pc = original_pc
+
+    def original(self):
+        return {
+            "sat1_initial_position": self.Ra.tolist(),
+            "sat1_initial_velocity": self.Va.tolist(),
+            "sat2_initial_position": self.Rd.tolist(),
+            "sat2_initial_velocity": self.Vd.tolist(),
+            "miss_distance": float(self.original_miss_distance),
+            "pc_value": float(self.original_pc)
+        }
+
+    def _usable_pc(self):
+        # Cells with an undefined Pc are never selected as a best maneuver
+        return np.where(np.isnan(self.pc), np.inf, self.pc)
+
+    def best_maneuver(self):
+        """
+        The first grid cell (T outer, Δv inner) with the lowest Pc.
+        """
+        best_result = {
+            "T_hours_before_TCA": None,
+            "delta_v_m_s": None,
+            "pc_value": np.inf,
+            "miss_distance": None,
+            "sat1_final_position": None,
+            "sat1_final_velocity": None
+        }
+        pc = self._usable_pc()
+        if pc.size == 0:
+            return best_result
+        i, j = np.unravel_index(np.argmin(pc), pc.shape)
+        if not pc[i, j] < np.inf:
+            return best_result
+        return {
+            "T_hours_before_TCA": float(self.time_values[i]),
+            "delta_v_m_s": float(self.dv_values[j]),
+            "pc_value": float(self.pc[i, j]),
+            "miss_distance": float(self.miss_distance[i, j]),
+            "sat1_final_position": self.sat1_positions[i, j].tolist(),
+            "sat1_final_velocity": self.sat1_velocities[i, j].tolist()
+        }
+
+    def trajectory(self, rows=slice(None)):
+        """
+        For each T (optionally only the T rows in `rows`), the first Δv with
+        the lowest Pc, reduced from the grid.
+        """
+        pc = self._usable_pc()[rows]
+        trajectory = []
+        if pc.size == 0:
+            return trajectory
+        best_j = np.argmin(pc, axis=1)
+        row_index = np.arange(len(self.time_values))[rows]
+        for k, (i, T) in enumerate(zip(row_index.tolist(), self.time_values[rows].tolist())):
+            j = best_j[k]
+            if not pc[k, j] < np.inf:
+                trajectory.append({
+                    "delta_v_m_s": None,
+                    "pc_value": np.inf,
+                    "miss_distance": None,
+                    "sat1_position": None,
+                    "sat1_velocity": None,
+                    "T_hours_before_TCA": T
+                })
+                continue
+            trajectory.append({
+                "T_hours_before_TCA": T,
+                "delta_v_m_s": float(self.dv_values[j]),
+                "pc_value": float(self.pc[i, j]),
+                "miss_distance": float(self.miss_distance[i, j]),
+                "sat1_position": self.sat1_positions[i, j].tolist(),
+                "sat1_velocity": self.sat1_velocities[i, j].tolist()
+            })
+        return trajectory
+
+    def heatmap_data(self, rows=slice(None)):
+        """
+        One { "T_hours", "dv", "miss_distance", "pc" } entry per grid cell
+        (optionally only the T rows in `rows`).
+        """
+        time_values = self.time_values[rows]
+        T = np.repeat(time_values, len(self.dv_values)).tolist()
+        dv = np.tile(self.dv_values, len(time_values)).tolist()
+        return [
+            {"T_hours": t, "dv": d, "miss_distance": m, "pc": p}
+            for t, d, m, p in zip(T, dv, self.miss_distance[rows].ravel().tolist(), self.pc[rows].ravel().tolist())
+        ]
+
+
+def best_trajectory_entry(trajectory):
+    """The first trajectory entry with the lowest Pc (the linear view's best maneuver)."""
+    best_result = {
+        "T_hours_before_TCA": None,
+        "delta_v_m_s": None,
+        "pc_value": float('inf'),
+        "miss_distance": None,
+        "sat1_final_position": None,
+        "sat1_final_velocity": None
+    }
+    for best_for_T in trajectory:
+        if best_for_T["pc_value"] < best_result["pc_value"]:
+            best_result = best_for_T
+    return best_result
+
+
+def compute_tradespace(cdm, backend, time_values=DEFAULT_TIME_VALUES, dv_values=DEFAULT_DV_VALUES,
+                       RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE):
+    """
+    Evaluates the maneuver tradespace of a CDM with the given Pc backend.
+    Raises ValueError if Satellite 1's velocity is near zero.
+    """
+    Ra, Va, cov1, Rd, Vd, cov2, HBR = cdm_pc_inputs(cdm)
+    time_values = np.asarray(time_values, dtype=float)
+    dv_values = np.asarray(dv_values, dtype=float)
+
+    Ra_plus, Va_plus = maneuver_states(Ra, Va, time_values, dv_values)
+    grid_miss_distance = miss_distance(Rd - Ra_plus, Vd - Va_plus)
+
+    # Baseline first, then every grid cell, in one batched Pc evaluation
+    r1 = np.concatenate([Ra[np.newaxis], Ra_plus.reshape(-1, 3)])
+    v1 = np.concatenate([Va[np.newaxis], Va_plus.reshape(-1, 3)])
+    pc = backend.compute(r1, v1, cov1, Rd, Vd, cov2, HBR, RelTol, HBRType)
+
+    return Tradespace(
+        Ra, Va, Rd, Vd, time_values, dv_values,
+        Ra_plus, Va_plus, grid_miss_distance, pc[1:].reshape(grid_miss_distance.shape),
+        miss_distance(Rd - Ra, Vd - Va), pc[0]
+    )
+
+
+def iter_tradespace(cdm, backend, time_values=DEFAULT_TIME_VALUES, dv_values=DEFAULT_DV_VALUES,
+                    RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE, chunk_rows=1):
+    """
+    Evaluates the tradespace like compute_tradespace(), `chunk_rows` T rows
+    per Pc backend call. Yields (tradespace, rows): first with an empty slice
+    once the baseline Pc is known, then after each chunk with the slice of T
+    rows just filled in. Rows not yet evaluated have a NaN Pc. Closing the
+    generator stops the evaluation.
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1.")
+    Ra, Va, cov1, Rd, Vd, cov2, HBR = cdm_pc_inputs(cdm)
+    time_values = np.asarray(time_values, dtype=float)
+    dv_values = np.asarray(dv_values, dtype=float)
+
+    Ra_plus, Va_plus = maneuver_states(Ra, Va, time_values, dv_values)
+    grid_miss_distance = miss_distance(Rd - Ra_plus, Vd - Va_plus)
+    original_pc = backend.compute(Ra, Va, cov1, Rd, Vd, cov2, HBR, RelTol, HBRType)[0]
+
+    pc = np.full(grid_miss_distance.shape, np.nan)
+    tradespace = Tradespace(
+        Ra, Va, Rd, Vd, time_values, dv_values,
+        Ra_plus, Va_plus, grid_miss_distance, pc,
+        miss_distance(Rd - Ra, Vd - Va), original_pc
+    )
+    yield tradespace, slice(0, 0)
+
+    for start in range(0, len(time_values), chunk_rows):
+        rows = slice(start, min(start + chunk_rows, len(time_values)))
+        pc[rows] = backend.compute(
+            Ra_plus[rows].reshape(-1, 3), Va_plus[rows].reshape(-1, 3), cov1, Rd, Vd, cov2, HBR, RelTol, HBRType
+        ).reshape(pc[rows].shape)
+        yield tradespace, rows
@@ -0,0 +1,102 @@
+"""
+Compact heatmap formats for CollisionTradespaceView.
+
+By default the heatmap is "heatmap_data", one dict per grid cell. Clients can
+opt in to a columnar "heatmap" instead, with the axes sent once and the grids
+as flat arrays in row-major (T, Δv) order, via a "format" request field or
+the Accept header:
+
+  "columnar"                       JSON number arrays
+  "base64"                         little-endian float32 arrays, base64 encoded
+  "binary" / application/octet-stream
+                                   a binary body (see binary_heatmap_response)
+
+The binary body is, all little-endian:
+
+  magic      4 bytes   b'TSP1'
+  meta_len   uint32    length of the JSON metadata
+  n_T, n_dv  uint32    grid shape
+  metadata   meta_len bytes of UTF-8 JSON (original, best_maneuver, grid),
+             padded with trailing spaces to a multiple of 4 bytes
+  float32    T_hours (n_T), dv (n_dv), miss_distance (n_T * n_dv), pc (n_T * n_dv)
+
+so each array can be viewed in place (e.g. as a JavaScript Float32Array).
+Positive Pc below the float32 range is sent as its smallest subnormal, not 0.
+"""
+import base64
+import json
+import struct
+
+import numpy as np
+from django.http import HttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .engine import float32_pc
+
+HEATMAP_FORMATS = ('columnar', 'base64', 'binary')
+BINARY_MAGIC = b'TSP1'
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+
+
+def heatmap_format(request):
+    """
+    The heatmap format requested by a "format" field or the Accept header,
+    or None for the default list of dicts. Raises ValueError for an unknown
+    format.
+    """
+    requested = request.data.get('format')
+    if requested:
+        requested = str(requested).lower()
+        if requested not in HEATMAP_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(HEATMAP_FORMATS)}.")
+        return requested
+    if BINARY_CONTENT_TYPE in request.META.get('HTTP_ACCEPT', ''):
+        return 'binary'
+    return None
+
+
+def _float32(values):
+    return np.ascontiguousarray(values, dtype='<f4')
+
+
+def columnar_heatmap(tradespace, encoding='columnar'):
+    """The heatmap as axes plus flat miss distance and Pc arrays, JSON or base64 float32."""
+    heatmap = {
+        "format": encoding,
+        "shape": [len(tradespace.time_values), len(tradespace.dv_values)],
+        "order": "row-major (T_hours, dv)",
+    }
+    arrays = {
+        "T_hours": tradespace.time_values,
+        "dv": tradespace.dv_values,
+        "miss_distance": tradespace.miss_distance.ravel(),
+        "pc": tradespace.pc.ravel(),
+    }
+    if encoding == 'base64':
+        heatmap["dtype"] = "float32"
+        heatmap["byteorder"] = "little"
+        for name, values in arrays.items():
+            values = float32_pc(values) if name == "pc" else _float32(values)
+            heatmap[name] = base64.b64encode(values.tobytes()).decode('ascii')
+    else:
+        for name, values in arrays.items():
+            heatmap[name] = np.asarray(values, dtype=float).tolist()
+    return heatmap
+
+
+def binary_heatmap_response(tradespace, metadata):
+    """An application/octet-stream response with the layout described above."""
+    meta = json.dumps(metadata, cls=JSONEncoder).encode('utf-8')
+    # Spaces are JSON whitespace, so all meta_len bytes still parse
+    meta += b' ' * (-len(meta) % 4)
+    n_T, n_dv = len(tradespace.time_values), len(tradespace.dv_values)
+    body = b''.join([
+        BINARY_MAGIC,
+        struct.pack('<III', len(meta), n_T, n_dv),
+        meta,
+        _float32(tradespace.time_values).tobytes(),
+        _float32(tradespace.dv_values).tobytes(),
+        _float32(tradespace.miss_distance).tobytes(),
+        float32_pc(tradespace.pc).tobytes(),
+    ])
+    return HttpResponse(body, content_type=BINARY_CONTENT_TYPE)
@@ -0,0 +1,177 @@
+"""
+Request-configurable tradespace grids with a compute budget.
+
+The tradespace views accept the T and Δv ranges and steps of the grid, plus
+an optional budget of Pc evaluations ("max_evaluations") or wall-clock time
+("max_seconds"). A grid that does not fit the budget (or the server-wide
+TRADESPACE_MAX_EVALUATIONS cap) is coarsened by doubling the step of the axis
+with more points until it fits, so the coarse grid is a subset of the
+requested one. The effective resolution is reported with the results.
+"""
+import math
+import time
+
+import numpy as np
+from django.conf import settings
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, cdm_pc_inputs, get_pc_backend
+from .engine import maneuver_states
+
+# Defaults of the grid parameters; they reproduce DEFAULT_TIME_VALUES and DEFAULT_DV_VALUES
+GRID_DEFAULTS = {
+    "t_min_hours": 0.0,
+    "t_max_hours": 24.0,
+    "t_step_hours": 0.25,
+    "dv_min": -0.10,
+    "dv_max": 0.10,
+    "dv_step": 0.01,
+}
+# Points used to measure the Pc backend rate for a wall-clock budget
+RATE_PROBE_POINTS = 64
+
+
+def _axis_values(start, stop, step):
+    # Same construction as DEFAULT_TIME_VALUES / DEFAULT_DV_VALUES
+    return np.arange(start, stop + math.copysign(1e-9, step), step)
+
+
+def _axis_length(start, stop, step):
+    # len(_axis_values(...)) without building the axis
+    return max(int(math.ceil((stop + math.copysign(1e-9, step) - start) / step)), 0)
+
+
+class TradespaceGrid:
+    """
+    T and Δv axes of a tradespace request. Raises ValueError for invalid
+    parameters.
+    """
+
+    def __init__(self, t_min_hours, t_max_hours, t_step_hours, dv_min, dv_max, dv_step,
+                 max_evaluations=None, max_seconds=None):
+        if not 0.0 <= t_min_hours <= t_max_hours:
+            raise ValueError("The T range must satisfy 0 <= t_min_hours <= t_max_hours.")
+        if not dv_min <= dv_max:
+            raise ValueError("The Δv range must satisfy dv_min <= dv_max.")
+        if t_step_hours <= 0 or dv_step <= 0:
+            raise ValueError("t_step_hours and dv_step must be positive.")
+        if max_evaluations is not None and max_evaluations < 1:
+            raise ValueError("max_evaluations must be at least 1.")
+        if max_seconds is not None and max_seconds <= 0:
+            raise ValueError("max_seconds must be positive.")
+
+        self.t_min_hours = t_min_hours
+        self.t_max_hours = t_max_hours
+        self.dv_min = dv_min
+        self.dv_max = dv_max
+        self.requested_steps = (t_step_hours, dv_step)
+        self.t_step_hours = t_step_hours
+        self.dv_step = dv_step
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.evaluations_per_second = None
+
+    @classmethod
+    def from_request(cls, data):
+        """Builds a grid from request data; missing parameters take the defaults."""
+        values = {}
+        for name, default in GRID_DEFAULTS.items():
+            values[name] = _number(data.get(name), name, default)
+        max_evaluations = _number(data.get("max_evaluations"), "max_evaluations", None)
+        max_seconds = _number(data.get("max_seconds"), "max_seconds", None)
+        if max_evaluations is not None:
+            if max_evaluations != int(max_evaluations):
+                raise ValueError("max_evaluations must be an integer.")
+            max_evaluations = int(max_evaluations)
+        return cls(**values, max_evaluations=max_evaluations, max_seconds=max_seconds)
+
+    @property
+    def time_values(self):
+        # T counts down from t_max_hours, like the default grid
+        return _axis_values(self.t_max_hours, self.t_min_hours, -self.t_step_hours)
+
+    @property
+    def dv_values(self):
+        return _axis_values(self.dv_min, self.dv_max, self.dv_step)
+
+    @property
+    def shape(self):
+        return (
+            _axis_length(self.t_max_hours, self.t_min_hours, -self.t_step_hours),
+            _axis_length(self.dv_min, self.dv_max, self.dv_step),
+        )
+
+    @property
+    def evaluations(self):
+        n_T, n_dv = self.shape
+        return n_T * n_dv
+
+    def budget(self):
+        """Largest number of grid evaluations allowed for this request."""
+        limits = [getattr(settings, 'TRADESPACE_MAX_EVALUATIONS', 250000)]
+        if self.max_evaluations is not None:
+            limits.append(self.max_evaluations)
+        if self.max_seconds is not None and self.evaluations_per_second:
+            limits.append(int(self.evaluations_per_second * self.max_seconds))
+        return max(min(limits), 1)
+
+    def fit_budget(self):
+        """Coarsens the grid, one axis step at a time, until it fits the budget."""
+        budget = self.budget()
+        while self.evaluations > budget:
+            n_T, n_dv = self.shape
+            if n_T == 1 and n_dv == 1:
+                break
+            if n_T >= n_dv:
+                self.t_step_hours *= 2
+            else:
+                self.dv_step *= 2
+        return self
+
+    def measure_rate(self, cdm, backend_name=None, RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE):
+        """
+        Times the Pc backend on maneuvers across the Δv range at t_max_hours,
+        for the wall-clock budget. Only needed when max_seconds is set.
+        """
+        Ra, Va, cov1, Rd, Vd, cov2, HBR = cdm_pc_inputs(cdm)
+        probe = np.linspace(self.dv_min, self.dv_max, RATE_PROBE_POINTS)
+        Ra_plus, Va_plus = maneuver_states(Ra, Va, np.array([self.t_max_hours]), probe)
+        with get_pc_backend(backend_name or settings.PC_BACKEND, cached=False) as backend:
+            start = time.perf_counter()
+            backend.compute(Ra_plus[0], Va_plus[0], cov1, Rd, Vd, cov2, HBR, RelTol, HBRType)
+            seconds = time.perf_counter() - start
+        self.evaluations_per_second = len(probe) / seconds if seconds > 0 else math.inf
+        return self.evaluations_per_second
+
+    def prepare(self, cdm):
+        """Measures the backend rate if a wall-clock budget was given, then fits the budget."""
+        if self.max_seconds is not None:
+            self.measure_rate(cdm)
+        return self.fit_budget()
+
+    def describe(self):
+        """The requested and effective grid, for the response."""
+        return {
+            "t_range_hours": [self.t_min_hours, self.t_max_hours],
+            "dv_range": [self.dv_min, self.dv_max],
+            "requested_resolution": {"T_hours": self.requested_steps[0], "dv": self.requested_steps[1]},
+            "effective_resolution": {"T_hours": self.t_step_hours, "dv": self.dv_step},
+            "coarsened": (self.t_step_hours, self.dv_step) != self.requested_steps,
+            "evaluations": self.evaluations,
+            "budget": {
+                "max_evaluations": self.budget(),
+                "max_seconds": self.max_seconds,
+                "estimated_evaluations_per_second": self.evaluations_per_second,
+            },
+        }
+
+
+def _number(value, name, default):
+    if value in (None, ''):
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number.")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite.")
+    return number
@@ -0,0 +1,228 @@
+"""
+Multi-core tradespace evaluation.
+
+The T x Δv grid is split into tiles of TRADESPACE_TILE_ROWS T rows, which are
+evaluated on a process pool. The read-only inputs (both states and
+covariances, HBR and the grid axes) are written once into a shared memory
+block together with the output Pc grid; tasks only carry the block name, its
+layout and their row range, rebuild the maneuvered states of their tile, and
+write Pc into their own rows of the output. The tiling depends only on the
+tile size, never on the number of workers, so results are the same however
+many processes run them.
+
+The pool is process-wide and created on first use with TRADESPACE_WORKERS
+processes (0 disables it). Workers are started with the "spawn" method by
+default so that they don't inherit the Django worker's threads and sockets.
+If a worker dies (e.g. out of memory), the broken pool is dropped, the grid is
+evaluated in this process and the next large grid starts a new pool.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+from django.conf import settings
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, cdm_pc_inputs, get_pc_backend
+from .engine import (
+    DEFAULT_DV_VALUES, DEFAULT_TIME_VALUES, Tradespace, compute_tradespace, maneuver_states, miss_distance
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_ROWS = 8
+# Backends that cannot run inside pool workers
+SERIAL_BACKENDS = ('matlab',)
+
+_INPUT_NAMES = ('Ra', 'Va', 'cov1', 'Rd', 'Vd', 'cov2', 'HBR', 'time_values', 'dv_values')
+
+
+def _init_worker(settings_module):
+    # Spawned workers start from a fresh interpreter
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _attach(name, layout):
+    # Pool workers share the parent's resource tracker, so attaching does not
+    # hand the block's lifetime to them; the parent unlinks it
+    block = shared_memory.SharedMemory(name=name)
+    arrays = {
+        key: np.ndarray(shape, dtype=np.float64, buffer=block.buf, offset=offset)
+        for key, (offset, shape) in layout.items()
+    }
+    return block, arrays
+
+
+def _evaluate_tile(name, layout, start, stop, backend_name, RelTol, HBRType):
+    """Evaluates T rows [start, stop) of the shared grid into the shared Pc output."""
+    block, arrays = _attach(name, layout)
+    try:
+        time_values = arrays['time_values'][start:stop]
+        dv_values = arrays['dv_values']
+        Ra_plus, Va_plus = maneuver_states(arrays['Ra'], arrays['Va'], time_values, dv_values)
+        with get_pc_backend(backend_name, cached=False) as backend:
+            pc = backend.compute(
+                Ra_plus.reshape(-1, 3), Va_plus.reshape(-1, 3), arrays['cov1'], arrays['Rd'], arrays['Vd'],
+                arrays['cov2'], arrays['HBR'], RelTol, HBRType
+            )
+        arrays['pc'][start:stop] = pc.reshape(len(time_values), len(dv_values))
+    finally:
+        del arrays
+        block.close()
+
+
+def tile_ranges(n_rows, tile_rows=DEFAULT_TILE_ROWS):
+    """The (start, stop) T row ranges of the tiles, in order."""
+    if tile_rows < 1:
+        raise ValueError("tile_rows must be at least 1.")
+    return [(start, min(start + tile_rows, n_rows)) for start in range(0, n_rows, tile_rows)]
+
+
+class SharedGridInputs:
+    """
+    A shared memory block holding the grid inputs and the (T, D) Pc output.
+    Use as a context manager; the block is unlinked on exit.
+    """
+
+    def __init__(self, inputs, time_values, dv_values):
+        arrays = dict(zip(_INPUT_NAMES, (
+            *(np.asarray(value, dtype=np.float64) for value in inputs), time_values, dv_values
+        )))
+        self.shape = (len(time_values), len(dv_values))
+        self.layout = {}
+        offset = 0
+        for key, value in arrays.items():
+            self.layout[key] = (offset, value.shape)
+            offset += value.nbytes
+        self.layout['pc'] = (offset, self.shape)
+        offset += int(np.prod(self.shape)) * 8
+
+        self.block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, value in arrays.items():
+            start, shape = self.layout[key]
+            np.ndarray(shape, dtype=np.float64, buffer=self.block.buf, offset=start)[...] = value
+        start, shape = self.layout['pc']
+        self._pc = np.ndarray(shape, dtype=np.float64, buffer=self.block.buf, offset=start)
+        self._pc[...] = np.nan
+
+    @property
+    def name(self):
+        return self.block.name
+
+    def pc(self):
+        """A copy of the Pc output, independent of the shared block."""
+        return self._pc.copy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        del self._pc
+        self.block.close()
+        self.block.unlink()
+
+
+def evaluate_grid_parallel(inputs, time_values, dv_values, backend_name, pool, RelTol=DEFAULT_REL_TOL,
+                           HBRType=DEFAULT_HBR_TYPE, tile_rows=DEFAULT_TILE_ROWS):
+    """
+    Pc over the T x Δv grid for the Pc inputs (Ra, Va, cov1, Rd, Vd, cov2,
+    HBR), with the tiles evaluated on `pool`. Returns a (T, D) array.
+    """
+    time_values = np.asarray(time_values, dtype=np.float64)
+    dv_values = np.asarray(dv_values, dtype=np.float64)
+    with SharedGridInputs(inputs, time_values, dv_values) as shared:
+        futures = [
+            pool.submit(_evaluate_tile, shared.name, shared.layout, start, stop, backend_name, RelTol, HBRType)
+            for start, stop in tile_ranges(len(time_values), tile_rows)
+        ]
+        # Waits for every tile (and re-raises the first error) before the block is released
+        for future in futures:
+            future.result()
+        return shared.pc()
+
+
+def compute_tradespace_parallel(cdm, backend_name, pool, time_values=DEFAULT_TIME_VALUES,
+                                dv_values=DEFAULT_DV_VALUES, RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE,
+                                tile_rows=None):
+    """
+    Like compute_tradespace(), with the grid evaluated on the process pool.
+    The baseline Pc is evaluated in this process, and so is the whole grid if
+    the pool is broken.
+    """
+    tile_rows = tile_rows or getattr(settings, 'TRADESPACE_TILE_ROWS', DEFAULT_TILE_ROWS)
+    inputs = cdm_pc_inputs(cdm)
+    Ra, Va, cov1, Rd, Vd, cov2, HBR = inputs
+    time_values = np.asarray(time_values, dtype=float)
+    dv_values = np.asarray(dv_values, dtype=float)
+
+    Ra_plus, Va_plus = maneuver_states(Ra, Va, time_values, dv_values)
+    grid_miss_distance = miss_distance(Rd - Ra_plus, Vd - Va_plus)
+    try:
+        pc = evaluate_grid_parallel(inputs, time_values, dv_values, backend_name, pool, RelTol, HBRType, tile_rows)
+    except BrokenProcessPool:
+        logger.exception("Tradespace process pool is broken; evaluating the grid in this process")
+        discard_tradespace_pool(pool)
+        with get_pc_backend(backend_name, cached=False) as backend:
+            return compute_tradespace(cdm, backend, time_values, dv_values, RelTol, HBRType)
+    with get_pc_backend(backend_name) as backend:
+        original_pc = backend.compute(Ra, Va, cov1, Rd, Vd, cov2, HBR, RelTol, HBRType)[0]
+
+    return Tradespace(
+        Ra, Va, Rd, Vd, time_values, dv_values,
+        Ra_plus, Va_plus, grid_miss_distance, pc,
+        miss_distance(Rd - Ra, Vd - Va), original_pc
+    )
+
+
+def create_process_pool(workers, start_method=None):
+    """
+    A new process pool whose workers have Django set up, for tradespace tiles
+    or other CPU-bound work; the caller shuts it down.
+    """
+    context = multiprocessing.get_context(start_method or getattr(settings, 'TRADESPACE_START_METHOD', 'spawn'))
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=context,
+        initializer=_init_worker, initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'orbit_predictor.settings'),)
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def tradespace_pool():
+    """Returns the process-wide tile pool, or None if TRADESPACE_WORKERS is 0."""
+    global _pool
+    workers = getattr(settings, 'TRADESPACE_WORKERS', 0)
+    if workers < 1:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_process_pool(workers)
+    return _pool
+
+
+def discard_tradespace_pool(pool):
+    """Drops a broken process-wide pool so that the next call to tradespace_pool() starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def use_parallel(time_values, dv_values, backend_name):
+    """Whether a grid is large enough, and its backend able, to go to the process pool."""
+    if backend_name in SERIAL_BACKENDS:
+        return False
+    cells = len(time_values) * len(dv_values)
+    return cells >= getattr(settings, 'TRADESPACE_PARALLEL_MIN_CELLS', 20000) and tradespace_pool() is not None
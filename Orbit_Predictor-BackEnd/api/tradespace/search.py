@@ -0,0 +1,278 @@
+"""
+Coarse-to-fine search of the maneuver tradespace.
+
+Instead of evaluating every cell of a fine T x Δv grid, the search works on a
+lattice at the target resolution: it evaluates the lattice points of a coarse
+grid, then repeatedly halves the spacing and evaluates only the new points in
+the cells around
+
+  - the `keep` lowest Pc values found so far, and
+  - with a target Pc, points whose coarse neighbour lies on the other side of
+    the target (so the Pc = target contour is resolved too).
+
+Every point is evaluated at most once, and each refinement level is a single
+batched call to the Pc backend. Like the grid, the search can miss a local
+minimum that the coarse grid does not bracket; the default coarse grid
+matches the extent of the exhaustive grid. With a budget of evaluations the
+search stops before the first level that would exceed it, at a coarser
+resolution.
+"""
+import numpy as np
+from django.conf import settings
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, cdm_pc_inputs, get_pc_backend
+from .engine import maneuver_states_at, miss_distance
+
+# Coarse grid: T from 24 hr to 0 hr and Δv from -0.10 to +0.10 m/s, 9 points each
+DEFAULT_T_RANGE = (0.0, 24.0)
+DEFAULT_DV_RANGE = (-0.10, 0.10)
+DEFAULT_COARSE_POINTS = (9, 9)
+# Six halvings: 3 hr -> ~2.8 min and 0.025 -> ~0.0004 m/s
+DEFAULT_LEVELS = 6
+DEFAULT_KEEP = 3
+
+
+class AdaptiveSearch:
+    """
+    Lazily evaluated lattice of maneuvers. Lattice index (i, j) is the
+    maneuver at T = T_max - i * dT and Δv = dv_min + j * dΔv, where dT and dΔv
+    are the final resolution.
+    """
+
+    def __init__(self, cdm, backend, T_range=DEFAULT_T_RANGE, dv_range=DEFAULT_DV_RANGE,
+                 coarse_points=DEFAULT_COARSE_POINTS, levels=DEFAULT_LEVELS,
+                 RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE):
+        n_T, n_dv = coarse_points
+        if n_T < 2 or n_dv < 2:
+            raise ValueError("The coarse grid needs at least 2 points per axis.")
+        if levels < 0:
+            raise ValueError("levels cannot be negative.")
+
+        self.backend = backend
+        self.RelTol = RelTol
+        self.HBRType = HBRType
+        self.Ra, self.Va, self.cov1, self.Rd, self.Vd, self.cov2, self.HBR = cdm_pc_inputs(cdm)
+        # Fails early for a Satellite 1 at rest
+        maneuver_states_at(self.Ra, self.Va, 0.0, 0.0)
+
+        self.levels = levels
+        self.coarse_spacing = 2 ** levels
+        self.T_max = float(max(T_range))
+        self.dv_min = float(min(dv_range))
+        self.shape = ((n_T - 1) * self.coarse_spacing + 1, (n_dv - 1) * self.coarse_spacing + 1)
+        self.dT = (self.T_max - float(min(T_range))) / (self.shape[0] - 1)
+        self.ddv = (float(max(dv_range)) - self.dv_min) / (self.shape[1] - 1)
+        self.evaluated = {}
+        # Spacing of the finest level evaluated so far
+        self.spacing = self.coarse_spacing
+        self.max_evaluations = None
+
+    def maneuver(self, i, j):
+        return self.T_max - i * self.dT, self.dv_min + j * self.ddv
+
+    def evaluate(self, points):
+        """Evaluates the lattice points not evaluated yet, in one backend call."""
+        new = sorted({point for point in points if point not in self.evaluated})
+        if not new:
+            return
+        index = np.array(new)
+        T = self.T_max - index[:, 0] * self.dT
+        dv = self.dv_min + index[:, 1] * self.ddv
+        Ra_plus, Va_plus = maneuver_states_at(self.Ra, self.Va, T, dv)
+        pc = self.backend.compute(
+            Ra_plus, Va_plus, self.cov1, self.Rd, self.Vd, self.cov2, self.HBR, self.RelTol, self.HBRType
+        )
+        miss = miss_distance(self.Rd - Ra_plus, self.Vd - Va_plus)
+        for point, p, m in zip(new, pc.tolist(), miss.tolist()):
+            self.evaluated[point] = (p, m)
+
+    def _pc(self, point):
+        # Undefined Pc values are never selected
+        p = self.evaluated[point][0]
+        return np.inf if np.isnan(p) else p
+
+    def lowest(self, count):
+        """The `count` evaluated points with the lowest Pc, in (T desc, Δv asc) order for ties."""
+        return sorted(self.evaluated, key=lambda point: (self._pc(point), point))[:count]
+
+    def crossings(self, spacing, target):
+        """Evaluated points at this spacing with a neighbour on the other side of the target Pc."""
+        points = []
+        for (i, j) in self.evaluated:
+            if i % spacing or j % spacing:
+                continue
+            below = self._pc((i, j)) <= target
+            for neighbour in ((i + spacing, j), (i, j + spacing)):
+                if neighbour in self.evaluated and (self._pc(neighbour) <= target) != below:
+                    points.extend([(i, j), neighbour])
+        return points
+
+    def refine_around(self, points, spacing):
+        """The lattice points at half the spacing in the cells touching each point."""
+        half = spacing // 2
+        steps = range(-spacing, spacing + 1, half)
+        return [
+            (i + di, j + dj)
+            for i, j in points for di in steps for dj in steps
+            if 0 <= i + di < self.shape[0] and 0 <= j + dj < self.shape[1]
+        ]
+
+    def run(self, keep=DEFAULT_KEEP, target_pc=None, max_evaluations=None):
+        """
+        Evaluates the coarse grid, then refines level by level while the
+        evaluations fit `max_evaluations`. Raises ValueError if even the
+        coarse grid does not fit.
+        """
+        self.max_evaluations = max_evaluations
+        spacing = self.coarse_spacing
+        coarse = [
+            (i, j)
+            for i in range(0, self.shape[0], spacing)
+            for j in range(0, self.shape[1], spacing)
+        ]
+        if max_evaluations is not None and len(coarse) > max_evaluations:
+            raise ValueError(
+                f"The compute budget is below the {len(coarse)} Pc evaluations of the coarse search grid."
+            )
+        self.evaluate(coarse)
+        while spacing > 1:
+            candidates = self.lowest(keep)
+            if target_pc is not None:
+                candidates += self.crossings(spacing, target_pc)
+            points = set(self.refine_around(set(candidates), spacing)) - self.evaluated.keys()
+            if max_evaluations is not None and len(self.evaluated) + len(points) > max_evaluations:
+                break
+            self.evaluate(points)
+            spacing //= 2
+            self.spacing = spacing
+        return self
+
+    def result(self, point):
+        i, j = point
+        T, dv = self.maneuver(i, j)
+        Ra_plus, Va_plus = maneuver_states_at(self.Ra, self.Va, T, dv)
+        pc, miss = self.evaluated[point]
+        return {
+            "T_hours_before_TCA": T,
+            "delta_v_m_s": dv,
+            "pc_value": pc,
+            "miss_distance": miss,
+            "sat1_final_position": Ra_plus.tolist(),
+            "sat1_final_velocity": Va_plus.tolist()
+        }
+
+    def original(self):
+        """The unmaneuvered conjunction, like Tradespace.original()."""
+        pc = self.backend.compute(
+            self.Ra, self.Va, self.cov1, self.Rd, self.Vd, self.cov2, self.HBR, self.RelTol, self.HBRType
+        )[0]
+        return {
+            "sat1_initial_position": self.Ra.tolist(),
+            "sat1_initial_velocity": self.Va.tolist(),
+            "sat2_initial_position": self.Rd.tolist(),
+            "sat2_initial_velocity": self.Vd.tolist(),
+            "miss_distance": float(miss_distance(self.Rd - self.Ra, self.Vd - self.Va)),
+            "pc_value": float(pc)
+        }
+
+    def best_maneuver(self):
+        best = self.lowest(1)
+        if not best or not self._pc(best[0]) < np.inf:
+            return {
+                "T_hours_before_TCA": None,
+                "delta_v_m_s": None,
+                "pc_value": np.inf,
+                "miss_distance": None,
+                "sat1_final_position": None,
+                "sat1_final_velocity": None
+            }
+        return self.result(best[0])
+
+    def target_maneuver(self, target_pc):
+        """
+        The evaluated maneuver meeting the target with the smallest |Δv|, and
+        among those the latest one (smallest T), or None.
+        """
+        meeting = [point for point in self.evaluated if self._pc(point) <= target_pc]
+        if not meeting:
+            return None
+        return self.result(min(meeting, key=lambda point: (abs(self.maneuver(*point)[1]), -point[0], point[1])))
+
+    def points(self):
+        """Every evaluated maneuver as { "T_hours", "dv", "miss_distance", "pc" }, T descending."""
+        return [
+            {"T_hours": T, "dv": dv, "miss_distance": miss, "pc": pc}
+            for (T, dv), (pc, miss) in (
+                (self.maneuver(i, j), self.evaluated[(i, j)]) for i, j in sorted(self.evaluated)
+            )
+        ]
+
+    def summary(self):
+        return {
+            "evaluations": len(self.evaluated),
+            "equivalent_grid_evaluations": self.shape[0] * self.shape[1],
+            "resolution": {"T_hours": self.dT * self.spacing, "dv": self.ddv * self.spacing},
+            "coarse_resolution": {"T_hours": self.dT * self.coarse_spacing, "dv": self.ddv * self.coarse_spacing},
+            "levels": self.levels,
+            "levels_completed": self.levels - int(np.log2(self.spacing)),
+            "max_evaluations": self.max_evaluations,
+        }
+
+
+def adaptive_search(cdm, backend, target_pc=None, keep=DEFAULT_KEEP, max_evaluations=None, **options):
+    """
+    Runs the coarse-to-fine search for a CDM and returns the AdaptiveSearch.
+    Raises ValueError like compute_tradespace().
+    """
+    return AdaptiveSearch(cdm, backend, **options).run(
+        keep=keep, target_pc=target_pc, max_evaluations=max_evaluations
+    )
+
+
+def adaptive_search_response(cdm, target_pc=None, backend_name=None, grid=None, **options):
+    """
+    Response body of the tradespace views in adaptive search mode: the
+    original conjunction, the best maneuver found, the maneuver meeting
+    `target_pc` with the smallest |Δv| (if a target is given), the search
+    statistics and every evaluated point.
+
+    With a TradespaceGrid, the search covers its ranges within its budget of
+    evaluations (max_evaluations, max_seconds and TRADESPACE_MAX_EVALUATIONS).
+    """
+    backend_name = backend_name or settings.PC_BACKEND
+    if grid is not None:
+        if grid.max_seconds is not None:
+            grid.measure_rate(cdm, backend_name)
+        options.update(
+            T_range=(grid.t_min_hours, grid.t_max_hours), dv_range=(grid.dv_min, grid.dv_max),
+            max_evaluations=grid.budget()
+        )
+
+    # Search points are rarely evaluated twice; they stay out of the Pc result cache
+    with get_pc_backend(backend_name, cached=False) as backend:
+        search = adaptive_search(cdm, backend, target_pc=target_pc, **options)
+        original = search.original()
+
+    response_data = {
+        "original": original,
+        "best_maneuver": search.best_maneuver(),
+        "search": search.summary(),
+        "evaluated_points": search.points()
+    }
+    if target_pc is not None:
+        response_data["target_pc"] = target_pc
+        response_data["target_maneuver"] = search.target_maneuver(target_pc)
+    return response_data
+
+
+def parse_target_pc(value):
+    """Validates an optional target Pc request parameter. Raises ValueError."""
+    if value in (None, ''):
+        return None
+    try:
+        target_pc = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("target_pc must be a number.")
+    if not 0.0 < target_pc <= 1.0:
+        raise ValueError("target_pc must be in (0, 1].")
+    return target_pc
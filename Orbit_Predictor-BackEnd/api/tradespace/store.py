@@ -0,0 +1,178 @@
+"""
+Persistent tradespace store.
+
+Computed grids are saved in the TradespaceResult table so that reopening the
+maneuvering pages for a CDM does not recompute them. Entries are keyed by the
+CDM, its content version (the hash of its Pc inputs: states, covariances and
+HBR), the grid axes and the Pc options. Pc grids are stored as zlib-compressed
+float32 blobs (positive Pc below the float32 range is kept at its smallest
+subnormal rather than flushed to 0, which would make it the best maneuver on
+load); maneuver states and miss distances are rebuilt on load.
+
+A request whose grid is a window of a stored grid (same CDM version and
+options, axes a subset of the stored ones) is sliced from it; candidate rows
+are found with a range query on the stored extents.
+
+invalidate_tradespaces() drops the entries of older versions of a CDM; it is
+called wherever CDMs are written (CDMCreateView, CDMCalcDetailView, bulk
+ingest and the seed_cdm_data command).
+"""
+import hashlib
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Q
+
+from ..pc import cdm_content_hash, cdm_pc_inputs
+from .engine import Tradespace, float32_pc, maneuver_states, miss_distance
+
+# Axis values closer than this (hours or m/s) are the same grid line
+AXIS_TOLERANCE = 1e-9
+
+
+def cdm_content_version(cdm):
+    """Hash of the CDM's Pc inputs; changes whenever its states, covariances or HBR do."""
+    return cdm_content_hash(cdm)
+
+
+def grid_digest(time_values, dv_values, RelTol, HBRType, backend_name):
+    digest = hashlib.sha256()
+    digest.update(np.asarray(time_values, dtype=float).tobytes())
+    digest.update(b'|')
+    digest.update(np.asarray(dv_values, dtype=float).tobytes())
+    digest.update(f"|{float(RelTol)!r}|{HBRType.lower()}|{backend_name}".encode())
+    return digest.hexdigest()
+
+
+def _pack(array, dtype):
+    return zlib.compress(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+
+def _unpack(blob, dtype, shape=None):
+    array = np.frombuffer(zlib.decompress(bytes(blob)), dtype=dtype)
+    return array.reshape(shape) if shape is not None else array
+
+
+def _axis_index(stored, requested):
+    """Indices of the requested values in a stored axis, or None if any is missing."""
+    order = np.argsort(stored)
+    values = stored[order]
+    position = np.searchsorted(values, requested)
+    below = np.clip(position - 1, 0, len(values) - 1)
+    above = np.clip(position, 0, len(values) - 1)
+    nearest = np.where(np.abs(values[below] - requested) <= np.abs(values[above] - requested), below, above)
+    if np.max(np.abs(values[nearest] - requested)) > AXIS_TOLERANCE:
+        return None
+    return order[nearest]
+
+
+def _store_enabled():
+    return getattr(settings, 'TRADESPACE_STORE_ENABLED', True)
+
+
+def load_tradespace(cdm, time_values, dv_values, RelTol, HBRType, backend_name):
+    """
+    Returns the stored Tradespace for this grid, sliced from a stored grid
+    that contains it if needed, or None.
+    """
+    if not _store_enabled():
+        return None
+    from ..models import TradespaceResult
+
+    time_values = np.asarray(time_values, dtype=float)
+    dv_values = np.asarray(dv_values, dtype=float)
+    if not len(time_values) or not len(dv_values):
+        return None
+    version = cdm_content_version(cdm)
+    key = tradespace_store_key(cdm, version, time_values, dv_values, RelTol, HBRType, backend_name)
+
+    stored = TradespaceResult.objects.filter(key=key).first()
+    if stored is None:
+        stored_rows = TradespaceResult.objects.filter(
+            cdm=cdm, cdm_version=version, rel_tol=float(RelTol), hbr_type=HBRType.lower(), backend=backend_name,
+            t_min_hours__lte=time_values.min() + AXIS_TOLERANCE, t_max_hours__gte=time_values.max() - AXIS_TOLERANCE,
+            dv_min__lte=dv_values.min() + AXIS_TOLERANCE, dv_max__gte=dv_values.max() - AXIS_TOLERANCE,
+        ).order_by('-created_at')
+    else:
+        stored_rows = [stored]
+
+    for stored in stored_rows:
+        stored_T = _unpack(stored.time_values, np.float64)
+        stored_dv = _unpack(stored.dv_values, np.float64)
+        rows = _axis_index(stored_T, time_values)
+        cols = _axis_index(stored_dv, dv_values)
+        if rows is None or cols is None:
+            continue
+        pc = _unpack(stored.pc, np.float32, (len(stored_T), len(stored_dv)))[np.ix_(rows, cols)].astype(float)
+
+        # States and miss distances are cheap to rebuild exactly
+        Ra, Va, cov1, Rd, Vd, cov2, HBR = cdm_pc_inputs(cdm)
+        Ra_plus, Va_plus = maneuver_states(Ra, Va, time_values, dv_values)
+        grid_miss_distance = miss_distance(Rd - Ra_plus, Vd - Va_plus)
+        return Tradespace(
+            Ra, Va, Rd, Vd, time_values, dv_values, Ra_plus, Va_plus, grid_miss_distance, pc,
+            stored.original_miss_distance, stored.original_pc
+        )
+    return None
+
+
+def tradespace_store_key(cdm, version, time_values, dv_values, RelTol, HBRType, backend_name):
+    digest = hashlib.sha256()
+    digest.update(f"{cdm.pk}|{version}|".encode())
+    digest.update(grid_digest(time_values, dv_values, RelTol, HBRType, backend_name).encode())
+    return digest.hexdigest()
+
+
+def save_tradespace(cdm, tradespace, RelTol, HBRType, backend_name):
+    """Stores a computed Tradespace; an existing entry for the same key is replaced."""
+    if not _store_enabled() or tradespace.pc.size == 0:
+        return None
+    from ..models import TradespaceResult
+
+    version = cdm_content_version(cdm)
+    key = tradespace_store_key(cdm, version, tradespace.time_values, tradespace.dv_values, RelTol, HBRType, backend_name)
+    stored, _ = TradespaceResult.objects.update_or_create(
+        key=key,
+        defaults={
+            "cdm": cdm,
+            "cdm_version": version,
+            "backend": backend_name,
+            "rel_tol": float(RelTol),
+            "hbr_type": HBRType.lower(),
+            "t_min_hours": float(np.min(tradespace.time_values)),
+            "t_max_hours": float(np.max(tradespace.time_values)),
+            "dv_min": float(np.min(tradespace.dv_values)),
+            "dv_max": float(np.max(tradespace.dv_values)),
+            "time_values": _pack(tradespace.time_values, np.float64),
+            "dv_values": _pack(tradespace.dv_values, np.float64),
+            "pc": _pack(float32_pc(tradespace.pc), np.float32),
+            "original_pc": float(tradespace.original_pc),
+            "original_miss_distance": float(tradespace.original_miss_distance),
+        }
+    )
+    return stored
+
+
+def invalidate_tradespaces(cdm):
+    """
+    Drops stored and in-memory tradespaces computed for other versions of the
+    CDM. Returns the number of stored entries deleted.
+    """
+    return invalidate_many_tradespaces([cdm])
+
+
+def invalidate_many_tradespaces(cdms):
+    """invalidate_tradespaces() for several CDMs, with one delete query."""
+    from ..models import TradespaceResult
+    from .cache import tradespace_cache
+
+    versions = {cdm.pk: cdm_content_version(cdm) for cdm in cdms}
+    if not versions:
+        return 0
+    tradespace_cache().discard(lambda key: key[0] in versions and key[1] != versions[key[0]])
+    current = Q()
+    for pk, version in versions.items():
+        current |= Q(cdm_id=pk, cdm_version=version)
+    deleted, _ = TradespaceResult.objects.filter(cdm_id__in=versions).exclude(current).delete()
+    return deleted
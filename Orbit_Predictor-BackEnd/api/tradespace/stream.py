@@ -0,0 +1,134 @@
+"""
+Streaming tradespace responses.
+
+Instead of one JSON document, the tradespace views can emit a sequence of
+events while the grid is evaluated (see iter_tradespace):
+
+  grid           the effective grid and budget (see api.tradespace.grid)
+  original       the baseline Pc, miss distance and states
+  rows           heatmap cells (or trajectory entries) of the T rows just computed
+  best_maneuver  the best maneuver, once every row is done
+
+as NDJSON ({"event": ..., "data": ...} per line) or Server-Sent Events. A
+client that disconnects closes the generator, which stops the evaluation. A
+grid already in the tradespace cache or the persistent store is streamed
+from there, and a grid streamed to completion is added to both.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from ..pc import DEFAULT_REL_TOL, DEFAULT_HBR_TYPE, get_pc_backend
+from .cache import tradespace_cache, tradespace_key
+from .engine import DEFAULT_DV_VALUES, DEFAULT_TIME_VALUES, best_trajectory_entry, iter_tradespace
+from .store import load_tradespace, save_tradespace
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+def stream_format(request):
+    """
+    The streaming format requested by a `stream` parameter ("ndjson" or
+    "sse") or by the Accept header, or None for a regular JSON response.
+    Raises ValueError for an unknown `stream` value.
+    """
+    requested = request.data.get('stream') or request.query_params.get('stream')
+    if requested:
+        requested = str(requested).lower()
+        if requested not in STREAM_FORMATS:
+            raise ValueError(f"stream must be one of: {', '.join(STREAM_FORMATS)}.")
+        return requested
+
+    accept = request.META.get('HTTP_ACCEPT', '')
+    for name, content_type in STREAM_FORMATS.items():
+        if content_type in accept:
+            return name
+    return None
+
+
+def _cached_rows(tradespace, chunk_rows):
+    yield tradespace, slice(0, 0)
+    for start in range(0, len(tradespace.time_values), chunk_rows):
+        yield tradespace, slice(start, start + chunk_rows)
+
+
+def _tradespace_rows(cdm, time_values, dv_values, RelTol, HBRType, backend_name, chunk_rows):
+    # Yields (tradespace, rows) from the cache, or while computing the grid
+    key = tradespace_key(cdm, time_values, dv_values, RelTol, HBRType, backend_name)
+    tradespace = tradespace_cache().get(key)
+    if tradespace is not None:
+        yield from _cached_rows(tradespace, chunk_rows)
+        return
+
+    tradespace = load_tradespace(cdm, time_values, dv_values, RelTol, HBRType, backend_name)
+    if tradespace is not None:
+        tradespace_cache().put(key, tradespace)
+        yield from _cached_rows(tradespace, chunk_rows)
+        return
+
+    # The grid is stored as a whole; its points stay out of the Pc result cache
+    with get_pc_backend(backend_name, cached=False) as backend:
+        for tradespace, rows in iter_tradespace(cdm, backend, time_values, dv_values, RelTol, HBRType, chunk_rows):
+            yield tradespace, rows
+    tradespace_cache().put(key, tradespace)
+    save_tradespace(cdm, tradespace, RelTol, HBRType, backend_name)
+
+
+def stream_tradespace(cdm, view='heatmap', time_values=DEFAULT_TIME_VALUES, dv_values=DEFAULT_DV_VALUES,
+                      RelTol=DEFAULT_REL_TOL, HBRType=DEFAULT_HBR_TYPE, backend_name=None, chunk_rows=None,
+                      grid=None):
+    """
+    Yields (event, data) pairs for the heatmap view (rows of heatmap cells) or
+    the linear view (rows of trajectory entries), ending with best_maneuver.
+    With a TradespaceGrid, its axes are used and described in a first "grid"
+    event. Errors raised while computing are reported as a final "error" event.
+    """
+    backend_name = backend_name or settings.PC_BACKEND
+    chunk_rows = chunk_rows or getattr(settings, 'TRADESPACE_STREAM_ROWS', 4)
+    if grid is not None:
+        time_values, dv_values = grid.time_values, grid.dv_values
+        yield 'grid', grid.describe()
+    trajectory = []
+    try:
+        for tradespace, rows in _tradespace_rows(cdm, time_values, dv_values, RelTol, HBRType, backend_name, chunk_rows):
+            if rows.start == rows.stop:
+                yield 'original', tradespace.original()
+            elif view == 'linear':
+                entries = tradespace.trajectory(rows)
+                trajectory.extend(entries)
+                yield 'rows', entries
+            else:
+                yield 'rows', tradespace.heatmap_data(rows)
+    except ValueError as e:
+        yield 'error', {"error": str(e)}
+        return
+
+    if view == 'linear':
+        yield 'best_maneuver', best_trajectory_entry(trajectory)
+    else:
+        yield 'best_maneuver', tradespace.best_maneuver()
+
+
+def _ndjson(events):
+    for event, data in events:
+        yield json.dumps({"event": event, "data": data}, cls=JSONEncoder) + '\n'
+
+
+def _sse(events):
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+
+
+def streaming_response(events, fmt):
+    """Wraps (event, data) pairs in a StreamingHttpResponse of the given format."""
+    body = _sse(events) if fmt == 'sse' else _ndjson(events)
+    response = StreamingHttpResponse(body, content_type=STREAM_FORMATS[fmt])
+    # Keep proxies from buffering the stream
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
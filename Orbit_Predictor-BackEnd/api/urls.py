@@ -1,10 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from .views import (
-    CollisionListCreateView, CollisionDetailView, UserViewSet,
+    CollisionListCreateView, CollisionDetailView, CollisionHistoryListView, UserViewSet,
     ProbabilityCalcListCreateView, ProbabilityCalcDetailView,
-    CDMSerializerListCreateView, CDMCalcDetailView, RegisterView, LoginView, CDMViewSet, RefreshTokenView, CDMCreateView, OrganizationViewSet,
-    CollisionTradespaceView, CollisionLinearTradespaceView, CurrentUserView, CDMPrivacyToggleView, UserNotificationToggleView
+    CDMSerializerListCreateView, CDMCalcDetailView, RegisterView, LoginView, CDMViewSet, RefreshTokenView, CDMCreateView, CDMBulkCreateView, OrganizationViewSet,
+    CollisionTradespaceView, CollisionLinearTradespaceView, CurrentUserView, CDMPrivacyToggleView, UserNotificationToggleView,
+    PcMetricsView, PcJobDetailView
 )
 
 router = DefaultRouter()
@@ -15,14 +16,18 @@ router.register(r'users', UserViewSet, basename='user')
 urlpatterns = [
     path('collisions/', CollisionListCreateView.as_view(), name='collision-list-create'),
     path('collisions/<int:pk>/', CollisionDetailView.as_view(), name='collision-detail'),
+    path('collisions/history/', CollisionHistoryListView.as_view(), name='collision-history'),
     path('probabilities/', ProbabilityCalcListCreateView.as_view(), name='probability-list-create'),
     path('probabilities/<int:pk>/', ProbabilityCalcDetailView.as_view(), name='probability-detail'),
     # path('cdms/', CDMSerializerListCreateView.as_view(), name='cdm-list-create'),
     path('cdms/<int:pk>/', CDMCalcDetailView.as_view(), name='cdm-detail'),
     path('cdms/create/', CDMCreateView.as_view(), name='cdm-create'),
+    path('cdms/bulk/', CDMBulkCreateView.as_view(), name='cdm-bulk-create'),
     path('cdms/<int:pk>/privacy/', CDMPrivacyToggleView.as_view(), name='cdm-privacy-toggle'),
     path('tradespace/', CollisionTradespaceView.as_view(), name='collision-tradespace'),
     path('tradespace/linear/', CollisionLinearTradespaceView.as_view(), name='collision-linear-tradespace'),
+    path('jobs/<int:pk>/', PcJobDetailView.as_view(), name='pc-job-detail'),
+    path('metrics/pc/', PcMetricsView.as_view(), name='pc-metrics'),
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('refresh/', RefreshTokenView.as_view(), name='refresh_token'),
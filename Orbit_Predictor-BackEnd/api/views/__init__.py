@@ -1,8 +1,10 @@
-from .collision_views import CollisionListCreateView, CollisionDetailView
+from .collision_views import CollisionListCreateView, CollisionDetailView, CollisionHistoryListView
 from .probability_calc_views import ProbabilityCalcListCreateView, ProbabilityCalcDetailView
-from .cdm_views import CDMSerializerListCreateView, CDMCalcDetailView, CDMViewSet, CDMCreateView, CDMPrivacyToggleView
+from .cdm_views import CDMSerializerListCreateView, CDMCalcDetailView, CDMViewSet, CDMCreateView, CDMBulkCreateView, CDMPrivacyToggleView
 from .user_views import RegisterView, LoginView, UserViewSet, CurrentUserView, UserNotificationToggleView
 from .refresh_token_views import RefreshTokenView
 from .organization_views import OrganizationViewSet
 from .tradespace_heatmap_views import CollisionTradespaceView
 from .tradespace_linear_views import CollisionLinearTradespaceView
+from .metrics_views import PcMetricsView
+from .job_views import PcJobDetailView
@@ -1,45 +1,48 @@
 from rest_framework import generics, viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django_filters.rest_framework import DjangoFilterBackend
-from django.core.mail import send_mail
-from django.conf import settings
-
-from ..models import CDM
-from ..models import Collision
-from ..models import Organization
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from django_filters.rest_framework import CharFilter, DjangoFilterBackend, FilterSet
+from django.urls import reverse
+from itertools import islice
+import logging
+
+from ..models import CDM, Collision
 from ..serializers import CDMSerializer
 from ..permissions import IsAdmin, CanViewCDM
+from ..pc import cdm_content_hash, cdm_covariance_flags
+from ..jobs import queue_pc_job
+from ..ingest import CDM_UPDATE_FIELDS, bulk_ingest, cdm_fields, cdm_unchanged, has_collision
+from ..parsers import NDJSONParser, CCSDSKVNParser, CCSDSXMLParser, CCSDSTextXMLParser
+from ..tradespace import invalidate_tradespaces
+
+logger = logging.getLogger(__name__)
+
+class CDMFilter(FilterSet):
+    # Designators are the keys of the sat1 / sat2 catalog entries
+    sat1_object_designator = CharFilter(field_name='sat1')
+    sat2_object_designator = CharFilter(field_name='sat2')
 
-SPACE_AGENCY_MAP = {
-    "asc-csa.gc.ca": "CSA",
-    "nasa.gov": "NASA",
-    "esa.int": "ESA",
-    "roscosmos.ru": "Roscosmos",
-    "cnsa.gov.cn": "CNSA",
-    "isro.gov.in": "ISRO",
-    "jaxa.jp": "JAXA",
-    "gov.uk/government/organisations/uk-space-agency": "UK Space Agency",
-    "cnes.fr": "CNES",
-    "dlr.de": "DLR",
-    "asi.it": "ASI",
-    "aeb.gov.br": "AEB",
-    "kari.re.kr": "KARI",
-    "space.gov.ae": "UAE Space Agency",
-    "australianspaceagency.gov.au": "Australian Space Agency",
-    "space.gov.il": "Israel Space Agency"
-}
+    class Meta:
+        model = CDM
+        fields = []
 
 class CDMSerializerListCreateView(generics.ListCreateAPIView):
     queryset = CDM.objects.all()
     serializer_class = CDMSerializer
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['sat1_object_designator', 'sat2_object_designator']
+    filterset_class = CDMFilter
 
 class CDMCalcDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = CDM.objects.all()
     serializer_class = CDMSerializer
 
+    def perform_update(self, serializer):
+        cdm = serializer.save()
+        # Stored tradespaces of the previous states/covariances are stale
+        invalidate_tradespaces(cdm)
+
 class CDMPrivacyToggleView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -83,134 +86,112 @@ class CDMViewSet(viewsets.ModelViewSet):
             return CDM.objects.filter(privacy=True)
         return CDM.objects.none()
 
+CCSDS_PARSERS = [CCSDSKVNParser, CCSDSXMLParser, CCSDSTextXMLParser]
+
 class CDMCreateView(APIView):
+    """
+    Creates or updates one CDM from a flattened JSON object, or from a CCSDS
+    CDM in KVN (Content-Type: text/plain) or XML (application/xml).
+    """
     permission_classes = [permissions.IsAuthenticated]
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + CCSDS_PARSERS
 
     def post(self, request, *args, **kwargs):
         data = request.data
+        if not isinstance(data, dict):
+            # CCSDS parsers yield the messages of the body
+            messages = list(islice(data, 2))
+            if len(messages) != 1:
+                return Response(
+                    {"error": "Expected exactly one CDM; use /api/cdms/bulk/ for several."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data = messages[0]
+            if isinstance(data, Exception):
+                return Response({"error": str(data)}, status=status.HTTP_400_BAD_REQUEST)
+
+        fields = cdm_fields(data)
+
+        # Re-posting identical content writes nothing and computes nothing; a
+        # CDM with the same Pc inputs (content hash) keeps its Collision, if it has one
+        stored = CDM.objects.select_related('sat1', 'sat2', 'collision').filter(
+            message_id=data['MESSAGE_ID']
+        ).first()
+        posted = CDM(**fields)
+        posted.content_hash = cdm_content_hash(posted)
+        same_pc_inputs = (
+            stored is not None and stored.content_hash == posted.content_hash and has_collision(stored)
+        )
+        if same_pc_inputs and cdm_unchanged(stored, posted, CDM_UPDATE_FIELDS):
+            return Response({
+                "message": f"CDM entry with MESSAGE_ID: {data['MESSAGE_ID']} is unchanged",
+                "status": "unchanged",
+                "cdm_id": stored.id,
+            }, status=status.HTTP_200_OK)
 
         # Create or update the CDM entry
         cdm, created = CDM.objects.update_or_create(
             message_id=data['MESSAGE_ID'],
-            defaults={
-                "ccsds_cdm_version": data.get("CCSDS_CDM_VERS"),
-                "creation_date": data.get("CREATION_DATE"),
-                "originator": data.get("ORIGINATOR"),
-                "tca": data.get("TCA"),
-                "miss_distance": float(data.get("MISS_DISTANCE", 0)),
-
-                # Satellite 1 details
-                "sat1_object": data.get("SAT1_OBJECT"),
-                "sat1_object_designator": data.get("SAT1_OBJECT_DESIGNATOR"),
-                "sat1_maneuverable": data.get("SAT1_MANEUVERABLE"),
-                "sat1_x": float(data.get("SAT1_X", 0)),
-                "sat1_y": float(data.get("SAT1_Y", 0)),
-                "sat1_z": float(data.get("SAT1_Z", 0)),
-                "sat1_x_dot": float(data.get("SAT1_X_DOT", 0)),
-                "sat1_y_dot": float(data.get("SAT1_Y_DOT", 0)),
-                "sat1_z_dot": float(data.get("SAT1_Z_DOT", 0)),
-
-                "sat1_catalog_name": data.get("SAT1_CATALOG_NAME"),
-                "sat1_object_name": data.get("SAT1_OBJECT_NAME"),
-                "sat1_international_designator": data.get("SAT1_INTERNATIONAL_DESIGNATOR"),
-                "sat1_object_type": data.get("SAT1_OBJECT_TYPE"),
-                "sat1_operator_organization": data.get("SAT1_OPERATOR_ORGANIZATION"),
-                "sat1_covariance_method": data.get("SAT1_COVARIANCE_METHOD"),
-                "sat1_reference_frame": data.get("SAT1_REFERENCE_FRAME"),
-
-                # Covariance matrix for Satellite 1
-                "sat1_cov_rr": float(data.get("SAT1_CR_R", 0)),
-                "sat1_cov_rt": float(data.get("SAT1_CT_R", 0)),
-                "sat1_cov_rn": float(data.get("SAT1_CN_R", 0)),
-                "sat1_cov_tr": float(data.get("SAT1_CR_T", 0)),
-                "sat1_cov_tt": float(data.get("SAT1_CT_T", 0)),
-                "sat1_cov_tn": float(data.get("SAT1_CN_T", 0)),
-                "sat1_cov_nr": float(data.get("SAT1_CR_N", 0)),
-                "sat1_cov_nt": float(data.get("SAT1_CT_N", 0)),
-                "sat1_cov_nn": float(data.get("SAT1_CN_N", 0)),
-
-                # Satellite 2 details
-                "sat2_object": data.get("SAT2_OBJECT"),
-                "sat2_object_designator": data.get("SAT2_OBJECT_DESIGNATOR"),
-                "sat2_maneuverable": data.get("SAT2_MANEUVERABLE"),
-                "sat2_x": float(data.get("SAT2_X", 0)),
-                "sat2_y": float(data.get("SAT2_Y", 0)),
-                "sat2_z": float(data.get("SAT2_Z", 0)),
-                "sat2_x_dot": float(data.get("SAT2_X_DOT", 0)),
-                "sat2_y_dot": float(data.get("SAT2_Y_DOT", 0)),
-                "sat2_z_dot": float(data.get("SAT2_Z_DOT", 0)),
-
-                "sat2_catalog_name": data.get("SAT2_CATALOG_NAME"),
-                "sat2_object_name": data.get("SAT2_OBJECT_NAME"),
-                "sat2_international_designator": data.get("SAT2_INTERNATIONAL_DESIGNATOR"),
-                "sat2_object_type": data.get("SAT2_OBJECT_TYPE"),
-                "sat2_operator_organization": data.get("SAT2_OPERATOR_ORGANIZATION"),
-                "sat2_covariance_method": data.get("SAT2_COVARIANCE_METHOD"),
-                "sat2_reference_frame": data.get("SAT2_REFERENCE_FRAME"),
-
-                # Covariance matrix for Satellite 2
-                "sat2_cov_rr": float(data.get("SAT2_CR_R", 0)),
-                "sat2_cov_rt": float(data.get("SAT2_CT_R", 0)),
-                "sat2_cov_rn": float(data.get("SAT2_CN_R", 0)),
-                "sat2_cov_tr": float(data.get("SAT2_CR_T", 0)),
-                "sat2_cov_tt": float(data.get("SAT2_CT_T", 0)),
-                "sat2_cov_tn": float(data.get("SAT2_CN_T", 0)),
-                "sat2_cov_nr": float(data.get("SAT2_CR_N", 0)),
-                "sat2_cov_nt": float(data.get("SAT2_CT_N", 0)),
-                "sat2_cov_nn": float(data.get("SAT2_CN_N", 0)),
-
-                # Hard Body Radius (if present in JSON data)
-                "hard_body_radius": float(20),
-
-                "privacy": data.get("privacy", False)
-            }
+            defaults=fields
         )
         action = "Created" if created else "Updated"
-
-        # do we only want collision + email sending when the CDM data is new?
-
-        collision = Collision.create_from_cdm(cdm)
-
-        user = self.request.user
-        user_email = getattr(user, 'email', None)
+        if same_pc_inputs:
+            Collision.sync_designators([cdm])
+            return Response({
+                "message": f"Updated CDM entry with MESSAGE_ID: {cdm.message_id}; its Pc inputs are unchanged",
+                "status": "updated",
+                "cdm_id": cdm.id,
+            }, status=status.HTTP_200_OK)
+        if not created:
+            invalidate_tradespaces(cdm)
+
+        # Flag covariances that Pc computation will have to remediate
+        IsPosDef, IsRemediated = cdm_covariance_flags([cdm])
+        for obj, pos_def, remediated in zip(("SAT1", "SAT2"), IsPosDef[0], IsRemediated[0]):
+            if not pos_def or remediated:
+                logger.warning(
+                    "CDM %s: %s covariance is %s", cdm.message_id, obj,
+                    "not positive definite" if not pos_def else "below the remediation clipping limit"
+                )
+
+        # Pc and the notification email run on the job pool; clients poll the job
+        job = queue_pc_job(cdm, self.request.user, action)
+        body = {
+            "message": f"{action} CDM entry with MESSAGE_ID: {cdm.message_id}",
+            "status": action.lower(),
+            "cdm_id": cdm.id,
+            "job_id": job.id,
+            "job_status": job.status,
+            "job_url": reverse('pc-job-detail', args=[job.id]),
+        }
+
+        user_email = getattr(self.request.user, 'email', None)
         if not user_email:
-            return Response({"error": "User email not provided."}, status=status.HTTP_400_BAD_REQUEST)
-
-        user_domain = user_email.split('@')[-1].lower()
-        org_name = SPACE_AGENCY_MAP.get(user_domain, None)
-
-        send_email_flag = True
-        if org_name:
-            try:
-                org_obj = Organization.objects.get(name=org_name)
-                if collision.probability_of_collision <= org_obj.alert_threshold:
-                    send_email_flag = False
-            except Organization.DoesNotExist:
-                send_email_flag = False
-
-        if user.notifications and send_email_flag:
-            subject = f"On-Orbit Collision Predictor Notification for Collision: {cdm.message_id}"
-            message = (
-                f"{action} CDM entry with the following details:\n"
-                f"A new collision was created with the following details:\n"
-                f"Message ID: {cdm.message_id}\n"
-                f"TCA: {cdm.tca}\n"
-                f"Miss Distance: {cdm.miss_distance}\n"
-                f"Collision ID: {collision.id}\n"
-                f"Probability of Collision: {collision.probability_of_collision}\n"
-            )
-            from_email = settings.EMAIL_HOST_USER
-            recipient_list = [user_email] 
-
-            send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+            return Response({"error": "User email not provided.", **body}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(body, status=status.HTTP_202_ACCEPTED)
+
+class CDMBulkCreateView(APIView):
+    """
+    Ingests many CDMs in one request: a JSON array of CDM messages (same keys
+    as CDMCreateView), NDJSON with one message per line
+    (Content-Type: application/x-ndjson), or concatenated CCSDS CDMs in KVN
+    (text/plain) or XML (application/xml). Messages are upserted on MESSAGE_ID
+    and their Pc computed in batches of CDM_BULK_CHUNK_SIZE; the response
+    holds one result per message, in input order. No notification emails are
+    sent for bulk ingest.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser] + CCSDS_PARSERS
 
-        if created:
+    def post(self, request, *args, **kwargs):
+        messages = request.data
+        if isinstance(messages, dict):
             return Response(
-                {"message": f"Created CDM entry with MESSAGE_ID: {cdm.message_id}"},
-                status=status.HTTP_201_CREATED
+                {"error": "Expected a JSON array, NDJSON stream or CCSDS KVN / XML file of CDM messages."},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        else:
-            return Response(
-                {"message": f"Updated CDM entry with MESSAGE_ID: {cdm.message_id}"},
-                status=status.HTTP_200_OK
-            )
\ No newline at end of file
+
+        summary, results = bulk_ingest(messages)
+        logger.info("Bulk CDM ingest by %s: %s", request.user, summary)
+        return Response({"summary": summary, "results": results}, status=status.HTTP_200_OK)
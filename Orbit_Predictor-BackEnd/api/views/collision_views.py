@@ -1,11 +1,18 @@
 from rest_framework import generics
-from ..models import Collision
-from ..serializers import CollisionSerializer
+from ..models import Collision, CollisionHistory
+from ..serializers import CollisionSerializer, CollisionHistorySerializer
 
 class CollisionListCreateView(generics.ListCreateAPIView):
     queryset = Collision.objects.all()
     serializer_class = CollisionSerializer
+    filterset_fields = ['cdm']
 
 class CollisionDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Collision.objects.all()
-    serializer_class = CollisionSerializer
\ No newline at end of file
+    serializer_class = CollisionSerializer
+
+class CollisionHistoryListView(generics.ListAPIView):
+    """Superseded Pc results, newest first; filter with ?cdm=<id>."""
+    queryset = CollisionHistory.objects.order_by('-computed_at', '-id')
+    serializer_class = CollisionHistorySerializer
+    filterset_fields = ['cdm']
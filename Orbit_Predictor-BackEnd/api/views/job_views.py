@@ -0,0 +1,24 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import PcJob
+from ..serializers import PcJobSerializer
+
+class PcJobDetailView(APIView):
+    """
+    Reports the state of a background Pc job queued by CDM ingest and, once it
+    has succeeded, the id of the resulting Collision.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            job = PcJob.objects.select_related('cdm').get(pk=pk)
+        except PcJob.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if job.user_id != request.user.id and request.user.role not in ['admin', 'collision_analyst']:
+            return Response({"error": "You do not have permission to view this job."}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response(PcJobSerializer(job).data, status=status.HTTP_200_OK)
@@ -0,0 +1,19 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..permissions import IsAdmin
+from ..pc import matlab_engine_pool, pc_result_cache
+
+class PcMetricsView(APIView):
+    """
+    Reports runtime metrics of the Pc computation, such as how long requests
+    waited to check out a MATLAB engine and how often the Pc cache was hit.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            "matlab_pool": matlab_engine_pool().stats(),
+            "pc_cache": pc_result_cache().stats(),
+        }, status=status.HTTP_200_OK)
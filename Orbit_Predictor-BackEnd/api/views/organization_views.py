@@ -5,7 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 
-from ..models import Organization
+from django.db.models import Prefetch
+
+from ..models import CDM, Organization
 from ..serializers import OrganizationSerializer, UserSerializer, CDMSerializer
 
 class OrganizationViewSet(viewsets.ModelViewSet):
@@ -13,7 +15,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     A viewset that provides the standard actions for the Organization model,
     plus custom endpoints to list users and CDMs.
     """
-    queryset = Organization.objects.all()
+    # The nested CDMs read their catalog fields from the Satellites
+    queryset = Organization.objects.prefetch_related(
+        Prefetch('cdms', queryset=CDM.objects.select_related('sat1', 'sat2'))
+    )
     serializer_class = OrganizationSerializer
     permission_classes = [IsAuthenticated]
 
@@ -1,12 +1,15 @@
-import numpy as np
-import matlab.engine
-from pathlib import Path
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.settings import api_settings
 
 from ..models import CDM, Collision
+from ..renderers import EventStreamRenderer, NDJSONRenderer, OctetStreamRenderer
+from ..tradespace import (
+    TradespaceGrid, adaptive_search_response, binary_heatmap_response, columnar_heatmap, get_tradespace,
+    heatmap_format, parse_target_pc, stream_format, stream_tradespace, streaming_response
+)
 
 class CollisionTradespaceView(APIView):
     """
@@ -24,9 +27,33 @@ class CollisionTradespaceView(APIView):
             "dv": Δv,
             "miss_distance": computed miss distance,
             "pc": computed collision probability.
-      
-    No orbital propagation is performed.
+
+    No orbital propagation is performed. The whole grid is evaluated at once by
+    api.tradespace with a single batched call to the Pc backend, and is shared
+    with CollisionLinearTradespaceView for the same CDM.
+
+    With "stream": "ndjson" or "sse" (or a matching Accept header) the heatmap
+    cells are streamed a few T rows at a time, ending with best_maneuver.
+
+    The grid defaults to the ranges above; "t_min_hours", "t_max_hours",
+    "t_step_hours", "dv_min", "dv_max" and "dv_step" change it, and
+    "max_evaluations" or "max_seconds" cap its cost (the grid is coarsened to
+    fit, see api.tradespace.grid). "grid" reports the effective resolution.
+
+    With "search": "adaptive" the grid is replaced by a coarse-to-fine search
+    (api.tradespace.search) at finer resolution, optionally also resolving
+    where Pc crosses "target_pc"; the response reports the evaluation count.
+    The search stops refining when the compute budget is used up, and cannot
+    be streamed or sent in a columnar format.
+
+    With "format": "columnar", "base64" or "binary" (or Accept:
+    application/octet-stream) "heatmap_data" is replaced by the compact
+    columnar "heatmap" of api.tradespace.formats.
     """
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        NDJSONRenderer, EventStreamRenderer, OctetStreamRenderer
+    ]
+
     def post(self, request, *args, **kwargs):
         # 1) Parse request data
         cdm_id = request.data.get("cdm_id")
@@ -37,147 +64,57 @@ class CollisionTradespaceView(APIView):
         # 2) Retrieve the CDM instance (assumed to have states at TCA)
         cdm = get_object_or_404(CDM, id=cdm_id)
 
-        # Satellite 1 (primary) initial state
-        Ra = np.array([cdm.sat1_x, cdm.sat1_y, cdm.sat1_z], dtype=float)
-        Va = np.array([cdm.sat1_x_dot, cdm.sat1_y_dot, cdm.sat1_z_dot], dtype=float)
-
-        # Satellite 2 (secondary) initial state
-        Rd = np.array([cdm.sat2_x, cdm.sat2_y, cdm.sat2_z], dtype=float)
-        Vd = np.array([cdm.sat2_x_dot, cdm.sat2_y_dot, cdm.sat2_z_dot], dtype=float)
-
-        # Build covariance matrices for MATLAB
-        cov1 = [
-            [cdm.sat1_cov_rr, cdm.sat1_cov_rt, cdm.sat1_cov_rn],
-            [cdm.sat1_cov_tr, cdm.sat1_cov_tt, cdm.sat1_cov_tn],
-            [cdm.sat1_cov_nr, cdm.sat1_cov_nt, cdm.sat1_cov_nn]
-        ]
-        cov2 = [
-            [cdm.sat2_cov_rr, cdm.sat2_cov_rt, cdm.sat2_cov_rn],
-            [cdm.sat2_cov_tr, cdm.sat2_cov_tt, cdm.sat2_cov_tn],
-            [cdm.sat2_cov_nr, cdm.sat2_cov_nt, cdm.sat2_cov_nn]
-        ]
-
-        # MATLAB parameters
-        HBR = cdm.hard_body_radius
-        RelTol = 1e-8
-        HBRType = 'circle'
-
-        # Start MATLAB engine and add MATLAB scripts path
-        eng = matlab.engine.start_matlab()
-        matlab_path = Path(__file__).resolve().parent.parent / "matlab"
-        eng.addpath(str(matlab_path))
-
-        # Helper: Compute collision probability via MATLAB
-        def compute_pc(r1, v1):
-            r1_mat = matlab.double(r1.tolist())
-            v1_mat = matlab.double(v1.tolist())
-            cov1_mat = matlab.double(cov1)
-            # Use Satellite 2's unchanged state
-            r2_mat = matlab.double(Rd.tolist())
-            v2_mat = matlab.double(Vd.tolist())
-            cov2_mat = matlab.double(cov2)
-            prob = float(eng.Pc2D_Foster(
-                r1_mat, v1_mat, cov1_mat,
-                r2_mat, v2_mat, cov2_mat,
-                HBR, RelTol, HBRType,
-                nargout=1
-            ))
-            return prob
-
-        # Compute baseline relative state and miss distance
-        RRel_orig = Rd - Ra
-        VRel_orig = Vd - Va
-        VRel_orig_mag_sq = np.dot(VRel_orig, VRel_orig)
-        if VRel_orig_mag_sq < 1e-12:
-            Rmiss_orig = RRel_orig
-        else:
-            proj_factor_orig = np.dot(RRel_orig, VRel_orig) / VRel_orig_mag_sq
-            Rmiss_orig = RRel_orig - proj_factor_orig * VRel_orig
-        miss_distance_orig = np.linalg.norm(Rmiss_orig)
-        original_pc = compute_pc(Ra, Va)
-
-        # Define tradespace:
-        # Δv from -0.10 to +0.10 m/s (0.01 m/s steps)
-        # T from 24 hr to 0 hr (in 0.25-hr decrements)
-        dv_values = np.arange(-0.10, 0.10 + 1e-9, 0.01)
-        time_values = np.arange(24.0, -1e-9, -0.25)
-
-        # Compute unit vector for Va
-        Va_norm = np.linalg.norm(Va)
-        if Va_norm < 1e-12:
-            eng.quit()
-            return Response({"error": "Satellite 1 velocity is near zero."},
-                            status=status.HTTP_400_BAD_REQUEST)
-        Va_hat = Va / Va_norm
-
-        # Initialize overall best maneuver result and heatmap data list.
-        best_result = {
-            "T_hours_before_TCA": None,
-            "delta_v_m_s": None,
-            "pc_value": np.inf,
-            "miss_distance": None,
-            "sat1_final_position": None,
-            "sat1_final_velocity": None
-        }
-        heatmap_data = []  # Each element: { "T_hours": T, "dv": dv, "miss_distance": ..., "pc": ... }
-
-        # Loop over time values and Δv values
-        for T in time_values:
-            for dv in dv_values:
-                # Apply direct equations:
-                # New velocity: +Va = Va + Δv * Va_hat
-                Va_plus = Va + dv * Va_hat
-                # New position: +Ra = Ra - 3 * Δv * T * (+Va)
-                Ra_plus = Ra - 3.0 * dv * T * 3600 * Va_plus
-
-                # Compute new relative state (Satellite 2 unchanged)
-                RRel = Rd - Ra_plus
-                VRel = Vd - Va_plus
-
-                # Compute miss distance vector and magnitude
-                VRel_mag_sq = np.dot(VRel, VRel)
-                if VRel_mag_sq < 1e-12:
-                    Rmiss_vec = RRel
-                else:
-                    proj_factor = np.dot(RRel, VRel) / VRel_mag_sq
-                    Rmiss_vec = RRel - proj_factor * VRel
-                miss_distance = np.linalg.norm(Rmiss_vec)
-
-                # Compute collision probability via MATLAB
-                pc_value = compute_pc(Ra_plus, Va_plus)
-
-                # Record the result in the heatmap_data
-                heatmap_data.append({
-                    "T_hours": float(T),
-                    "dv": float(dv),
-                    "miss_distance": float(miss_distance),
-                    "pc": float(pc_value)
-                })
-
-                # Update overall best maneuver if this combination is better
-                if pc_value < best_result["pc_value"]:
-                    best_result = {
-                        "T_hours_before_TCA": float(T),
-                        "delta_v_m_s": float(dv),
-                        "pc_value": float(pc_value),
-                        "miss_distance": float(miss_distance),
-                        "sat1_final_position": Ra_plus.tolist(),
-                        "sat1_final_velocity": Va_plus.tolist()
-                    }
-
-        eng.quit()
+        # Grid ranges and steps, and the compute budget, from the request
+        try:
+            grid = TradespaceGrid.from_request(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Adaptive mode: coarse-to-fine search over the grid ranges instead of the full grid
+        if request.data.get("search") == "adaptive":
+            try:
+                unsupported = stream_format(request) or heatmap_format(request)
+                target_pc = parse_target_pc(request.data.get("target_pc"))
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            if unsupported:
+                return Response({"error": "stream and format are not supported with the adaptive search."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            try:
+                response_data = adaptive_search_response(cdm, target_pc, grid=grid)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        # Coarsen the grid to the budget
+        try:
+            fmt = stream_format(request)
+            heatmap = heatmap_format(request)
+            grid.prepare(cdm)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Streaming mode: rows are sent as they are computed
+        if fmt:
+            return streaming_response(stream_tradespace(cdm, view='heatmap', grid=grid), fmt)
+
+        # 3) Evaluate (or reuse) the T x Δv grid
+        try:
+            tradespace = get_tradespace(cdm, grid.time_values, grid.dv_values)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         response_data = {
-            "original": {
-                "sat1_initial_position": Ra.tolist(),
-                "sat1_initial_velocity": Va.tolist(),
-                "sat2_initial_position": Rd.tolist(),
-                "sat2_initial_velocity": Vd.tolist(),
-                "miss_distance": float(miss_distance_orig),
-                "pc_value": float(original_pc)
-            },
-            "best_maneuver": best_result,
-            "heatmap_data": heatmap_data
+            "original": tradespace.original(),
+            "best_maneuver": tradespace.best_maneuver(),
         }
+        if heatmap == 'binary':
+            response_data["grid"] = grid.describe()
+            return binary_heatmap_response(tradespace, response_data)
+        if heatmap:
+            response_data["heatmap"] = columnar_heatmap(tradespace, heatmap)
+        else:
+            response_data["heatmap_data"] = tradespace.heatmap_data()
+        response_data["grid"] = grid.describe()
 
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
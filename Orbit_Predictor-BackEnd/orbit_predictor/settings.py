@@ -151,3 +151,67 @@ CORS_ALLOWED_ORIGINS = [
 
 # Alternatively, for development purposes you could use:
 # CORS_ALLOW_ALL_ORIGINS = True
+
+# Probability of collision backend: 'matlab' (MATLAB engine), 'numpy' (native Foster port),
+# 'gauss' (Foster port with fixed-node quadrature), 'series' (truncated series 2D Pc)
+# or 'hall3d' (native 3D Hall port)
+PC_BACKEND = os.getenv('PC_BACKEND') or 'matlab'
+
+# MATLAB engine pool used by the 'matlab' Pc backend
+MATLAB_POOL_SIZE = int(os.getenv('MATLAB_POOL_SIZE') or 1)
+MATLAB_POOL_WARMUP = (os.getenv('MATLAB_POOL_WARMUP') or 'False').lower() in ('true', '1', 'yes')
+MATLAB_POOL_CHECKOUT_TIMEOUT = float(os.getenv('MATLAB_POOL_CHECKOUT_TIMEOUT') or 120)
+
+# CDM messages upserted (and their Pc computed) per batch by the bulk ingest endpoint
+CDM_BULK_CHUNK_SIZE = int(os.getenv('CDM_BULK_CHUNK_SIZE') or 500)
+
+# Worker threads computing Pc and sending notifications for ingested CDMs
+# (0 runs the job inline before the ingest response)
+PC_JOB_WORKERS = int(os.getenv('PC_JOB_WORKERS') or 2)
+
+# Number of computed maneuver tradespaces kept in memory and shared between the
+# heatmap and linear tradespace endpoints
+TRADESPACE_CACHE_SIZE = int(os.getenv('TRADESPACE_CACHE_SIZE') or 32)
+
+# Persist computed tradespaces (TradespaceResult table) across requests and restarts
+TRADESPACE_STORE_ENABLED = (os.getenv('TRADESPACE_STORE_ENABLED') or 'True').lower() in ('true', '1', 'yes')
+
+# Largest tradespace grid (T x Δv Pc evaluations) computed per request; larger
+# requested grids are coarsened to fit
+TRADESPACE_MAX_EVALUATIONS = int(os.getenv('TRADESPACE_MAX_EVALUATIONS') or 250000)
+
+# T rows evaluated (and sent) per event by the streaming tradespace responses
+TRADESPACE_STREAM_ROWS = int(os.getenv('TRADESPACE_STREAM_ROWS') or 4)
+
+# Process pool evaluating large tradespace grids in tiles of T rows: worker
+# processes (0 evaluates in the request process), T rows per tile, smallest grid
+# sent to the pool and the multiprocessing start method of the workers
+TRADESPACE_WORKERS = int(os.getenv('TRADESPACE_WORKERS') or 0)
+TRADESPACE_TILE_ROWS = int(os.getenv('TRADESPACE_TILE_ROWS') or 8)
+TRADESPACE_PARALLEL_MIN_CELLS = int(os.getenv('TRADESPACE_PARALLEL_MIN_CELLS') or 20000)
+TRADESPACE_START_METHOD = os.getenv('TRADESPACE_START_METHOD') or 'spawn'
+
+# Content-addressed Pc result cache: in-memory LRU entries, plus the PcResult table
+# (oldest rows deleted beyond PC_CACHE_MAX_ROWS, 0 for no limit)
+PC_CACHE_ENABLED = (os.getenv('PC_CACHE_ENABLED') or 'True').lower() in ('true', '1', 'yes')
+PC_CACHE_SIZE = int(os.getenv('PC_CACHE_SIZE') or 100000)
+PC_CACHE_PERSIST = (os.getenv('PC_CACHE_PERSIST') or 'True').lower() in ('true', '1', 'yes')
+PC_CACHE_MAX_ROWS = int(os.getenv('PC_CACHE_MAX_ROWS') or 500000)
+
+# 3D Hall Pc backend ('hall3d'): CDM state units to meters, Lebedev quadrature degree,
+# and where the memory-mapped Lebedev tables are unpacked (defaults to the temp dir)
+PC3D_STATE_SCALE = float(os.getenv('PC3D_STATE_SCALE') or 1000.0)
+PC3D_LEBEDEV_DEGREE = int(os.getenv('PC3D_LEBEDEV_DEGREE') or 5810)
+LEBEDEV_CACHE_DIR = os.getenv('LEBEDEV_CACHE_DIR') or None
+
+# Conjunctions whose Pc upper bound is below this floor skip full Pc integration
+# and store the bound instead (0 disables screening)
+PC_SCREEN_FLOOR = float(os.getenv('PC_SCREEN_FLOOR') or 1e-12)
+
+# Series Pc backend ('series'): maximum number of series terms before a conjunction
+# falls back to Foster integration
+PC_SERIES_MAX_TERMS = int(os.getenv('PC_SERIES_MAX_TERMS') or 2000)
+
+# Fixed-node Foster backend ('gauss'): largest Gauss-Legendre rule before a conjunction
+# falls back to adaptive integration
+PC_GAUSS_MAX_NODES = int(os.getenv('PC_GAUSS_MAX_NODES') or 1024)